@@ -0,0 +1,104 @@
+"""
+Adaptive Timeout for Storm911
+Derives per-endpoint request timeouts from recently observed ReadyMode latency
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from config import (
+    API_TIMEOUT,
+    API_CONNECT_TIMEOUT,
+    API_TIMEOUT_FLOOR,
+    API_TIMEOUT_PERCENTILE,
+    API_TIMEOUT_MULTIPLIER,
+    API_TIMEOUT_WINDOW,
+    API_TIMEOUT_MIN_SAMPLES,
+    API_HEDGE_PERCENTILE,
+    API_HEDGE_MIN_DELAY
+)
+from api_metrics import endpoint_name
+
+class AdaptiveTimeout:
+    def __init__(
+        self,
+        connect_timeout: float = API_CONNECT_TIMEOUT,
+        floor: float = API_TIMEOUT_FLOOR,
+        percentile: float = API_TIMEOUT_PERCENTILE,
+        multiplier: float = API_TIMEOUT_MULTIPLIER,
+        window: int = API_TIMEOUT_WINDOW,
+        min_samples: int = API_TIMEOUT_MIN_SAMPLES
+    ):
+        """Initialize Adaptive Timeout"""
+        self.connect_timeout = connect_timeout
+        self.floor = floor
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.window = window
+        self.min_samples = min_samples
+        
+        self._lock = threading.Lock()
+        
+        # Most recent response times in seconds, per endpoint
+        self._samples: Dict[str, Deque[float]] = {}
+    
+    def record(self, url: str, duration: float) -> None:
+        """Record time taken until a response arrived (or the request timed out)"""
+        name = endpoint_name(url)
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(duration)
+    
+    def get_timeout(self, url: str, ceiling: float = API_TIMEOUT) -> Tuple[float, float]:
+        """
+        Get (connect, read) timeout for a request
+        Read timeout is the rolling percentile times multiplier, within floor and ceiling
+        """
+        latency = self._get_percentile(endpoint_name(url), self.percentile)
+        if latency is None:
+            read_timeout = ceiling
+        else:
+            read_timeout = max(self.floor, min(ceiling, latency * self.multiplier))
+        
+        return min(self.connect_timeout, ceiling), read_timeout
+    
+    def get_hedge_delay(self, url: str) -> Optional[float]:
+        """Get delay before a hedged attempt, None until enough samples were seen"""
+        latency = self._get_percentile(endpoint_name(url), API_HEDGE_PERCENTILE)
+        if latency is None:
+            return None
+        return max(API_HEDGE_MIN_DELAY, latency)
+    
+    def _get_percentile(self, name: str, percentile: float) -> Optional[float]:
+        """Get rolling latency percentile for endpoint"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        
+        rank = max(1, int(round(percentile / 100 * len(ordered))))
+        return ordered[min(rank, len(ordered)) - 1]
+    
+    def get_stats(self, ceiling: float = API_TIMEOUT) -> Dict[str, Dict[str, Any]]:
+        """Get current timeouts and hedge delays per endpoint"""
+        with self._lock:
+            names = list(self._samples)
+        
+        stats = {}
+        for name in names:
+            latency = self._get_percentile(name, self.percentile)
+            hedge = self._get_percentile(name, API_HEDGE_PERCENTILE)
+            stats[name] = {
+                "samples": len(self._samples[name]),
+                "latency_percentile": latency,
+                "read_timeout": (
+                    max(self.floor, min(ceiling, latency * self.multiplier))
+                    if latency is not None else ceiling
+                ),
+                "hedge_delay": max(API_HEDGE_MIN_DELAY, hedge) if hedge is not None else None
+            }
+        return stats
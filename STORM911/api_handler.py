@@ -2,25 +2,283 @@
 API Handler for Storm911 - Manages interactions with ReadyMode API
 """
 
+import time
+import random
 import logging
+import threading
 import requests
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Optional, Tuple, Any
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeout,
+    FIRST_COMPLETED,
+    as_completed,
+    wait
+)
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union, Any
 
-from config import API_BASE_URL, API_ENDPOINTS, ERRORS
+from config import (
+    API_BASE_URL,
+    API_ENDPOINTS,
+    API_CAMPAIGN_ID,
+    ERRORS,
+    API_TIMEOUT,
+    API_HEDGE_MAX_WORKERS,
+    ENABLE_API_HEDGING,
+    API_RATE_LIMIT,
+    API_POST_RATE_LIMIT,
+    API_RATE_LIMIT_MAX_WAIT,
+    API_CACHE_DURATION,
+    API_CACHE_MAX_ENTRIES,
+    ENABLE_API_CACHE,
+    CACHE_CLEANUP_INTERVAL,
+    API_RETRY_ATTEMPTS,
+    API_RETRY_BACKOFF,
+    API_RETRY_BACKOFF_MAX,
+    API_RETRY_STATUS_CODES,
+    API_BATCH_SIZE,
+    API_BATCH_MAX_WORKERS,
+    API_LOOKUP_MAX_WORKERS,
+    API_FALLBACK_LOOKUPS,
+    WARMUP_CONNECTIONS,
+    WARMUP_PRELOAD_ENTRIES,
+    API_POOL_MAXSIZE,
+    API_KEEPALIVE_INTERVAL,
+    API_STREAM_CHUNK_SIZE,
+    API_KEEPALIVE_CONNECTIONS
+)
+from lead_cache import LeadCache, normalize_phone
+from phone_index import PhoneIndex, with_phone
+from persistent_cache import PersistentCache
+from circuit_breaker import CircuitBreaker
+from single_flight import SingleFlight
+from api_metrics import APIMetrics, endpoint_name
+from rate_limiter import RateLimiter, SharedPriority, PRIORITY_INTERACTIVE, PRIORITY_BULK
+from adaptive_timeout import AdaptiveTimeout
+from connection_pool import PooledHTTPAdapter, KeepAliveRefresher
+from json_stream import JSONArrayParser
+
+# Methods that are safe to repeat
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+# Request outcomes
+OUTCOME_OK = "ok"
+OUTCOME_CLIENT_ERROR = "client_error"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_SERVER_ERROR = "server_error"
+OUTCOME_CONNECT_TIMEOUT = "connect_timeout"
+OUTCOME_CONNECTION_ERROR = "connection_error"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_ERROR = "error"
+
+# Outcomes that indicate ReadyMode is down
+OUTAGE_OUTCOMES = (
+    OUTCOME_SERVER_ERROR,
+    OUTCOME_CONNECT_TIMEOUT,
+    OUTCOME_CONNECTION_ERROR,
+    OUTCOME_TIMEOUT
+)
+
+# Endpoints counted against the TPI post quota
+POST_ENDPOINTS = ('create_lead', 'post_leads')
+
+# Application field -> TPI post field
+TPI_FIELD_MAP = {
+    'first_name': 'firstName',
+    'last_name': 'lastName',
+    'phone': 'phone',
+    'cell': 'phone3',
+    'address': 'address',
+    'city': 'city',
+    'state': 'state',
+    'zip': 'zip',
+    'email': 'email',
+    'roof_type': 'Custom_1',
+    'roof_age': 'Custom_2',
+    'stories': 'Custom_3',
+    'has_contractor': 'Custom_4',
+    'has_insurance': 'Custom_5',
+    'insurance_company': 'Custom_6',
+    'notes': 'Custom_7',
+    'appointment_date': 'Custom_8',
+    'appointment_confirmed': 'Custom_9'
+}
+
+# Application field -> leadUpdate field label
+LEAD_UPDATE_FIELD_MAP = {
+    'first_name': 'First Name',
+    'last_name': 'Last Name',
+    'address': 'Address',
+    'city': 'City',
+    'state': 'State',
+    'zip': 'Zip Code',
+    'email': 'Email',
+    'roof_type': 'Roof Type',
+    'roof_age': 'Roof Age',
+    'stories': 'How Many Stories',
+    'has_contractor': 'Has Contractor',
+    'has_insurance': 'Has Insurance',
+    'insurance_company': 'Insurance Co. Name',
+    'notes': 'Call Notes',
+    'appointment_date': 'Appointment Date',
+    'appointment_time': 'Appointment Time'
+}
+
+# Fields shown as checkboxes, compared as Yes/No
+CHECKBOX_FIELDS = ('has_contractor', 'has_insurance')
+
+# Errors for which cached data may be served instead
+UNAVAILABLE_ERRORS = (
+    ERRORS['api']['unavailable'],
+    ERRORS['api']['server'],
+    ERRORS['api']['connection'],
+    ERRORS['api']['timeout']
+)
+
+# Errors a later attempt may not get, others are permanent
+RETRYABLE_ERRORS = UNAVAILABLE_ERRORS + (ERRORS['api']['rate_limited'],)
 
 class APIHandler:
-    def __init__(self, api_user: str = None, api_pass: str = None):
+    def __init__(
+        self,
+        api_user: str = None,
+        api_pass: str = None,
+        settings_manager: Any = None
+    ):
         """Initialize API Handler"""
         self.api_user = api_user
         self.api_pass = api_pass
         self.base_url = API_BASE_URL
+        self.settings_manager = settings_manager
+        self.circuit_breaker = CircuitBreaker()
+        self.metrics = APIMetrics()
+        self.timeouts = AdaptiveTimeout()
+        
+        # Pooled keep-alive connections, sized for hedged and batch requests
+        self.pool = PooledHTTPAdapter(
+            pool_maxsize=self._get_setting('api', 'pool_size', API_POOL_MAXSIZE)
+        )
         self.session = requests.Session()
+        self.session.mount('https://', self.pool)
+        self.session.mount('http://', self.pool)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        self.metrics.set_pool_source(self.pool.get_counters)
+        
+        # Refreshes idle connections before the gateway closes them
+        self.keepalive = KeepAliveRefresher(
+            self.pool,
+            lambda: self.warm_connections(API_KEEPALIVE_CONNECTIONS),
+            self._get_setting('api', 'keepalive_interval', API_KEEPALIVE_INTERVAL)
+        )
+        
+        # Request budgets per ReadyMode quota
+        self.rate_limiters = self._create_rate_limiters()
+        
+        # Hedged GETs run both attempts off the calling thread
+        self._hedge_slots = threading.BoundedSemaphore(API_HEDGE_MAX_WORKERS)
+        self._hedge_executor = ThreadPoolExecutor(
+            max_workers=API_HEDGE_MAX_WORKERS * 2,
+            thread_name_prefix="api-hedge"
+        )
+        
+        # Shares one outstanding request between identical lookups
+        self.single_flight = SingleFlight()
+        
+        # Every known number of a lead -> lead ID, and parallel lookups on a miss
+        self.phone_index = PhoneIndex()
+        self._lookup_executor = ThreadPoolExecutor(
+            max_workers=API_LOOKUP_MAX_WORKERS,
+            thread_name_prefix="api-lookup"
+        )
+        
+        # Lead values as last fetched, keyed by phone, for diff updates
+        self._snapshot_lock = threading.Lock()
+        self._snapshots: "OrderedDict[str, Dict]" = OrderedDict()
+        self._max_snapshots = API_CACHE_MAX_ENTRIES
+        
+        # Lead lookup cache, backed by the on-disk tier
+        self.cache = None
+        self.persistent_cache = None
+        if ENABLE_API_CACHE:
+            self.persistent_cache = self._create_persistent_cache()
+            self.cache = LeadCache(
+                ttl=self._get_setting('api', 'cache_duration', API_CACHE_DURATION),
+                max_entries=self._get_setting(
+                    'performance',
+                    'cache_size',
+                    API_CACHE_MAX_ENTRIES
+                ),
+                backing=self.persistent_cache
+            )
+        
+        # Local copy of campaign leads, attached by AppInitializer when enabled
+        self.replica = None
     
     def set_credentials(self, api_user: str, api_pass: str) -> None:
         """Set API credentials"""
         self.api_user = api_user
         self.api_pass = api_pass
+        
+        # Cached results belong to the previous account
+        if self.cache is not None:
+            self.cache.clear()
+        self.phone_index.clear()
+        
+        # Stored replica leads stay, keep their numbers findable
+        if self.replica:
+            self.replica.load_phone_index()
+        with self._snapshot_lock:
+            self._snapshots.clear()
+    
+    def has_credentials(self) -> bool:
+        """Check credentials are set"""
+        return bool(self.api_user and self.api_pass)
+    
+    def is_retryable_error(self, error: Any) -> bool:
+        """Check whether the error of a failed call may clear up on a later call"""
+        return error in RETRYABLE_ERRORS
+    
+    def _create_persistent_cache(self) -> Optional[PersistentCache]:
+        """Create disk cache tier and start its janitor"""
+        try:
+            cache = PersistentCache(
+                cleanup_interval=self._get_setting(
+                    'performance',
+                    'cleanup_interval',
+                    CACHE_CLEANUP_INTERVAL
+                )
+            )
+            cache.start_janitor()
+            return cache
+        except Exception as e:
+            logging.error(f"Error opening persistent cache: {str(e)}")
+            return None
+    
+    def _create_rate_limiters(self) -> Dict[str, RateLimiter]:
+        """Create token buckets for the lookup and post quotas (per hour, 0 disables)"""
+        limiters = {}
+        for quota, key, default in (
+            ('lookup', 'rate_limit', API_RATE_LIMIT),
+            ('post', 'post_rate_limit', API_POST_RATE_LIMIT)
+        ):
+            per_hour = self._get_setting('api', key, default)
+            if per_hour:
+                limiters[quota] = RateLimiter(per_hour / 3600)
+        return limiters
+    
+    def _get_rate_limiter(self, endpoint: str) -> Optional[RateLimiter]:
+        """Get token bucket for the quota endpoint counts against"""
+        quota = 'post' if endpoint_name(endpoint) in POST_ENDPOINTS else 'lookup'
+        return self.rate_limiters.get(quota)
+    
+    def _get_setting(self, category: str, key: str, default: Any) -> Any:
+        """Get setting value, falling back to config default"""
+        if self.settings_manager:
+            value = self.settings_manager.get_setting(category, key)
+            if value is not None:
+                return value
+        return default
     
     def _get_auth_params(self) -> Dict[str, str]:
         """Get authentication parameters"""
@@ -34,56 +292,798 @@ class APIHandler:
         method: str, 
         endpoint: str, 
         params: Optional[Dict] = None, 
-        data: Optional[Dict] = None
+        data: Optional[Dict] = None,
+        form: Optional[Dict] = None,
+        priority: Union[int, SharedPriority] = PRIORITY_INTERACTIVE,
+        stream: bool = False,
+        name: Optional[str] = None
     ) -> Tuple[bool, Any]:
         """
-        Make API request with error handling
+        Make API request with retries and error handling
+        data is sent as JSON, form as form-encoded fields
+        priority decides who waits when the request budget runs low,
+        a SharedPriority may be raised while the request waits
+        stream returns the open response instead of the parsed body,
+        the caller reads and closes it
+        name is the API_ENDPOINTS name metrics and timeouts are kept under,
+        needed where endpoints share a path
         Returns (success, data/error_message) tuple
         """
-        if not self.api_user or not self.api_pass:
+        if not self.has_credentials():
             return False, ERRORS['api']['authentication']
         
-        # Combine authentication params with any additional params
+        # Wait for request budget, interactive requests go first
+        limiter = self._get_rate_limiter(name or endpoint)
+        if limiter and not limiter.acquire(priority, API_RATE_LIMIT_MAX_WAIT):
+            return False, ERRORS['api']['rate_limited']
+        
+        if not self._allow_request(name or endpoint):
+            return False, ERRORS['api']['unavailable']
+        
+        url, request_params = self._build_request(endpoint, params)
+        attempt = 0
+        
+        while True:
+            success, result, outcome, retry_after = self._send_attempt(
+                method,
+                url,
+                request_params,
+                data,
+                form,
+                limiter,
+                stream,
+                name
+            )
+            self._record_outcome(limiter, success, outcome, retry_after)
+            
+            delay = self._get_retry_delay(method, endpoint, attempt, success, outcome, retry_after)
+            if delay is None:
+                return success, result
+            time.sleep(delay)
+            
+            # Retries spend budget too
+            if limiter and not limiter.acquire(priority, API_RATE_LIMIT_MAX_WAIT):
+                return False, result
+            if not self.circuit_breaker.allow_request():
+                return False, result
+            
+            self.metrics.record_retry(name or endpoint)
+            attempt += 1
+    
+    # Request policy shared with AsyncAPIClient, which only differs in how it waits
+    
+    def _allow_request(self, endpoint: str) -> Optional[str]:
+        """
+        Check circuit breaker, fails fast while ReadyMode is down
+        Returns the breaker state the request was let through in, None if rejected
+        """
+        admitted = self.circuit_breaker.admit()
+        if admitted is None:
+            self.metrics.record_rejected(endpoint)
+        return admitted
+    
+    def _build_request(self, endpoint: str, params: Optional[Dict] = None) -> Tuple[str, Dict]:
+        """Get URL and query params, authentication combined with params"""
         request_params = self._get_auth_params()
         if params:
             request_params.update(params)
+        return f"{self.base_url}{endpoint}", request_params
+    
+    def _record_outcome(
+        self,
+        limiter: Optional[RateLimiter],
+        success: bool,
+        outcome: str,
+        retry_after: Optional[float]
+    ) -> None:
+        """Feed attempt outcome to the circuit breaker and rate limiter"""
+        # Only outages count against the breaker
+        if outcome in OUTAGE_OUTCOMES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        
+        # Slow down while ReadyMode throttles, recover gradually
+        if limiter:
+            if outcome == OUTCOME_THROTTLED:
+                limiter.on_throttled(retry_after)
+            elif success:
+                limiter.on_success()
+    
+    def _get_retry_delay(
+        self,
+        method: str,
+        endpoint: str,
+        attempt: int,
+        success: bool,
+        outcome: str,
+        retry_after: Optional[float]
+    ) -> Optional[float]:
+        """Get delay before retrying a request, None if it is not retried"""
+        if success or not self._is_retryable(outcome, method.upper() in IDEMPOTENT_METHODS):
+            return None
+        
+        max_retries = self._get_setting('api', 'retry_attempts', API_RETRY_ATTEMPTS)
+        if attempt >= max_retries:
+            return None
+        
+        delay = self._get_backoff_delay(attempt, retry_after)
+        logging.warning(
+            f"API {method} {endpoint} failed ({outcome}), "
+            f"retrying in {delay:.2f}s ({attempt + 1}/{max_retries})"
+        )
+        return delay
+    
+    def _get_hedge_delay(self, method: str, url: str) -> Optional[float]:
+        """Get seconds after which a hedged attempt is sent, None if not hedged"""
+        if method.upper() != 'GET' or not self._get_setting(
+            'api',
+            'hedge_requests',
+            ENABLE_API_HEDGING
+        ):
+            return None
+        return self.timeouts.get_hedge_delay(url)
+    
+    def _record_response(
+        self,
+        url: str,
+        status: int,
+        elapsed: float,
+        request_size: int,
+        response_size: int
+    ) -> None:
+        """Record metrics and latency of a response"""
+        self.metrics.record_request(
+            url,
+            f"{status // 100}xx",
+            elapsed,
+            request_size,
+            response_size
+        )
+        
+        # Server errors are often fast and would shrink the timeout
+        if status < 500:
+            self.timeouts.record(url, elapsed)
+    
+    def _get_response_error(
+        self,
+        status: int,
+        response: Any
+    ) -> Tuple[bool, Any, str, Optional[float]]:
+        """Get (False, error_message, outcome, retry_after) tuple for a failed response"""
+        if status == 401:
+            return False, ERRORS['api']['authentication'], OUTCOME_CLIENT_ERROR, None
+        elif status == 404:
+            return False, ERRORS['api']['not_found'], OUTCOME_CLIENT_ERROR, None
+        elif status == 429:
+            return (
+                False,
+                ERRORS['api']['rate_limited'],
+                OUTCOME_THROTTLED,
+                self._parse_retry_after(response)
+            )
+        elif status in API_RETRY_STATUS_CODES:
+            return (
+                False,
+                ERRORS['api']['server'],
+                OUTCOME_SERVER_ERROR,
+                self._parse_retry_after(response)
+            )
+        else:
+            return False, ERRORS['api']['rejected'], OUTCOME_CLIENT_ERROR, None
+    
+    def _send_attempt(
+        self,
+        method: str,
+        url: str,
+        params: Dict,
+        data: Optional[Dict],
+        form: Optional[Dict] = None,
+        limiter: Optional[RateLimiter] = None,
+        stream: bool = False,
+        name: Optional[str] = None
+    ) -> Tuple[bool, Any, str, Optional[float]]:
+        """
+        Send request, hedging GETs that run past the endpoint's usual p95
+        The first successful response wins, the slower attempt is left to finish
+        Streamed responses are never hedged, nobody would close the loser
+        """
+        if stream:
+            return self._send_request(method, url, params, data, form, stream, name)
+        
+        hedge_delay = self._get_hedge_delay(method, name or url)
+        
+        # Without a free slot, send on the calling thread as usual
+        if hedge_delay is None or not self._hedge_slots.acquire(blocking=False):
+            return self._send_request(method, url, params, data, form, name=name)
+        
+        send = lambda: self._send_request(method, url, params, data, form, name=name)
+        primary = self._hedge_executor.submit(send)
+        try:
+            result = primary.result(timeout=hedge_delay)
+            self._hedge_slots.release()
+            return result
+        except FutureTimeout:
+            pass
+        
+        # Hedges only use spare request budget
+        if limiter and not limiter.try_acquire(PRIORITY_BULK):
+            result = primary.result()
+            self._hedge_slots.release()
+            return result
+        
+        self.metrics.record_hedge(name or url)
+        hedge = self._hedge_executor.submit(send)
+        
+        # Free the slot once both attempts finished
+        remaining = [2]
+        lock = threading.Lock()
+        
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                self._hedge_slots.release()
         
-        url = f"{self.base_url}{endpoint}"
+        primary.add_done_callback(on_done)
+        hedge.add_done_callback(on_done)
         
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result[0]:
+                    return result
+        return result
+    
+    def _get_timeout(self, url: str) -> Tuple[float, float]:
+        """Get (connect, read) timeout for request"""
+        return self.timeouts.get_timeout(
+            url,
+            self._get_setting('api', 'timeout', API_TIMEOUT)
+        )
+    
+    def _send_request(
+        self,
+        method: str,
+        url: str,
+        params: Dict,
+        data: Optional[Dict],
+        form: Optional[Dict] = None,
+        stream: bool = False,
+        name: Optional[str] = None
+    ) -> Tuple[bool, Any, str, Optional[float]]:
+        """
+        Send a single API request
+        stream returns the response once its headers arrived, see _iter_stream
+        Returns (success, data/error_message, outcome, retry_after) tuple
+        """
+        key = name or url
+        response = None
+        started = time.perf_counter()
         try:
             response = self.session.request(
                 method=method,
                 url=url,
-                params=request_params,
+                params=params,
                 json=data,
-                timeout=30
+                data=form,
+                timeout=self._get_timeout(key),
+                stream=stream
             )
+            elapsed = time.perf_counter() - started
             
             # Log request (excluding sensitive data)
             logging.debug(f"API Request: {method} {url}")
             logging.debug(f"Status Code: {response.status_code}")
             
+            # Body is still downloading, _iter_stream records it once read
+            if stream and response.ok:
+                self.timeouts.record(key, elapsed)
+                return True, response, OUTCOME_OK, None
+            
+            self._record_response(
+                key,
+                response.status_code,
+                elapsed,
+                len(response.request.body or b''),
+                len(response.content)
+            )
+            
             if response.ok:
-                return True, response.json()
-            elif response.status_code == 401:
-                return False, ERRORS['api']['authentication']
-            elif response.status_code == 404:
-                return False, ERRORS['api']['not_found']
-            else:
-                return False, ERRORS['api']['server']
+                return True, response.json(), OUTCOME_OK, None
+            return self._get_response_error(response.status_code, response)
                 
+        except requests.exceptions.ConnectTimeout:
+            outcome, error = OUTCOME_CONNECT_TIMEOUT, ERRORS['api']['connection']
         except requests.exceptions.ConnectionError:
-            return False, ERRORS['api']['connection']
+            outcome, error = OUTCOME_CONNECTION_ERROR, ERRORS['api']['connection']
         except requests.exceptions.Timeout:
-            return False, "Request timed out. Please try again."
+            outcome, error = OUTCOME_TIMEOUT, ERRORS['api']['timeout']
+            # Let a read timeout widen the window it was derived from
+            self.timeouts.record(key, time.perf_counter() - started)
         except Exception as e:
             logging.error(f"API request error: {str(e)}")
-            return False, str(e)
+            outcome, error = OUTCOME_ERROR, str(e)
+        
+        # Attempts that got a response were recorded above
+        if response is None:
+            self.metrics.record_request(key, outcome, time.perf_counter() - started)
+        
+        return False, error, outcome, None
+    
+    def _is_retryable(self, outcome: str, idempotent: bool) -> bool:
+        """Check whether a failed request may be sent again"""
+        # Request never reached the server
+        if outcome in (OUTCOME_THROTTLED, OUTCOME_CONNECT_TIMEOUT):
+            return True
+        
+        # Request may have been processed, only repeat if safe to
+        if outcome in (OUTCOME_SERVER_ERROR, OUTCOME_CONNECTION_ERROR, OUTCOME_TIMEOUT):
+            return idempotent
+        
+        return False
+    
+    def _get_backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Get delay before next attempt (exponential backoff with full jitter)"""
+        ceiling = min(API_RETRY_BACKOFF_MAX, API_RETRY_BACKOFF * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        
+        # Honor server supplied delay
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, API_RETRY_BACKOFF_MAX))
+        
+        return delay
+    
+    def _parse_retry_after(self, response: Any) -> Optional[float]:
+        """Parse Retry-After header in seconds (requests or aiohttp response)"""
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
     
-    def search_lead(self, phone: str) -> Tuple[bool, Any]:
+    def search_lead(
+        self,
+        phone: str,
+        use_cache: bool = True,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Tuple[bool, Any]:
         """Search for lead by phone number"""
+        phone = normalize_phone(phone) or phone
+        
+        if use_cache:
+            local = self._search_local(phone)
+            if local is not None:
+                return True, local
+        
+        # One request per number, an agent joining a background lookup raises its priority
+        shared = SharedPriority(priority)
+        success, result = self.single_flight.do(
+            ('search_lead', phone),
+            lambda: self._fan_out_search(phone, shared),
+            shared
+        )
+        
+        return self._finish_search(phone, success, result)
+    
+    def _search_local(self, phone: str) -> Optional[Any]:
+        """Get lead from cache or replica for search_lead, None to ask ReadyMode"""
+        # Serve repeat lookups from cache
+        if self.cache is not None:
+            cached = self.cache.get(phone)
+            if cached is None:
+                # Alternate numbers resolve through the phone index
+                cached = self._get_cached_by_index(phone)
+            if cached is not None:
+                self._record_snapshot(phone, cached)
+                return cached
+        
+        # Answer from the local replica and refresh it in the background
+        if self.replica:
+            stored = self.replica.find_by_phone(phone)
+            if stored:
+                self._record_snapshot(phone, stored)
+                self.replica.refresh_async(phone)
+                return stored
+        
+        return None
+    
+    def _fan_out_search(
+        self,
+        phone: str,
+        priority: Union[int, SharedPriority]
+    ) -> Tuple[bool, Any]:
+        """
+        Look up phone number, trying the other API routes if the TPI search misses
+        A hit costs one request of quota, a miss up to API_FALLBACK_LOOKUPS more,
+        run in parallel and merged by lead ID
+        """
         endpoint = API_ENDPOINTS['search_lead'].format(phone=phone)
-        return self._make_request('GET', endpoint)
+        success, result = self._make_request('GET', endpoint, priority=priority)
+        
+        endpoints = self._get_fallback_endpoints(phone, success, result)
+        if not endpoints:
+            return success, result
+        
+        futures = [
+            self._lookup_executor.submit(self._make_request, 'GET', endpoint, priority=priority)
+            for endpoint in endpoints
+        ]
+        return self._merge_lookups([(success, result)] + [future.result() for future in futures])
+    
+    def _get_fallback_endpoints(self, phone: str, success: bool, result: Any) -> List[str]:
+        """
+        Get endpoints to look up phone number on once the TPI search found nothing
+        The campaign leadUpdate search goes first, then gets of leads indexed
+        under the number. Other failures are not retried this way
+        """
+        if success or result != ERRORS['api']['not_found']:
+            return []
+        
+        endpoints = []
+        campaign_id = self.get_campaign_id()
+        if campaign_id:
+            endpoints.append(
+                API_ENDPOINTS['lead_update'].format(campaign_id=campaign_id, phone=phone)
+            )
+        for lead_id in self.phone_index.lookup(phone):
+            endpoints.append(API_ENDPOINTS['get_lead'].format(id=lead_id))
+        
+        limit = self._get_setting('api', 'fallback_lookups', API_FALLBACK_LOOKUPS)
+        return endpoints[:max(0, limit)]
+    
+    def _merge_lookups(self, results: List[Tuple[bool, Any]]) -> Tuple[bool, Any]:
+        """
+        Merge parallel lookup results into one lead list, de-duplicated by lead ID
+        Fails with the first error other than not found if no lead was found
+        """
+        leads = []
+        seen = set()
+        error = None
+        
+        for success, result in results:
+            if not success:
+                if error is None and result != ERRORS['api']['not_found']:
+                    error = result
+                continue
+            
+            for lead in (result if isinstance(result, list) else [result]):
+                if not isinstance(lead, dict):
+                    continue
+                lead_id = self._extract_lead_id(lead)
+                if lead_id in seen:
+                    continue
+                # Leads without an ID are likely duplicates of ones already found
+                if lead_id is None and leads:
+                    continue
+                if lead_id:
+                    seen.add(lead_id)
+                leads.append(lead)
+        
+        if leads:
+            return True, leads
+        return False, error or ERRORS['api']['not_found']
+    
+    def _get_cached_by_index(self, phone: str) -> Optional[List[Dict]]:
+        """Get cached leads listing phone as any of their numbers, None unless all are cached"""
+        leads = []
+        for lead_id in self.phone_index.lookup(phone):
+            lead = self._select_lead(self.cache.get_lead(lead_id), lead_id)
+            if lead is None:
+                return None
+            leads.append(lead)
+        
+        return leads or None
+    
+    def _select_lead(self, result: Any, lead_id: str) -> Optional[Dict]:
+        """Get lead with lead_id from a lookup result"""
+        for lead in (result if isinstance(result, list) else [result]):
+            if isinstance(lead, dict) and self._extract_lead_id(lead) == str(lead_id):
+                return lead
+        return None
+    
+    def _index_leads(self, result: Any, phone: Optional[str] = None) -> None:
+        """
+        Index every phone number of the leads in a lookup result
+        phone is the number searched, indexed for leads that lack one
+        """
+        for lead in (result if isinstance(result, list) else [result]):
+            if isinstance(lead, dict):
+                self.phone_index.add_lead(with_phone(lead, phone), self._extract_lead_id(lead))
+    
+    def get_local_lead(self, phone: str) -> Tuple[Optional[Any], bool]:
+        """
+        Get locally held copy of a lead without contacting ReadyMode, and whether it is fresh
+        A copy past its TTL is stale, revalidate it with search_lead(use_cache=False).
+        Reads the disk cache and replica, so call it off the Tk thread
+        """
+        phone = normalize_phone(phone) or phone
+        
+        local = self._search_local(phone)
+        if local is not None:
+            return local, True
+        
+        stale = self.cache.get_stale(phone) if self.cache is not None else None
+        if stale is not None:
+            self._record_snapshot(phone, stale)
+        return stale, False
+    
+    def _finish_search(self, phone: str, success: bool, result: Any) -> Tuple[bool, Any]:
+        """Cache search result, or fall back to cached data during outages"""
+        if success:
+            self._record_snapshot(phone, result)
+            self._index_leads(result, phone)
+            if self.replica:
+                self.replica.upsert_result(result, phone)
+        
+        if success and self.cache is not None:
+            self.cache.set(phone, result, self._extract_lead_id(result))
+        elif self.cache is not None and result in UNAVAILABLE_ERRORS:
+            # Serve last known data while ReadyMode is down
+            stale = self.cache.get_stale(phone)
+            if stale is not None:
+                logging.warning(f"ReadyMode unavailable, serving cached lead for {phone}")
+                return True, stale
+        
+        return success, result
+    
+    def get_lead(
+        self,
+        item_id: str,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Tuple[bool, Any]:
+        """Get lead by ReadyMode item ID"""
+        endpoint = API_ENDPOINTS['get_lead'].format(id=item_id)
+        shared = SharedPriority(priority)
+        success, result = self.single_flight.do(
+            ('get_lead', str(item_id)),
+            lambda: self._make_request('GET', endpoint, priority=shared),
+            shared
+        )
+        
+        if success:
+            self._index_leads(result)
+        
+        return success, result
+    
+    def search_lead_updates(
+        self,
+        campaign_id: str,
+        phone: str,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Tuple[bool, Any]:
+        """Get all leads in campaign matching phone number (leadUpdate API)"""
+        phone = normalize_phone(phone) or phone
+        endpoint = API_ENDPOINTS['lead_update'].format(
+            campaign_id=campaign_id,
+            phone=phone
+        )
+        shared = SharedPriority(priority)
+        return self.single_flight.do(
+            ('lead_update', str(campaign_id), phone),
+            lambda: self._make_request('GET', endpoint, priority=shared),
+            shared
+        )
+    
+    def iter_lead_updates(
+        self,
+        campaign_id: str,
+        phone: str,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Iterator[Tuple[bool, Any]]:
+        """
+        Stream leads in campaign matching phone number (leadUpdate API)
+        Leads are parsed as the response downloads, so the first ones arrive
+        early and memory stays flat however many leads match
+        Yields (True, lead) per lead, then (False, error_message) if the
+        request or the download fails
+        """
+        phone = normalize_phone(phone) or phone
+        endpoint = API_ENDPOINTS['lead_update'].format(
+            campaign_id=campaign_id,
+            phone=phone
+        )
+        success, response = self._make_request(
+            'GET',
+            endpoint,
+            priority=priority,
+            stream=True,
+            name='lead_update'
+        )
+        if not success:
+            yield False, response
+            return
+        
+        for success, lead in self._iter_stream(response, 'lead_update'):
+            if success and isinstance(lead, dict):
+                self.phone_index.add_lead(with_phone(lead, phone), self._extract_lead_id(lead))
+            yield success, lead
+    
+    def _iter_stream(self, response: requests.Response, key: str) -> Iterator[Tuple[bool, Any]]:
+        """
+        Parse streamed JSON array response element by element
+        Records the request under key, the name or URL it was sent with,
+        once the body was read. Closes the response even if the caller stops early
+        """
+        parser = JSONArrayParser(response.encoding or 'utf-8')
+        started = time.perf_counter()
+        received = 0
+        outcome = f"{response.status_code // 100}xx"
+        
+        try:
+            for chunk in response.iter_content(API_STREAM_CHUNK_SIZE):
+                received += len(chunk)
+                for element in parser.feed(chunk):
+                    yield True, element
+            for element in parser.close():
+                yield True, element
+        except ValueError as e:
+            logging.error(f"Error parsing streamed response: {str(e)}")
+            outcome = OUTCOME_ERROR
+            yield False, ERRORS['api']['server']
+        except requests.exceptions.Timeout:
+            outcome = OUTCOME_TIMEOUT
+            yield False, ERRORS['api']['timeout']
+        except requests.exceptions.RequestException:
+            outcome = OUTCOME_CONNECTION_ERROR
+            yield False, ERRORS['api']['connection']
+        finally:
+            response.close()
+            self.metrics.record_request(
+                key,
+                outcome,
+                response.elapsed.total_seconds() + time.perf_counter() - started,
+                len(response.request.body or b''),
+                received
+            )
+    
+    def update_lead_fields(
+        self,
+        campaign_id: str,
+        phone: str,
+        fields: Dict
+    ) -> Tuple[bool, Any]:
+        """
+        Update leads in campaign matching phone number (leadUpdate API)
+        fields are keyed by ReadyMode field label, e.g. 'First Name'
+        """
+        endpoint = API_ENDPOINTS['lead_update'].format(
+            campaign_id=campaign_id,
+            phone=normalize_phone(phone) or phone
+        )
+        success, result = self._make_request('POST', endpoint, data=fields)
+        
+        if success:
+            self._invalidate_lead(None, phone, result)
+        
+        return success, result
+    
+    def get_campaign_id(self) -> str:
+        """Get campaign used for leadUpdate writes"""
+        return str(self._get_setting('api', 'campaign_id', API_CAMPAIGN_ID) or '')
+    
+    def update_lead_diff(
+        self,
+        phone: str,
+        current_values: Dict,
+        extra_fields: Optional[Dict] = None,
+        writer: Any = None
+    ) -> Tuple[bool, Any]:
+        """
+        Send only fields changed since the lead was fetched (leadUpdate API)
+        extra_fields are keyed by field label and always sent
+        writer defaults to this handler, an Outbox may be passed to queue the write
+        Skips the request when nothing changed
+        """
+        campaign_id = self.get_campaign_id()
+        if not campaign_id:
+            return False, "No campaign configured for lead updates"
+        
+        phone = normalize_phone(phone) or phone
+        changes = self.diff_lead_fields(phone, current_values)
+        
+        fields = self.format_lead_update_fields(changes)
+        if extra_fields:
+            fields.update(extra_fields)
+        
+        if not fields:
+            logging.debug(f"No lead changes for {phone}, skipping update")
+            return True, "No changes to update"
+        
+        success, result = (writer or self).update_lead_fields(campaign_id, phone, fields)
+        
+        # Later diffs are taken against what was just sent
+        if success and changes:
+            with self._snapshot_lock:
+                snapshot = self._snapshots.get(phone)
+                if snapshot is not None:
+                    snapshot.update(changes)
+        
+        return success, result
+    
+    def diff_lead_fields(self, phone: str, current_values: Dict) -> Dict:
+        """
+        Get fields whose value differs from the fetched lead
+        Without a snapshot every non-empty field counts as changed
+        """
+        phone = normalize_phone(phone) or phone
+        with self._snapshot_lock:
+            snapshot = self._snapshots.get(phone)
+            snapshot = dict(snapshot) if snapshot is not None else None
+        
+        changes = {}
+        for field in LEAD_UPDATE_FIELD_MAP:
+            if field not in current_values:
+                continue
+            
+            value = self._normalize_field_value(field, current_values[field])
+            if snapshot is None:
+                if value and not (field in CHECKBOX_FIELDS and value == 'No'):
+                    changes[field] = value
+            elif value != snapshot.get(field):
+                changes[field] = value
+        
+        return changes
+    
+    def get_lead_snapshot(self, phone: str) -> Optional[Dict]:
+        """Get lead values as last fetched"""
+        phone = normalize_phone(phone) or phone
+        with self._snapshot_lock:
+            snapshot = self._snapshots.get(phone)
+            return dict(snapshot) if snapshot is not None else None
+    
+    def lead_to_fields(self, result: Any) -> Optional[Dict]:
+        """Get application field values of the first lead in a lookup result"""
+        if isinstance(result, list):
+            result = result[0] if result else None
+        if not isinstance(result, dict):
+            return None
+        
+        # leadUpdate results are keyed by label, TPI results by field name
+        if any(label in result for label in LEAD_UPDATE_FIELD_MAP.values()):
+            return {
+                field: result.get(label, '')
+                for field, label in LEAD_UPDATE_FIELD_MAP.items()
+            }
+        return self.parse_lead_data(result)
+    
+    def _record_snapshot(self, phone: str, result: Any) -> None:
+        """Keep fetched lead values for later diff updates"""
+        values = self.lead_to_fields(result)
+        if values is None:
+            return
+        
+        snapshot = {
+            field: self._normalize_field_value(field, values.get(field, ''))
+            for field in LEAD_UPDATE_FIELD_MAP
+        }
+        
+        with self._snapshot_lock:
+            self._snapshots[phone] = snapshot
+            self._snapshots.move_to_end(phone)
+            while len(self._snapshots) > self._max_snapshots:
+                self._snapshots.popitem(last=False)
+    
+    def _normalize_field_value(self, field: str, value: Any) -> str:
+        """Normalize field value for comparison and submission"""
+        if field in CHECKBOX_FIELDS:
+            if isinstance(value, str):
+                value = value.strip().lower() in ('yes', 'true', '1', 'y')
+            return 'Yes' if value else 'No'
+        
+        if value is None:
+            return ''
+        return str(value).strip()
+    
+    def format_lead_update_fields(self, data: Dict) -> Dict:
+        """Format application fields as leadUpdate field labels"""
+        return {
+            LEAD_UPDATE_FIELD_MAP[field]: value
+            for field, value in data.items()
+            if field in LEAD_UPDATE_FIELD_MAP
+        }
     
     def create_lead(self, lead_data: Dict) -> Tuple[bool, Any]:
         """Create new lead"""
@@ -92,7 +1092,13 @@ class APIHandler:
         # Add timestamp
         lead_data['created_at'] = datetime.now().isoformat()
         
-        return self._make_request('POST', endpoint, data=lead_data)
+        success, result = self._make_request('POST', endpoint, data=lead_data)
+        
+        # Earlier lookups for this number are now out of date
+        if success:
+            self._invalidate_lead(None, lead_data.get('phone'))
+        
+        return success, result
     
     def update_lead(self, lead_id: str, lead_data: Dict) -> Tuple[bool, Any]:
         """Update existing lead"""
@@ -101,23 +1107,354 @@ class APIHandler:
         # Add timestamp
         lead_data['updated_at'] = datetime.now().isoformat()
         
-        return self._make_request('PUT', endpoint, data=lead_data)
+        success, result = self._make_request('PUT', endpoint, data=lead_data)
+        
+        # Drop cached copies of this lead
+        if success:
+            self._invalidate_lead(lead_id, lead_data.get('phone'))
+        
+        return success, result
+    
+    def _invalidate_lead(
+        self,
+        lead_id: Optional[str],
+        phone: Optional[str] = None,
+        result: Any = None
+    ) -> None:
+        """Drop cached copies of a lead after a successful write"""
+        if self.replica and phone:
+            self.replica.refresh_async(phone)
+        
+        if self.cache is None:
+            return
+        
+        if result is not None:
+            lead_id = lead_id or self._extract_lead_id(result)
+        if lead_id:
+            self.cache.invalidate_lead(lead_id)
+        if phone:
+            self.cache.invalidate(phone)
+    
+    def create_leads_batch(
+        self,
+        leads: List[Dict],
+        batch_size: int = API_BATCH_SIZE,
+        max_workers: int = API_BATCH_MAX_WORKERS
+    ) -> List[Dict]:
+        """
+        Post leads through the TPI form in indexed lead[N] batches
+        Returns one result per lead, in input order:
+        {'index', 'success', 'lead_id', 'error', 'field'}
+        Failed rows can be re-posted on their own using 'index'
+        """
+        results: List[Optional[Dict]] = [None] * len(leads)
+        chunks = [
+            (start, leads[start:start + batch_size])
+            for start in range(0, len(leads), max(1, batch_size))
+        ]
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(self._post_lead_chunk, chunk): start
+                for start, chunk in chunks
+            }
+            
+            for future in as_completed(futures):
+                start = futures[future]
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    logging.error(f"Error posting lead batch at {start}: {str(e)}")
+                    size = len(leads[start:start + batch_size])
+                    chunk_results = [
+                        self._batch_row_result(False, error=str(e))
+                        for _ in range(size)
+                    ]
+                
+                for offset, row in enumerate(chunk_results):
+                    row['index'] = start + offset
+                    results[start + offset] = row
+        
+        # Earlier lookups for posted numbers are now out of date
+        if self.cache is not None:
+            for lead, row in zip(leads, results):
+                if row['success'] and lead.get('phone'):
+                    self.cache.invalidate(lead['phone'])
+        
+        failed = sum(1 for row in results if not row['success'])
+        logging.info(f"Posted {len(leads)} leads in {len(chunks)} batches, {failed} failed")
+        
+        return results
+    
+    def _post_lead_chunk(self, chunk: List[Dict]) -> List[Dict]:
+        """Post a single chunk of leads and parse per-row results"""
+        form = {}
+        for index, lead in enumerate(chunk):
+            for field, value in self.format_tpi_lead(lead).items():
+                form[f"lead[{index}][{field}]"] = value
+        
+        success, result = self._make_request(
+            'POST',
+            API_ENDPOINTS['post_leads'],
+            form=form,
+            priority=PRIORITY_BULK,
+            name='post_leads'
+        )
+        
+        if not success:
+            return [self._batch_row_result(False, error=result) for _ in chunk]
+        
+        return [
+            self._parse_batch_row(result, index)
+            for index in range(len(chunk))
+        ]
+    
+    def _parse_batch_row(self, result: Any, index: int) -> Dict:
+        """Parse indexed TPI post result for a single row"""
+        row = result.get(str(index)) if isinstance(result, dict) else None
+        if not isinstance(row, dict):
+            return self._batch_row_result(False, error="No result returned for lead")
+        
+        if row.get('Success') and row.get('Accepted', True):
+            return self._batch_row_result(True, lead_id=row.get('xencall_leadId'))
+        
+        return self._batch_row_result(
+            False,
+            error=row.get('Error', 'Lead was not accepted'),
+            field=row.get('Field')
+        )
+    
+    def _batch_row_result(
+        self,
+        success: bool,
+        lead_id: Optional[str] = None,
+        error: Optional[str] = None,
+        field: Optional[str] = None
+    ) -> Dict:
+        """Build per-row batch result"""
+        return {
+            'index': None,
+            'success': success,
+            'lead_id': lead_id,
+            'error': error,
+            'field': field
+        }
+    
+    def get_leads_batch(
+        self,
+        item_ids: List[str],
+        max_workers: int = API_BATCH_MAX_WORKERS,
+        on_result: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        """
+        Get leads by ReadyMode item ID in parallel at bulk priority
+        Returns one result per ID, in input order: {'index', 'item_id', 'success', 'lead', 'error'}
+        on_result is called with each result as it completes
+        """
+        results: List[Optional[Dict]] = [None] * len(item_ids)
+        
+        for row in self.iter_leads_batch(item_ids, max_workers):
+            results[row['index']] = row
+            if on_result:
+                try:
+                    on_result(row)
+                except Exception as e:
+                    logging.error(f"Error handling batch lead {row['item_id']}: {str(e)}")
+        
+        failed = sum(1 for row in results if not row['success'])
+        logging.info(f"Fetched {len(item_ids)} leads by ID, {failed} failed")
+        
+        return results
+    
+    def iter_leads_batch(
+        self,
+        item_ids: List[str],
+        max_workers: int = API_BATCH_MAX_WORKERS
+    ) -> Iterator[Dict]:
+        """
+        Yield lead results in completion order, at most max_workers requests in flight
+        Closing the iterator early cancels IDs not yet requested
+        """
+        max_workers = max(1, max_workers)
+        pending = iter(enumerate(item_ids))
+        
+        with ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="api-batch-get"
+        ) as executor:
+            in_flight = {}
+            
+            def submit_next() -> None:
+                for index, item_id in pending:
+                    future = executor.submit(self.get_lead, str(item_id), PRIORITY_BULK)
+                    in_flight[future] = (index, str(item_id))
+                    return
+            
+            for _ in range(max_workers):
+                submit_next()
+            
+            try:
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, item_id = in_flight.pop(future)
+                        submit_next()
+                        yield self._batch_get_result(index, item_id, future)
+            finally:
+                for future in in_flight:
+                    future.cancel()
+    
+    def _batch_get_result(self, index: int, item_id: str, future: Any) -> Dict:
+        """Build per-ID batch get result, caching the lead on success"""
+        try:
+            success, result = future.result()
+        except Exception as e:
+            logging.error(f"Error getting lead {item_id}: {str(e)}")
+            success, result = False, str(e)
+        
+        if success and not isinstance(result, dict):
+            success, result = False, "Unexpected lead format"
+        
+        row = {
+            'index': index,
+            'item_id': item_id,
+            'success': success,
+            'lead': result if success else None,
+            'error': None if success else result
+        }
+        
+        if success:
+            self._cache_fetched_lead(result)
+        
+        return row
+    
+    def _cache_fetched_lead(self, lead: Dict) -> None:
+        """Cache lead fetched by ID under its primary number, unless a search result is cached"""
+        if self.replica:
+            self.replica.upsert(lead)
+        
+        phone = normalize_phone(lead.get('phone'))
+        if self.cache is None or not phone:
+            return
+        
+        if self.cache.get(phone) is None:
+            self.cache.set(phone, [lead], self._extract_lead_id(lead))
+    
+    def _extract_lead_id(self, result: Any) -> Optional[str]:
+        """Extract lead ID from API lookup result"""
+        if isinstance(result, list):
+            result = result[0] if result else None
+        if not isinstance(result, dict):
+            return None
+        
+        for key in ('id', 'Id', 'lead_id', 'leadId', 'xencall_leadId'):
+            if result.get(key):
+                return str(result[key])
+        return None
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get request coalescing statistics"""
+        return self.single_flight.get_stats()
+    
+    def get_circuit_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker statistics"""
+        return self.circuit_breaker.get_stats()
+    
+    def get_metrics(self, window: bool = False) -> Dict[str, Any]:
+        """Get request latency and error metrics per endpoint"""
+        return self.metrics.snapshot(window)
+    
+    def get_timeout_stats(self) -> Dict[str, Any]:
+        """Get adaptive timeouts and hedge delays per endpoint"""
+        return self.timeouts.get_stats(self._get_setting('api', 'timeout', API_TIMEOUT))
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get request budget, queue depth and wait times per quota"""
+        return {
+            quota: limiter.get_stats()
+            for quota, limiter in self.rate_limiters.items()
+        }
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection reuse and idle connections per host"""
+        stats = self.pool.get_stats()
+        stats['keepalive_pings'] = self.keepalive.pings
+        return stats
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get lead cache statistics"""
+        if self.cache is None:
+            return {}
+        
+        stats = self.cache.get_stats()
+        if self.persistent_cache:
+            stats['disk'] = self.persistent_cache.get_stats()
+        return stats
     
     def validate_credentials(self) -> Tuple[bool, str]:
         """
         Validate API credentials
         Returns (is_valid, message) tuple
         """
-        # Try a simple API call to validate credentials
-        success, result = self.search_lead('0000000000')
-        
-        if success:
+        # Try a simple API call to validate credentials, bypassing cache and fan-out
+        endpoint = API_ENDPOINTS['search_lead'].format(phone='0000000000')
+        success, result = self._make_request('GET', endpoint)
+        return self._interpret_validation(success, result)
+    
+    def _interpret_validation(self, success: bool, result: Any) -> Tuple[bool, str]:
+        """Map validation search result to (is_valid, message) tuple"""
+        # A lookup miss still means ReadyMode accepted the credentials
+        if success or result == ERRORS['api']['not_found']:
             return True, "API credentials validated successfully"
         elif result == ERRORS['api']['authentication']:
             return False, "Invalid API credentials"
         else:
             return False, "Could not validate API credentials"
     
+    def warm_connections(self, count: int = WARMUP_CONNECTIONS) -> int:
+        """
+        Open pooled keep-alive connections to the ReadyMode gateway
+        Requests the gateway root, which does not count against the API quota
+        Returns number of connections opened
+        """
+        def open_connection() -> bool:
+            try:
+                self.session.head(
+                    self.base_url,
+                    timeout=self._get_timeout(self.base_url),
+                    allow_redirects=False
+                )
+                return True
+            except requests.exceptions.RequestException as e:
+                logging.warning(f"Could not open connection to {self.base_url}: {str(e)}")
+                return False
+        
+        # Concurrent requests each take their own connection from the pool
+        with ThreadPoolExecutor(max_workers=max(1, count)) as executor:
+            return sum(executor.map(lambda _: open_connection(), range(count)))
+    
+    def preload_cache(self, limit: int = WARMUP_PRELOAD_ENTRIES) -> int:
+        """Load recent lookups from the disk cache and index their numbers"""
+        if self.cache is None:
+            return 0
+        
+        entries = self.cache.preload(limit)
+        for phone, value in entries:
+            self._index_leads(value, phone)
+        return len(entries)
+    
+    def prefetch_leads(self, phones: List[str]) -> int:
+        """Fetch leads not held fresh locally in the background, returns number fetched"""
+        fetched = 0
+        for phone in phones:
+            _, fresh = self.get_local_lead(phone)
+            if fresh:
+                continue
+            success, _ = self.search_lead(phone, use_cache=False, priority=PRIORITY_BULK)
+            if success:
+                fetched += 1
+        return fetched
+    
     def format_lead_data(self, data: Dict) -> Dict:
         """Format lead data for API submission"""
         formatted = {
@@ -128,7 +1465,7 @@ class APIHandler:
             'state': data.get('state', ''),
             'zip': data.get('zip', ''),
             'phone': data.get('phone', ''),
-            'phone2': data.get('cell', ''),
+            'phone3': data.get('cell', ''),
             'email': data.get('email', ''),
             'notes': data.get('notes', ''),
             'appointmentDate': data.get('appointment_date', ''),
@@ -145,9 +1482,30 @@ class APIHandler:
         # Remove empty values
         return {k: v for k, v in formatted.items() if v}
     
+    def format_tpi_lead(self, data: Dict) -> Dict:
+        """Format lead data for the TPI post form (without lead[N] prefix)"""
+        formatted = {
+            tpi_field: data.get(field, '')
+            for field, tpi_field in TPI_FIELD_MAP.items()
+        }
+        
+        # Alternate numbers are passed through as-is
+        for index in range(1, 10):
+            key = f'phone{index}'
+            if data.get(key):
+                formatted[key] = data[key]
+        
+        # Checkbox values
+        for key, value in formatted.items():
+            if isinstance(value, bool):
+                formatted[key] = 'Yes' if value else 'No'
+        
+        # Remove empty values
+        return {k: v for k, v in formatted.items() if v}
+    
     def parse_lead_data(self, api_data: Dict) -> Dict:
         """Parse API lead data into application format"""
-        return {
+        lead = {
             'first_name': api_data.get('firstName', ''),
             'last_name': api_data.get('lastName', ''),
             'address': api_data.get('address', ''),
@@ -155,7 +1513,7 @@ class APIHandler:
             'state': api_data.get('state', ''),
             'zip': api_data.get('zip', ''),
             'phone': api_data.get('phone', ''),
-            'cell': api_data.get('phone2', ''),
+            'cell': api_data.get('phone3', ''),
             'email': api_data.get('email', ''),
             'notes': api_data.get('notes', ''),
             'appointment_date': api_data.get('appointmentDate', ''),
@@ -168,7 +1526,22 @@ class APIHandler:
             'is_homeowner': api_data.get('isHomeowner', ''),
             'has_contractor': api_data.get('hasContractor', '')
         }
+        
+        # Alternate numbers are passed through as-is
+        for index in range(1, 10):
+            key = f'phone{index}'
+            if api_data.get(key):
+                lead[key] = api_data[key]
+        
+        return lead
     
     def close(self):
         """Close API session"""
+        self.keepalive.stop()
         self.session.close()
+        self.metrics.stop_dumper()
+        self._hedge_executor.shutdown(wait=False)
+        self._lookup_executor.shutdown(wait=False)
+        
+        if self.persistent_cache:
+            self.persistent_cache.close()
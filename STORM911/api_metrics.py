@@ -0,0 +1,388 @@
+"""
+API Metrics for Storm911
+Records ReadyMode request latency histograms and error counters per endpoint
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, Optional
+
+from config import (
+    API_ENDPOINTS,
+    LOGS_DIR,
+    MAX_LOG_SIZE,
+    LOG_BACKUP_COUNT,
+    API_METRICS_DUMP_INTERVAL
+)
+
+# Histogram precision, 2**SUB_BUCKET_BITS linear buckets per power of two (~3%)
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+
+# Endpoint templates as URL suffix patterns, most specific first
+ENDPOINT_PATTERNS = sorted(
+    (
+        (name, re.compile(re.sub(r"\\{[^}]+\\}", "[^/]+", re.escape(path)) + "/?$"))
+        for name, path in API_ENDPOINTS.items()
+    ),
+    key=lambda item: -len(item[1].pattern)
+)
+
+# Status classes and failure outcomes counted as errors, 4xx answers are reported apart
+ERROR_STATUSES = ("5xx", "timeout", "connect_timeout", "connection_error", "error")
+CLIENT_ERROR_STATUS = "4xx"
+
+def endpoint_name(url: str) -> str:
+    """
+    Map request URL to its API_ENDPOINTS name, phone numbers and IDs removed
+    A URL shared by several endpoints maps to the first, an endpoint name maps to itself
+    """
+    if url in API_ENDPOINTS:
+        return url
+    for name, pattern in ENDPOINT_PATTERNS:
+        if pattern.search(url):
+            return name
+    return "other"
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in microseconds (HDR-style)"""
+    __slots__ = ("counts", "count", "total", "min", "max")
+    
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+    
+    def record(self, value: int) -> None:
+        """Record a single value"""
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+    
+    def percentile(self, pct: float) -> int:
+        """Get value at percentile (highest value equivalent to its bucket)"""
+        if not self.count:
+            return 0
+        
+        target = max(1, int(round(pct / 100 * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+    
+    def mean(self) -> float:
+        """Get mean value"""
+        return self.total / self.count if self.count else 0.0
+    
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's values"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        
+        if other.count:
+            if not self.count or other.min < self.min:
+                self.min = other.min
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+    
+    def _index(self, value: int) -> int:
+        """Get bucket index for value"""
+        if value < SUB_BUCKET_COUNT:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + (value >> shift) - SUB_BUCKET_HALF
+    
+    def _upper_bound(self, index: int) -> int:
+        """Get highest value that maps to bucket index"""
+        if index < SUB_BUCKET_COUNT:
+            return index
+        shift, offset = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF)
+        shift += 1
+        return ((offset + SUB_BUCKET_HALF + 1) << shift) - 1
+
+class _EndpointStats:
+    """Histograms and counters for a single endpoint"""
+    __slots__ = (
+        "histograms",
+        "retries",
+        "hedges",
+        "timeouts",
+        "rejected",
+        "bytes_sent",
+        "bytes_received"
+    )
+    
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.retries = 0
+        self.hedges = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+class APIMetrics:
+    def __init__(self, metrics_file: str = None):
+        """Initialize API Metrics"""
+        self.metrics_file = metrics_file or os.path.join(LOGS_DIR, "api_metrics.log")
+        
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        
+        # Since startup, and since the last dump
+        self._total: Dict[str, _EndpointStats] = {}
+        self._window: Dict[str, _EndpointStats] = {}
+        self._window_started_at = self._started_at
+        
+        # Cumulative connection pool counters, and their values at startup and window start
+        self._pool_source: Optional[Callable[[], Dict[str, int]]] = None
+        self._pool_total_base: Dict[str, int] = {}
+        self._pool_window_base: Dict[str, int] = {}
+        
+        # Dump thread
+        self._stop_event = threading.Event()
+        self._dumper: Optional[threading.Thread] = None
+        self._dump_logger: Optional[logging.Logger] = None
+    
+    def record_request(
+        self,
+        url: str,
+        status: str,
+        duration: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0
+    ) -> None:
+        """
+        Record a completed attempt
+        status is the status class ('2xx', '4xx', ...) or the failure outcome
+        duration is in seconds
+        """
+        name = endpoint_name(url)
+        micros = int(duration * 1000000)
+        timed_out = "timeout" in status
+        
+        with self._lock:
+            for stats in (self._get_stats(self._total, name), self._get_stats(self._window, name)):
+                histogram = stats.histograms.get(status)
+                if histogram is None:
+                    histogram = stats.histograms[status] = LatencyHistogram()
+                histogram.record(micros)
+                
+                stats.bytes_sent += bytes_sent
+                stats.bytes_received += bytes_received
+                if timed_out:
+                    stats.timeouts += 1
+    
+    def set_pool_source(self, source: Callable[[], Dict[str, int]]) -> None:
+        """Report connection pool counters (requests, new_connections, discarded) in snapshots"""
+        self._pool_source = source
+        self._pool_total_base = self._pool_window_base = source()
+    
+    def record_retry(self, url: str) -> None:
+        """Record a retried attempt"""
+        self._increment(url, "retries")
+    
+    def record_hedge(self, url: str) -> None:
+        """Record a hedged (duplicate) attempt"""
+        self._increment(url, "hedges")
+    
+    def record_rejected(self, url: str) -> None:
+        """Record request refused by the circuit breaker"""
+        self._increment(url, "rejected")
+    
+    def _increment(self, url: str, counter: str) -> None:
+        """Increment counter in both totals and window"""
+        name = endpoint_name(url)
+        with self._lock:
+            for stats in (self._get_stats(self._total, name), self._get_stats(self._window, name)):
+                setattr(stats, counter, getattr(stats, counter) + 1)
+    
+    def _get_stats(self, table: Dict[str, _EndpointStats], name: str) -> _EndpointStats:
+        """Get or create endpoint stats (lock held)"""
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = _EndpointStats()
+        return stats
+    
+    def snapshot(self, window: bool = False) -> Dict[str, Any]:
+        """
+        Get metrics per endpoint and overall, latencies in milliseconds
+        window=True covers the period since the last call with window=True and resets it
+        """
+        with self._lock:
+            if window:
+                table, started_at = self._window, self._window_started_at
+                self._window = {}
+                self._window_started_at = time.time()
+            else:
+                table, started_at = self._total, self._started_at
+            
+            endpoints = {name: self._summarize(stats) for name, stats in table.items()}
+            
+            overall = _EndpointStats()
+            for stats in table.values():
+                for status, histogram in stats.histograms.items():
+                    merged = overall.histograms.get(status)
+                    if merged is None:
+                        merged = overall.histograms[status] = LatencyHistogram()
+                    merged.merge(histogram)
+                for counter in _EndpointStats.__slots__[1:]:
+                    setattr(overall, counter, getattr(overall, counter) + getattr(stats, counter))
+            total = self._summarize(overall)
+            period = time.time() - started_at
+            pool = self._summarize_pool(window, period)
+        
+        snapshot = {
+            "timestamp": datetime.now().isoformat(),
+            "period": period,
+            "endpoints": endpoints,
+            "total": total
+        }
+        if pool is not None:
+            snapshot["pool"] = pool
+        return snapshot
+    
+    def _summarize_pool(self, window: bool, period: float) -> Optional[Dict[str, Any]]:
+        """Summarize connection pool counters for the period (lock held)"""
+        if self._pool_source is None:
+            return None
+        
+        counters = self._pool_source()
+        if window:
+            base, self._pool_window_base = self._pool_window_base, counters
+        else:
+            base = self._pool_total_base
+        counters = {name: value - base.get(name, 0) for name, value in counters.items()}
+        
+        requests = counters.get("requests", 0)
+        new_connections = counters.get("new_connections", 0)
+        return {
+            **counters,
+            "reuse_ratio": max(0.0, 1 - new_connections / requests) if requests else 0.0,
+            "new_connections_per_minute": new_connections / (period / 60) if period > 0 else 0.0
+        }
+    
+    def _summarize(self, stats: _EndpointStats) -> Dict[str, Any]:
+        """Summarize endpoint stats (lock held)"""
+        combined = LatencyHistogram()
+        by_status = {}
+        for status, histogram in stats.histograms.items():
+            combined.merge(histogram)
+            by_status[status] = {
+                "count": histogram.count,
+                **self._latencies(histogram)
+            }
+        
+        errors = sum(
+            histogram.count
+            for status, histogram in stats.histograms.items()
+            if status in ERROR_STATUSES
+        )
+        client_errors = stats.histograms.get(CLIENT_ERROR_STATUS)
+        
+        return {
+            "requests": combined.count,
+            "errors": errors,
+            "error_rate": errors / combined.count if combined.count else 0.0,
+            "client_errors": client_errors.count if client_errors else 0,
+            "retries": stats.retries,
+            "hedges": stats.hedges,
+            "timeouts": stats.timeouts,
+            "rejected": stats.rejected,
+            "bytes_sent": stats.bytes_sent,
+            "bytes_received": stats.bytes_received,
+            "latency": self._latencies(combined),
+            "status": by_status
+        }
+    
+    def _latencies(self, histogram: LatencyHistogram) -> Dict[str, float]:
+        """Get latency percentiles in milliseconds"""
+        return {
+            "mean_ms": round(histogram.mean() / 1000, 2),
+            "p50_ms": histogram.percentile(50) / 1000,
+            "p95_ms": histogram.percentile(95) / 1000,
+            "p99_ms": histogram.percentile(99) / 1000,
+            "max_ms": histogram.max / 1000
+        }
+    
+    def reset(self) -> None:
+        """Clear all recorded metrics"""
+        with self._lock:
+            self._total = {}
+            self._window = {}
+            self._started_at = self._window_started_at = time.time()
+            if self._pool_source is not None:
+                self._pool_total_base = self._pool_window_base = self._pool_source()
+    
+    def start_dumper(self, interval: float = API_METRICS_DUMP_INTERVAL) -> None:
+        """Start writing a metrics window to the metrics log every interval seconds"""
+        if self._dumper and self._dumper.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._dumper = threading.Thread(
+            target=self._dump_loop,
+            args=(interval,),
+            name="api-metrics-dump",
+            daemon=True
+        )
+        self._dumper.start()
+    
+    def stop_dumper(self) -> None:
+        """Stop dump thread, writing a final window"""
+        self._stop_event.set()
+        if self._dumper:
+            self._dumper.join(timeout=5)
+            self._dumper = None
+    
+    def _dump_loop(self, interval: float) -> None:
+        """Dump metrics until stopped"""
+        while not self._stop_event.wait(interval):
+            self.dump()
+        self.dump()
+    
+    def dump(self) -> None:
+        """Append current metrics window to the metrics log as one JSON line"""
+        try:
+            snapshot = self.snapshot(window=True)
+            if not snapshot["total"]["requests"] and not snapshot["total"]["rejected"]:
+                return
+            self._get_dump_logger().info(json.dumps(snapshot))
+        except Exception as e:
+            logging.error(f"Error dumping API metrics: {str(e)}")
+    
+    def _get_dump_logger(self) -> logging.Logger:
+        """Get rotating metrics log"""
+        if self._dump_logger is None:
+            os.makedirs(os.path.dirname(self.metrics_file), exist_ok=True)
+            handler = RotatingFileHandler(
+                self.metrics_file,
+                maxBytes=MAX_LOG_SIZE,
+                backupCount=LOG_BACKUP_COUNT
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            
+            self._dump_logger = logging.getLogger('api_metrics')
+            self._dump_logger.addHandler(handler)
+            self._dump_logger.setLevel(logging.INFO)
+            self._dump_logger.propagate = False
+        return self._dump_logger
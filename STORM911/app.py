@@ -10,7 +10,15 @@ from typing import Optional
 import customtkinter as ctk
 
 from app_initializer import AppInitializer
-from config import APP_NAME, APP_VERSION
+from config import (
+    APP_NAME,
+    APP_VERSION,
+    API_STATUS_REFRESH_INTERVAL,
+    WARMUP_SPLASH_TIMEOUT
+)
+
+# Splash screen progress refresh (milliseconds)
+SPLASH_POLL_INTERVAL = 100
 
 class Storm911App:
     def __init__(self):
@@ -159,10 +167,37 @@ class Storm911App:
             )
             version_label.pack(side="right", padx=5)
             
+            # ReadyMode latency and error rate
+            self.api_status_label = ctk.CTkLabel(
+                status_frame,
+                text="",
+                font=("Arial", 12)
+            )
+            self.api_status_label.pack(side="right", padx=5)
+            self.update_api_status()
+        
         except Exception as e:
             logging.error(f"Error creating status bar: {str(e)}")
             raise
     
+    def update_api_status(self) -> None:
+        """Show ReadyMode latency and error rate in the status bar"""
+        try:
+            api_handler = self.handlers.get('api')
+            if api_handler:
+                total = api_handler.get_metrics()['total']
+                if total['requests']:
+                    self.api_status_label.configure(
+                        text=(
+                            f"API p95 {total['latency']['p95_ms']:.0f} ms | "
+                            f"{total['error_rate']:.1%} errors"
+                        )
+                    )
+        except Exception as e:
+            logging.error(f"Error updating API status: {str(e)}")
+        
+        self.root.after(API_STATUS_REFRESH_INTERVAL, self.update_api_status)
+    
     def show_splash_screen(self) -> None:
         """Show splash screen"""
         try:
@@ -197,14 +232,57 @@ class Storm911App:
             progress.pack(pady=20, padx=40, fill="x")
             progress.set(0)
             
-            # Schedule splash screen close
-            self.root.after(2000, lambda: self.close_splash_screen(splash))
+            status_label = ctk.CTkLabel(
+                splash,
+                text="",
+                font=("Arial", 12)
+            )
+            status_label.pack()
+            
+            # Close once warm-up finished, or after a fixed delay without one
+            if self.handlers.get('warmup'):
+                self.update_splash_screen(splash, progress, status_label)
+            else:
+                self.root.after(2000, lambda: self.close_splash_screen(splash))
             
         except Exception as e:
             logging.error(f"Error showing splash screen: {str(e)}")
             # Continue without splash screen
             self.root.deiconify()
     
+    def update_splash_screen(
+        self,
+        splash: ctk.CTkToplevel,
+        progress: ctk.CTkProgressBar,
+        status_label: ctk.CTkLabel,
+        elapsed: int = 0
+    ) -> None:
+        """Show warm-up progress on splash screen, closing it when done"""
+        try:
+            warmup = self.handlers['warmup']
+            fraction, message = warmup.get_progress()
+            progress.set(fraction)
+            status_label.configure(text=message)
+            
+            # The agent is never kept waiting on a slow gateway
+            if warmup.is_done() or elapsed >= WARMUP_SPLASH_TIMEOUT:
+                self.close_splash_screen(splash)
+                return
+            
+            self.root.after(
+                SPLASH_POLL_INTERVAL,
+                lambda: self.update_splash_screen(
+                    splash,
+                    progress,
+                    status_label,
+                    elapsed + SPLASH_POLL_INTERVAL
+                )
+            )
+        
+        except Exception as e:
+            logging.error(f"Error updating splash screen: {str(e)}")
+            self.close_splash_screen(splash)
+    
     def close_splash_screen(self, splash: ctk.CTkToplevel) -> None:
         """Close splash screen"""
         try:
@@ -8,7 +8,16 @@ import logging
 from typing import Optional, Dict, Any
 import customtkinter as ctk
 
-from config import APP_NAME, APP_VERSION, WINDOW_SIZE
+from config import (
+    APP_NAME,
+    APP_VERSION,
+    WINDOW_SIZE,
+    ENABLE_OUTBOX,
+    ENABLE_LEAD_REPLICA,
+    ENABLE_WARMUP,
+    ENABLE_AUTO_SAVE,
+    REPLICA_SYNC_INTERVAL
+)
 from theme_manager import ThemeManager
 from state_manager import StateManager
 from settings_manager import SettingsManager
@@ -16,6 +25,10 @@ from event_logger import EventLogger
 from hotkey_manager import HotkeyManager
 from dialog_manager import DialogManager
 from api_handler import APIHandler
+from async_api_client import AsyncAPIClient
+from outbox import Outbox
+from lead_replica import LeadReplica
+from warmup import WarmupPipeline
 from pdf_handler import PDFHandler
 from email_handler import EmailHandler
 from disposition_handler import DispositionHandler
@@ -90,8 +103,13 @@ class AppInitializer:
         try:
             # Create managers
             self.managers['theme'] = ThemeManager()
-            self.managers['state'] = StateManager()
             self.managers['settings'] = SettingsManager()
+            self.managers['state'] = StateManager(
+                auto_save=ENABLE_AUTO_SAVE and bool(
+                    self.managers['settings'].get_setting('behavior', 'auto_save')
+                )
+            )
+            self.managers['state'].start()
             self.managers['event'] = EventLogger()
             self.managers['hotkey'] = HotkeyManager(self.root)
             self.managers['dialog'] = DialogManager(
@@ -114,15 +132,43 @@ class AppInitializer:
         """Initialize application handlers"""
         try:
             # Create handlers
-            self.handlers['api'] = APIHandler()
+            self.handlers['api'] = APIHandler(
+                settings_manager=self.managers['settings']
+            )
+            self.handlers['api'].metrics.start_dumper()
+            self.handlers['api'].keepalive.start()
+            self.handlers['async_api'] = AsyncAPIClient(self.handlers['api'])
+            self.handlers['outbox'] = None
+            if ENABLE_OUTBOX:
+                self.handlers['outbox'] = Outbox(self.handlers['api'])
+                self.handlers['outbox'].start()
+            self.handlers['replica'] = None
+            if ENABLE_LEAD_REPLICA or self.managers['settings'].get_setting('api', 'replica_enabled'):
+                self.handlers['replica'] = LeadReplica(self.handlers['api'])
+                self.handlers['api'].replica = self.handlers['replica']
+                self.handlers['replica'].start(
+                    self.managers['settings'].get_setting('api', 'replica_sync_interval')
+                    or REPLICA_SYNC_INTERVAL
+                )
             self.handlers['pdf'] = PDFHandler()
-            self.handlers['email'] = EmailHandler()
+            self.handlers['email'] = EmailHandler(cache=self.handlers['api'].persistent_cache)
             self.handlers['disposition'] = DispositionHandler(
                 self.handlers['pdf'],
                 self.handlers['email'],
-                self.handlers['api']
+                self.handlers['api'],
+                self.handlers['outbox']
             )
             
+            # Warm up connections and lead data while the splash screen shows
+            self.handlers['warmup'] = None
+            if ENABLE_WARMUP:
+                self.handlers['warmup'] = WarmupPipeline(
+                    self.handlers['api'],
+                    self.handlers['async_api'],
+                    self.managers['state']
+                )
+                self.handlers['warmup'].start()
+            
             logging.info("Application handlers initialized successfully")
             
         except Exception as e:
@@ -237,12 +283,28 @@ class AppInitializer:
         """Handle exit confirmation response"""
         if confirmed:
             try:
-                # Save application state
-                self.managers['state'].save_state()
+                # Write pending application state
+                self.managers['state'].close()
                 
                 # Save settings
                 self.managers['settings'].save_settings()
                 
+                # Stop outstanding warm-up work
+                if self.handlers.get('warmup'):
+                    self.handlers['warmup'].close()
+                
+                # Stop outbox drainer, pending writes resume on next start
+                if self.handlers.get('outbox'):
+                    self.handlers['outbox'].close()
+                
+                # Stop lead replica sync
+                if self.handlers.get('replica'):
+                    self.handlers['replica'].close()
+                
+                # Close API sessions and cache
+                self.handlers['async_api'].close()
+                self.handlers['api'].close()
+                
                 # Close all dialogs
                 self.managers['dialog'].close_all()
                 
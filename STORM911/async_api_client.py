@@ -0,0 +1,543 @@
+"""
+Async API Client for Storm911
+Runs ReadyMode requests on a dedicated asyncio event-loop thread
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from urllib.parse import urlencode
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Dict, Optional, Tuple, Union
+
+import aiohttp
+
+from config import (
+    API_ENDPOINTS,
+    API_TIMEOUT,
+    API_RATE_LIMIT_MAX_WAIT,
+    API_RATE_LIMIT_POLL_INTERVAL,
+    API_HEDGE_MAX_WORKERS,
+    WARMUP_CONNECTIONS,
+    API_KEEPALIVE_INTERVAL,
+    ERRORS
+)
+from api_handler import (
+    APIHandler,
+    OUTCOME_OK,
+    OUTCOME_CONNECT_TIMEOUT,
+    OUTCOME_CONNECTION_ERROR,
+    OUTCOME_TIMEOUT,
+    OUTCOME_ERROR
+)
+from lead_cache import normalize_phone
+from rate_limiter import RateLimiter, SharedPriority, PRIORITY_INTERACTIVE, PRIORITY_BULK
+from circuit_breaker import STATE_HALF_OPEN
+
+if TYPE_CHECKING:
+    import customtkinter as ctk
+
+class AsyncAPIClient:
+    def __init__(self, api_handler: APIHandler, max_connections: int = 10):
+        """
+        Initialize Async API Client
+        Credentials, cache and circuit breaker are shared with api_handler
+        """
+        self.api_handler = api_handler
+        self.max_connections = max_connections
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._started = threading.Event()
+        
+        # Hedged attempts in flight, only touched from the event-loop thread
+        self._hedges_in_flight = 0
+    
+    def start(self) -> None:
+        """Start event-loop thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            name="readymode-async",
+            daemon=True
+        )
+        self._thread.start()
+        self._started.wait()
+    
+    def _run_loop(self) -> None:
+        """Run event loop until stopped"""
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        self._loop.run_forever()
+    
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule coroutine on the event loop, returns concurrent Future"""
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+    
+    def add_ui_callback(
+        self,
+        root: "ctk.CTk",
+        future: Future,
+        callback: Callable[[Any], None],
+        poll_interval: int = 50
+    ) -> None:
+        """Invoke callback(result) on the Tk thread once future completes"""
+        def poll():
+            if not future.done():
+                root.after(poll_interval, poll)
+                return
+            
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Async API request failed: {str(e)}")
+                result = (False, str(e))
+            
+            try:
+                callback(result)
+            except Exception as e:
+                logging.error(f"Error handling async API result: {str(e)}")
+        
+        root.after(poll_interval, poll)
+    
+    # Public API, each method returns a Future resolving to (success, result)
+    
+    def search_lead(
+        self,
+        phone: str,
+        use_cache: bool = True,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Future:
+        """Search for lead by phone number"""
+        return self.submit(self._search_lead(phone, use_cache, priority))
+    
+    def get_lead(self, item_id: str, priority: int = PRIORITY_INTERACTIVE) -> Future:
+        """Get lead by ReadyMode item ID"""
+        endpoint = API_ENDPOINTS['get_lead'].format(id=item_id)
+        return self.submit(
+            self._coalesced(('get_lead', str(item_id)), 'GET', endpoint, priority)
+        )
+    
+    def search_lead_updates(
+        self,
+        campaign_id: str,
+        phone: str,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Future:
+        """Get all leads in campaign matching phone number (leadUpdate API)"""
+        phone = normalize_phone(phone) or phone
+        endpoint = API_ENDPOINTS['lead_update'].format(
+            campaign_id=campaign_id,
+            phone=phone
+        )
+        return self.submit(
+            self._coalesced(
+                ('lead_update', str(campaign_id), phone),
+                'GET',
+                endpoint,
+                priority
+            )
+        )
+    
+    def update_lead_fields(self, campaign_id: str, phone: str, fields: Dict) -> Future:
+        """Update leads in campaign matching phone number (leadUpdate API)"""
+        return self.submit(self._update_lead_fields(campaign_id, phone, fields))
+    
+    def create_lead(self, lead_data: Dict) -> Future:
+        """Create new lead"""
+        return self.submit(self._create_lead(lead_data))
+    
+    def update_lead(self, lead_id: str, lead_data: Dict) -> Future:
+        """Update existing lead"""
+        return self.submit(self._update_lead(lead_id, lead_data))
+    
+    def validate_credentials(self) -> Future:
+        """Validate API credentials, resolves to (is_valid, message)"""
+        return self.submit(self._validate_credentials())
+    
+    def warm_connections(self, count: int = WARMUP_CONNECTIONS) -> Future:
+        """Open pooled connections to the gateway, resolves to number opened"""
+        return self.submit(self._warm_connections(min(count, self.max_connections)))
+    
+    # Coroutines
+    
+    async def _search_lead(
+        self,
+        phone: str,
+        use_cache: bool,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Tuple[bool, Any]:
+        """Search for lead by phone number, same steps as APIHandler.search_lead"""
+        handler = self.api_handler
+        phone = normalize_phone(phone) or phone
+        
+        if use_cache:
+            local = await self._run_blocking(handler._search_local, phone)
+            if local is not None:
+                return True, local
+        
+        shared = SharedPriority(priority)
+        success, result = await handler.single_flight.do_async(
+            ('search_lead', phone),
+            lambda: self._fan_out_search(phone, shared),
+            shared
+        )
+        
+        return await self._run_blocking(handler._finish_search, phone, success, result)
+    
+    async def _run_blocking(self, func: Callable, *args) -> Any:
+        """Run cache, index and replica work on a worker thread, it may touch SQLite"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def _fan_out_search(
+        self,
+        phone: str,
+        priority: Union[int, SharedPriority]
+    ) -> Tuple[bool, Any]:
+        """Look up phone number, trying the other API routes if the TPI search misses"""
+        handler = self.api_handler
+        success, result = await self._request(
+            'GET',
+            API_ENDPOINTS['search_lead'].format(phone=phone),
+            priority=priority
+        )
+        
+        endpoints = handler._get_fallback_endpoints(phone, success, result)
+        if not endpoints:
+            return success, result
+        
+        results = await asyncio.gather(
+            *(self._request('GET', endpoint, priority=priority) for endpoint in endpoints)
+        )
+        return handler._merge_lookups([(success, result)] + list(results))
+    
+    async def _coalesced(
+        self,
+        key: tuple,
+        method: str,
+        endpoint: str,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Tuple[bool, Any]:
+        """Share one outstanding request between identical lookups, at the most urgent priority"""
+        shared = SharedPriority(priority)
+        return await self.api_handler.single_flight.do_async(
+            key,
+            lambda: self._request(method, endpoint, priority=shared),
+            shared
+        )
+    
+    async def _update_lead_fields(
+        self,
+        campaign_id: str,
+        phone: str,
+        fields: Dict
+    ) -> Tuple[bool, Any]:
+        """Update leads in campaign matching phone number"""
+        endpoint = API_ENDPOINTS['lead_update'].format(
+            campaign_id=campaign_id,
+            phone=normalize_phone(phone) or phone
+        )
+        success, result = await self._request('POST', endpoint, data=fields)
+        
+        if success:
+            await self._run_blocking(self.api_handler._invalidate_lead, None, phone, result)
+        
+        return success, result
+    
+    async def _create_lead(self, lead_data: Dict) -> Tuple[bool, Any]:
+        """Create new lead"""
+        lead_data['created_at'] = datetime.now().isoformat()
+        
+        success, result = await self._request(
+            'POST',
+            API_ENDPOINTS['create_lead'],
+            data=lead_data
+        )
+        
+        if success:
+            await self._run_blocking(self.api_handler._invalidate_lead, None, lead_data.get('phone'))
+        
+        return success, result
+    
+    async def _update_lead(self, lead_id: str, lead_data: Dict) -> Tuple[bool, Any]:
+        """Update existing lead"""
+        lead_data['updated_at'] = datetime.now().isoformat()
+        
+        success, result = await self._request(
+            'PUT',
+            API_ENDPOINTS['update_lead'].format(id=lead_id),
+            data=lead_data
+        )
+        
+        if success:
+            await self._run_blocking(self.api_handler._invalidate_lead, lead_id, lead_data.get('phone'))
+        
+        return success, result
+    
+    async def _validate_credentials(self) -> Tuple[bool, str]:
+        """Validate API credentials"""
+        endpoint = API_ENDPOINTS['search_lead'].format(phone='0000000000')
+        success, result = await self._request('GET', endpoint)
+        return self.api_handler._interpret_validation(success, result)
+    
+    async def _warm_connections(self, count: int) -> int:
+        """Open pooled connections to the gateway root"""
+        session = await self._get_session()
+        url = self.api_handler.base_url
+        
+        async def open_connection() -> bool:
+            try:
+                async with session.head(url, allow_redirects=False):
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning(f"Could not open connection to {url}: {str(e)}")
+                return False
+        
+        results = await asyncio.gather(*(open_connection() for _ in range(count)))
+        return sum(results)
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get shared HTTP session, created on the loop thread"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=API_KEEPALIVE_INTERVAL or None
+                ),
+                timeout=aiohttp.ClientTimeout(total=API_TIMEOUT)
+            )
+        return self._session
+    
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        form: Optional[Dict] = None,
+        priority: Union[int, SharedPriority] = PRIORITY_INTERACTIVE
+    ) -> Tuple[bool, Any]:
+        """
+        Make API request with retries and error handling
+        Policy is APIHandler's, only waiting happens on the event loop
+        """
+        handler = self.api_handler
+        if not handler.has_credentials():
+            return False, ERRORS['api']['authentication']
+        
+        limiter = handler._get_rate_limiter(endpoint)
+        if limiter and not await self._acquire(limiter, priority):
+            return False, ERRORS['api']['rate_limited']
+        
+        admitted = handler._allow_request(endpoint)
+        if not admitted:
+            return False, ERRORS['api']['unavailable']
+        
+        url, request_params = handler._build_request(endpoint, params)
+        attempt = 0
+        
+        while True:
+            try:
+                success, result, outcome, retry_after = await self._send_attempt(
+                    method,
+                    url,
+                    request_params,
+                    data,
+                    form,
+                    limiter
+                )
+            except BaseException:
+                # Cancelled without an outcome, let the next request be the trial
+                if admitted == STATE_HALF_OPEN:
+                    handler.circuit_breaker.release_trial()
+                raise
+            handler._record_outcome(limiter, success, outcome, retry_after)
+            
+            delay = handler._get_retry_delay(method, endpoint, attempt, success, outcome, retry_after)
+            if delay is None:
+                return success, result
+            await asyncio.sleep(delay)
+            
+            if limiter and not await self._acquire(limiter, priority):
+                return False, result
+            admitted = handler.circuit_breaker.admit()
+            if not admitted:
+                return False, result
+            
+            handler.metrics.record_retry(endpoint)
+            attempt += 1
+    
+    async def _acquire(
+        self,
+        limiter: RateLimiter,
+        priority: Union[int, SharedPriority]
+    ) -> bool:
+        """
+        Wait for request budget on the event loop, in line with blocking waiters
+        No executor thread is held, so bulk waits cannot starve other work
+        """
+        if limiter.try_acquire(priority):
+            return True
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + API_RATE_LIMIT_MAX_WAIT
+        entry = limiter.enqueue(priority)
+        
+        try:
+            while not limiter.try_acquire_queued(entry, priority):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    limiter.leave_queue(entry, priority)
+                    return False
+                
+                wait_time = max(limiter.get_wait_time(entry[0]), API_RATE_LIMIT_POLL_INTERVAL)
+                await asyncio.sleep(min(wait_time, remaining))
+            return True
+        except BaseException:
+            limiter.leave_queue(entry, priority, timed_out=False)
+            raise
+    
+    async def _send_attempt(
+        self,
+        method: str,
+        url: str,
+        params: Dict,
+        data: Optional[Dict],
+        form: Optional[Dict],
+        limiter: Optional[RateLimiter] = None
+    ) -> Tuple[bool, Any, str, Optional[float]]:
+        """
+        Send request, hedging GETs that run past the endpoint's usual p95
+        The first successful response wins, the slower attempt is cancelled
+        """
+        handler = self.api_handler
+        hedge_delay = handler._get_hedge_delay(method, url)
+        
+        if hedge_delay is None:
+            return await self._send_request(method, url, params, data, form)
+        
+        primary = asyncio.ensure_future(self._send_request(method, url, params, data, form))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+        
+        # Under load every request runs late, don't double the traffic
+        if self._hedges_in_flight >= API_HEDGE_MAX_WORKERS or (
+            limiter and not limiter.try_acquire(PRIORITY_BULK)
+        ):
+            return await primary
+        
+        handler.metrics.record_hedge(url)
+        hedge = asyncio.ensure_future(self._send_request(method, url, params, data, form))
+        self._hedges_in_flight += 1
+        
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result[0]:
+                        return result
+            return result
+        finally:
+            self._hedges_in_flight -= 1
+            for future in pending:
+                future.cancel()
+    
+    async def _send_request(
+        self,
+        method: str,
+        url: str,
+        params: Dict,
+        data: Optional[Dict],
+        form: Optional[Dict]
+    ) -> Tuple[bool, Any, str, Optional[float]]:
+        """
+        Send a single API request
+        Returns (success, data/error_message, outcome, retry_after) tuple
+        """
+        handler = self.api_handler
+        responded = False
+        started = time.perf_counter()
+        try:
+            session = await self._get_session()
+            connect_timeout, read_timeout = handler._get_timeout(url)
+            async with session.request(
+                method,
+                url,
+                params=params,
+                json=data,
+                data=form,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect_timeout,
+                    sock_read=read_timeout
+                )
+            ) as response:
+                logging.debug(f"Async API Request: {method} {url}")
+                logging.debug(f"Status Code: {response.status}")
+                
+                body = await response.read()
+                elapsed = time.perf_counter() - started
+                responded = True
+                handler._record_response(
+                    url,
+                    response.status,
+                    elapsed,
+                    self._get_body_size(data, form),
+                    len(body)
+                )
+                
+                if response.ok:
+                    return True, json.loads(body), OUTCOME_OK, None
+                return handler._get_response_error(response.status, response)
+        
+        except aiohttp.ClientConnectorError:
+            # Connection was never established, safe to repeat
+            outcome, error = OUTCOME_CONNECT_TIMEOUT, ERRORS['api']['connection']
+        except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError):
+            outcome, error = OUTCOME_CONNECTION_ERROR, ERRORS['api']['connection']
+        except asyncio.TimeoutError:
+            outcome, error = OUTCOME_TIMEOUT, ERRORS['api']['timeout']
+            handler.timeouts.record(url, time.perf_counter() - started)
+        except Exception as e:
+            logging.error(f"Async API request error: {str(e)}")
+            outcome, error = OUTCOME_ERROR, str(e)
+        
+        if not responded:
+            handler.metrics.record_request(url, outcome, time.perf_counter() - started)
+        
+        return False, error, outcome, None
+    
+    def _get_body_size(self, data: Optional[Dict], form: Optional[Dict]) -> int:
+        """Get approximate request body size in bytes"""
+        if data is not None:
+            return len(json.dumps(data))
+        if form:
+            return len(urlencode(form))
+        return 0
+    
+    def close(self) -> None:
+        """Close HTTP session and stop event-loop thread"""
+        if not self._thread or not self._thread.is_alive():
+            return
+        
+        async def shutdown():
+            if self._session and not self._session.closed:
+                await self._session.close()
+        
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        except Exception as e:
+            logging.error(f"Error closing async API session: {str(e)}")
+        
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
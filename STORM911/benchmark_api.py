@@ -0,0 +1,318 @@
+"""
+API Benchmark for Storm911
+Drives APIHandler at configurable concurrency and reports throughput and latency
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from api_handler import APIHandler
+from readymode_stub import ReadyModeStub, generate_leads, LATENCY_DISTRIBUTIONS
+
+# Default operation mix (weights)
+DEFAULT_MIX = {
+    "search_lead": 60,
+    "get_lead": 20,
+    "lead_update": 15,
+    "post_leads": 5
+}
+
+BENCHMARK_USER = "benchmark"
+BENCHMARK_PASS = "benchmark"
+BENCHMARK_CAMPAIGN = "1"
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Get nearest-rank percentile of sorted samples"""
+    if not samples:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(samples))))
+    return samples[min(rank, len(samples)) - 1]
+
+class APIBenchmark:
+    def __init__(
+        self,
+        api_handler: APIHandler,
+        phones: List[str],
+        lead_ids: List[str],
+        mix: Optional[Dict[str, int]] = None,
+        use_cache: bool = False,
+        miss_rate: float = 0.05,
+        post_batch_size: int = 10,
+        seed: int = 911
+    ):
+        """Initialize API Benchmark"""
+        self.api_handler = api_handler
+        self.phones = phones
+        self.lead_ids = lead_ids
+        self.mix = mix or DEFAULT_MIX
+        self.use_cache = use_cache
+        self.miss_rate = miss_rate
+        self.post_batch_size = post_batch_size
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Callable[[], Tuple[bool, Any]]] = {
+            "search_lead": self._search_lead,
+            "get_lead": self._get_lead,
+            "lead_update": self._lead_update,
+            "post_leads": self._post_leads
+        }
+        
+        # Latencies in seconds and failure counts per operation
+        self.latencies: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+        self.elapsed = 0.0
+    
+    def run(
+        self,
+        concurrency: int = 8,
+        requests: int = 1000,
+        duration: Optional[float] = None
+    ) -> Dict[str, Dict]:
+        """
+        Run workload until requests are sent or duration seconds elapse
+        Returns report from get_report()
+        """
+        self.latencies = {name: [] for name in self.mix}
+        self.failures = {name: 0 for name in self.mix}
+        
+        remaining = [requests]
+        deadline = time.monotonic() + duration if duration else None
+        
+        def worker():
+            while True:
+                if deadline is not None:
+                    if time.monotonic() >= deadline:
+                        return
+                else:
+                    with self._lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                self._run_one()
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        self.elapsed = time.perf_counter() - started
+        
+        return self.get_report()
+    
+    def _run_one(self) -> None:
+        """Run a single randomly chosen operation and record its latency"""
+        with self._lock:
+            name = self._rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        
+        started = time.perf_counter()
+        try:
+            success, _ = self._operations[name]()
+        except Exception as e:
+            logging.error(f"Benchmark {name} error: {str(e)}")
+            success = False
+        latency = time.perf_counter() - started
+        
+        with self._lock:
+            self.latencies[name].append(latency)
+            if not success:
+                self.failures[name] += 1
+    
+    def _pick_phone(self) -> str:
+        """Pick phone number, occasionally one that does not exist"""
+        with self._lock:
+            if self._rng.random() < self.miss_rate:
+                return f"444{self._rng.randint(0, 9999999):07d}"
+            return self._rng.choice(self.phones)
+    
+    def _search_lead(self) -> Tuple[bool, Any]:
+        """Search lead by phone"""
+        return self.api_handler.search_lead(self._pick_phone(), use_cache=self.use_cache)
+    
+    def _get_lead(self) -> Tuple[bool, Any]:
+        """Get lead by ID"""
+        with self._lock:
+            lead_id = self._rng.choice(self.lead_ids)
+        return self.api_handler.get_lead(lead_id)
+    
+    def _lead_update(self) -> Tuple[bool, Any]:
+        """Update a single field through leadUpdate"""
+        with self._lock:
+            phone = self._rng.choice(self.phones)
+        return self.api_handler.update_lead_fields(
+            BENCHMARK_CAMPAIGN,
+            phone,
+            {'Call Notes': f"Benchmark {time.time():.0f}"}
+        )
+    
+    def _post_leads(self) -> Tuple[bool, Any]:
+        """Post a batch of new leads"""
+        with self._lock:
+            base = self._rng.randint(0, 9999999 - self.post_batch_size)
+        leads = [
+            {
+                'first_name': "Bench",
+                'last_name': f"Lead{index}",
+                'phone': f"557{base + index:07d}"
+            }
+            for index in range(self.post_batch_size)
+        ]
+        results = self.api_handler.create_leads_batch(
+            leads,
+            batch_size=self.post_batch_size,
+            max_workers=1
+        )
+        return all(row['success'] for row in results), results
+    
+    def get_report(self) -> Dict[str, Dict]:
+        """Get throughput and latency percentiles (ms) per operation and overall"""
+        report = {}
+        all_samples: List[float] = []
+        all_failures = 0
+        
+        for name, samples in self.latencies.items():
+            if not samples:
+                continue
+            report[name] = self._summarize(sorted(samples), self.failures[name])
+            all_samples.extend(samples)
+            all_failures += self.failures[name]
+        
+        report["total"] = self._summarize(sorted(all_samples), all_failures)
+        return report
+    
+    def _summarize(self, samples: List[float], failures: int) -> Dict[str, float]:
+        """Summarize sorted latency samples"""
+        count = len(samples)
+        return {
+            "requests": count,
+            "failures": failures,
+            "throughput": count / self.elapsed if self.elapsed else 0.0,
+            "mean_ms": sum(samples) / count * 1000 if count else 0.0,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "max_ms": samples[-1] * 1000 if count else 0.0
+        }
+
+def print_report(report: Dict[str, Dict], elapsed: float) -> None:
+    """Print benchmark report table"""
+    print(f"\nCompleted in {elapsed:.2f}s\n")
+    print(
+        f"{'endpoint':<14}{'reqs':>8}{'fail':>7}{'req/s':>10}"
+        f"{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    )
+    
+    for name, row in report.items():
+        print(
+            f"{name:<14}{row['requests']:>8}{row['failures']:>7}"
+            f"{row['throughput']:>10.1f}{row['mean_ms']:>9.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+            f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}"
+        )
+    
+    print("\nLatencies in milliseconds")
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse operation mix such as 'search_lead=70,get_lead=30'"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark APIHandler against ReadyMode")
+    parser.add_argument("--url", help="Target base URL, a local stub is started if omitted")
+    parser.add_argument("--api-user", default=BENCHMARK_USER)
+    parser.add_argument("--api-pass", default=BENCHMARK_PASS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--duration", type=float, help="Run for seconds instead of a request count")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--use-cache", action="store_true", help="Serve repeat searches from cache")
+    parser.add_argument(
+        "--client-rate-limit",
+        action="store_true",
+        help="Keep the client-side ReadyMode request budget"
+    )
+    parser.add_argument("--miss-rate", type=float, default=0.05)
+    parser.add_argument("--leads", type=int, default=1000)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--latency-spread-ms", type=float, default=25)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.ERROR)
+    
+    stub = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        leads = generate_leads(args.leads)
+        phones = [lead['phone'] for lead in leads]
+        lead_ids = [lead['id'] for lead in leads]
+    else:
+        stub = ReadyModeStub(
+            lead_count=args.leads,
+            latency=args.latency,
+            latency_ms=args.latency_ms,
+            latency_spread_ms=args.latency_spread_ms,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            api_user=args.api_user,
+            api_pass=args.api_pass
+        )
+        base_url = stub.start()
+        phones = stub.get_phones()
+        lead_ids = stub.get_lead_ids()
+    
+    api_handler = APIHandler(args.api_user, args.api_pass)
+    api_handler.base_url = base_url
+    
+    # Keep benchmark leads out of the agent's on-disk cache
+    if api_handler.cache is not None:
+        api_handler.cache.backing = None
+        if not args.use_cache:
+            api_handler.cache = None
+    
+    # The hourly ReadyMode budget would otherwise cap the benchmark
+    if not args.client_rate_limit:
+        api_handler.rate_limiters.clear()
+    
+    try:
+        benchmark = APIBenchmark(
+            api_handler,
+            phones,
+            lead_ids,
+            mix=args.mix,
+            use_cache=args.use_cache,
+            miss_rate=args.miss_rate
+        )
+        print(
+            f"Benchmarking {base_url} with concurrency {args.concurrency}, "
+            f"{f'{args.duration}s' if args.duration else f'{args.requests} requests'}"
+        )
+        report = benchmark.run(args.concurrency, args.requests, args.duration)
+        print_report(report, benchmark.elapsed)
+        
+        if stub:
+            print(f"\nStub responses: {stub.get_stats()}")
+    finally:
+        api_handler.close()
+        if stub:
+            stub.stop()
+    
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Call Record Benchmark for Storm911
+Compares memory footprint and conversion speed of call dicts and CallRecords
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from call_record import CallRecord, CallRecordBuffer
+from readymode_stub import FIRST_NAMES, LAST_NAMES, CITIES, ROOF_TYPES
+
+# Disposition IDs as offered by DispositionHandler
+DISPOSITIONS = [
+    "appointment_scheduled",
+    "not_interested",
+    "call_back",
+    "wrong_number",
+    "no_answer",
+    "busy",
+    "disconnected",
+    "do_not_call",
+    "other"
+]
+
+INSURANCE_COMPANIES = ["", "State Farm", "Allstate", "Progressive", "USAA", "Farmers"]
+
+def generate_calls(count: int, seed: int = 911) -> List[Dict]:
+    """
+    Generate call dicts shaped like the caller info form
+    They are decoded from JSON, like calls read from disk, so equal values
+    are separate string objects
+    """
+    rng = random.Random(seed)
+    started = datetime(2026, 1, 5, 9, 0)
+    calls = []
+    
+    for index in range(count):
+        city, state = rng.choice(CITIES)
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        has_insurance = rng.random() < 0.7
+        calls.append({
+            'timestamp': (started + timedelta(minutes=3 * index)).isoformat(),
+            'lead_id': str(100000 + index),
+            'phone': f"555{index:07d}",
+            'cell': '',
+            'first_name': first_name,
+            'last_name': last_name,
+            'address': f"{rng.randint(100, 9999)} Main St",
+            'city': city,
+            'state': state,
+            'zip': f"{rng.randint(10000, 99999)}",
+            'email': f"{first_name.lower()}.{last_name.lower()}{index}@example.com",
+            'roof_type': rng.choice(ROOF_TYPES),
+            'roof_age': rng.choice(["0-5", "6-10", "11-15", "16-20", "20+"]),
+            'stories': rng.choice(["1", "1.5", "2", "2.5", "3+"]),
+            'has_contractor': rng.random() < 0.2,
+            'has_insurance': has_insurance,
+            'insurance_company': rng.choice(INSURANCE_COMPANIES[1:]) if has_insurance else '',
+            'appointment_date': '',
+            'appointment_time': rng.choice(["9:00", "10:00", "13:00", "15:00"]),
+            'disposition': rng.choice(DISPOSITIONS),
+            'notes': ''
+        })
+    
+    return json.loads(json.dumps(calls))
+
+def measure_memory(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """Get result of build and bytes it keeps allocated"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+def measure_time(operation: Callable[[], Any], repeat: int = 3) -> float:
+    """Get best wall time of operation in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def run(count: int) -> Dict[str, Dict[str, float]]:
+    """Measure footprint and conversions for count calls"""
+    source = generate_calls(count)
+    source_json = json.dumps(source)
+    
+    # Footprints of the same calls freshly decoded, as dicts and as records
+    _, dict_bytes = measure_memory(lambda: json.loads(source_json))
+    
+    def build_records():
+        buffer = CallRecordBuffer(count)
+        buffer.load(CallRecord.from_dict(call) for call in reversed(json.loads(source_json)))
+        return buffer
+    
+    buffer, record_bytes = measure_memory(build_records)
+    records = buffer.latest()
+    rows = [record.to_row() for record in records]
+    
+    # Round trips must give the original calls back
+    assert [record.to_dict() for record in reversed(records)] == source
+    assert [CallRecord.from_row(row) for row in rows] == records
+    
+    return {
+        "memory": {
+            "dict_bytes": dict_bytes / count,
+            "record_bytes": record_bytes / count,
+            "saving": 1 - record_bytes / dict_bytes if dict_bytes else 0.0
+        },
+        "time_us": {
+            "from_dict": measure_time(lambda: [CallRecord.from_dict(c) for c in source]) / count * 1e6,
+            "to_dict": measure_time(lambda: [r.to_dict() for r in records]) / count * 1e6,
+            "to_row": measure_time(lambda: [r.to_row() for r in records]) / count * 1e6,
+            "from_row": measure_time(lambda: [CallRecord.from_row(r) for r in rows]) / count * 1e6,
+            "json_loads_dict": measure_time(lambda: json.loads(source_json)) / count * 1e6
+        }
+    }
+
+def print_report(count: int, report: Dict[str, Dict[str, float]]) -> None:
+    """Print benchmark report"""
+    memory = report["memory"]
+    print(f"\n{count} calls\n")
+    print(f"{'per call':<18}{'bytes':>10}")
+    print(f"{'dict':<18}{memory['dict_bytes']:>10.0f}")
+    print(f"{'CallRecord':<18}{memory['record_bytes']:>10.0f}")
+    print(f"{'saving':<18}{memory['saving']:>10.0%}")
+    
+    print(f"\n{'conversion':<18}{'us/call':>10}")
+    for name, value in report["time_us"].items():
+        print(f"{name:<18}{value:>10.2f}")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark call record memory and speed")
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+    
+    print_report(args.calls, run(args.calls))
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Serializer Benchmark for Storm911
+Compares save and load times and file sizes of state and settings per serializer
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+
+import serializers
+from serializers import FORMAT_JSON, FORMAT_MSGPACK
+from settings_manager import SettingsManager
+from benchmark_call_records import generate_calls, measure_time
+
+def build_state(calls: List[Dict]) -> Dict:
+    """
+    Build state shaped like app_state.json
+    Calls are held in recent_calls as in state files written before call history
+    """
+    return {
+        "current_call": calls[0] if calls else None,
+        "last_search": {"phone": calls[0]["phone"] if calls else "", "results": calls[:5]},
+        "last_export": None,
+        "ui_state": {
+            "current_page": 0,
+            "panels": {"caller_info": True, "transcript": True, "objections": True}
+        },
+        "session": {
+            "start_time": "2026-01-05T09:00:00",
+            "call_count": len(calls),
+            "export_count": 0,
+            "email_count": 0
+        },
+        "recent_calls": calls,
+        "_journal_seq": 0
+    }
+
+def get_codecs() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    """Get encode and decode functions per serializer, unavailable ones are left out"""
+    codecs = {
+        "json indent=2": (
+            lambda data: json.dumps(data, indent=2).encode('utf-8'),
+            json.loads
+        ),
+        "json compact": (
+            lambda data: json.dumps(data, separators=(',', ':')).encode('utf-8'),
+            json.loads
+        )
+    }
+    
+    if serializers.orjson:
+        codecs["orjson"] = (
+            lambda data: serializers.orjson.dumps(data, option=serializers.orjson.OPT_NON_STR_KEYS),
+            serializers.orjson.loads
+        )
+    if serializers.msgpack:
+        codecs["msgpack"] = (
+            lambda data: serializers.dumps(data, FORMAT_MSGPACK),
+            serializers.loads
+        )
+    return codecs
+
+def measure_file(
+    path: str,
+    data: Any,
+    encode: Callable[[Any], bytes],
+    decode: Callable[[bytes], Any],
+    repeat: int
+) -> Dict[str, float]:
+    """Measure writing data to path and reading it back"""
+    def save():
+        with open(path, 'wb') as f:
+            f.write(encode(data))
+    
+    def load():
+        with open(path, 'rb') as f:
+            return decode(f.read())
+    
+    save_time = measure_time(save, repeat)
+    load_time = measure_time(load, repeat)
+    
+    # Round trip must give the data back
+    assert load() == data
+    
+    return {
+        "save_ms": save_time * 1e3,
+        "load_ms": load_time * 1e3,
+        "size_kb": os.path.getsize(path) / 1024
+    }
+
+def run(count: int, repeat: int = 5) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Measure every serializer on state holding count calls and on settings"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        documents = {
+            "state": build_state(generate_calls(count)),
+            "settings": SettingsManager(temp_dir).default_settings
+        }
+        
+        report = {}
+        for name, (encode, decode) in get_codecs().items():
+            report[name] = {
+                document: measure_file(
+                    os.path.join(temp_dir, f"{document}.bench"),
+                    data,
+                    encode,
+                    decode,
+                    repeat
+                )
+                for document, data in documents.items()
+            }
+        
+        # Files written as plain indented JSON must still load through serializers
+        legacy_file = os.path.join(temp_dir, "legacy.json")
+        with open(legacy_file, 'w') as f:
+            json.dump(documents["state"], f, indent=2)
+        assert serializers.load_file(legacy_file) == documents["state"]
+    
+    return report
+
+def print_report(count: int, report: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+    """Print benchmark report"""
+    backends = serializers.get_backends()
+    print(f"\nState with {count} calls, default settings")
+    print(f"Default backend: {backends[FORMAT_JSON]}, msgpack: {backends[FORMAT_MSGPACK] or 'not installed'}")
+    
+    baseline = report["json indent=2"]
+    for document in ("state", "settings"):
+        print(f"\n{document:<16}{'save ms':>10}{'load ms':>10}{'size KB':>10}{'speedup':>10}")
+        for name, results in report.items():
+            result = results[document]
+            base = baseline[document]
+            total = result["save_ms"] + result["load_ms"]
+            speedup = (base["save_ms"] + base["load_ms"]) / total if total else 0.0
+            print(
+                f"{name:<16}{result['save_ms']:>10.2f}{result['load_ms']:>10.2f}"
+                f"{result['size_kb']:>10.1f}{speedup:>9.1f}x"
+            )
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark state and settings serializers")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    print_report(args.calls, run(args.calls, args.repeat))
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Call History for Storm911
+SQLite store of past calls with indexed lookups and retention
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    DATA_DIR,
+    MAX_RECENT_CALLS,
+    CALL_HISTORY_RETENTION,
+    CALL_HISTORY_MAX_RECORDS
+)
+from lead_cache import normalize_phone
+
+class CallHistory:
+    def __init__(
+        self,
+        history_file: str = None,
+        retention: float = CALL_HISTORY_RETENTION,
+        max_records: int = CALL_HISTORY_MAX_RECORDS
+    ):
+        """
+        Initialize Call History
+        Calls older than retention seconds, and all but the newest max_records
+        calls, are purged on open and by purge(), 0 keeps them
+        """
+        self.history_file = history_file or os.path.join(DATA_DIR, "call_history.sqlite3")
+        self.retention = retention
+        self.max_records = max_records
+        
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.history_file, check_same_thread=False)
+        self._create_schema()
+        self.purge()
+    
+    def _create_schema(self) -> None:
+        """Create call table and indexes"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL NOT NULL,
+                    phone TEXT,
+                    lead_id TEXT,
+                    disposition TEXT,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_calls_timestamp ON calls (timestamp)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_calls_phone ON calls (phone, timestamp)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_calls_lead ON calls (lead_id, timestamp)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_calls_disposition "
+                "ON calls (disposition, timestamp)"
+            )
+            self._conn.commit()
+    
+    def add(self, call_data: Dict) -> int:
+        """Record call, returns its history ID"""
+        with self._lock:
+            call_id = self._insert(call_data)
+            self._conn.commit()
+        return call_id
+    
+    def add_calls(self, calls: List[Dict]) -> List[int]:
+        """Record calls given oldest first in one transaction, returns their history IDs"""
+        with self._lock:
+            call_ids = [self._insert(call_data) for call_data in calls]
+            self._conn.commit()
+        return call_ids
+    
+    def import_calls(self, calls: List[Dict]) -> int:
+        """Record calls given newest first in one transaction, returns number imported"""
+        imported = 0
+        with self._lock:
+            for call_data in reversed(calls):
+                if isinstance(call_data, dict):
+                    self._insert(call_data)
+                    imported += 1
+            self._conn.commit()
+        return imported
+    
+    def _insert(self, call_data: Dict) -> int:
+        """Insert call row (lock must be held)"""
+        cursor = self._conn.execute(
+            "INSERT INTO calls (timestamp, phone, lead_id, disposition, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                self._get_timestamp(call_data),
+                normalize_phone(call_data.get('phone')) or None,
+                self._get_text(call_data, 'lead_id', 'id'),
+                self._get_text(call_data, 'disposition'),
+                json.dumps(call_data)
+            )
+        )
+        return cursor.lastrowid
+    
+    def _get_timestamp(self, call_data: Dict) -> float:
+        """Get call time as epoch seconds, now if missing or unreadable"""
+        try:
+            return datetime.fromisoformat(call_data['timestamp']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return time.time()
+    
+    def _get_text(self, call_data: Dict, *keys: str) -> Optional[str]:
+        """Get first non-empty value of keys as text"""
+        for key in keys:
+            if call_data.get(key):
+                return str(call_data[key])
+        return None
+    
+    def get_recent(self, limit: int = MAX_RECENT_CALLS, offset: int = 0) -> List[Dict]:
+        """Get most recent calls, newest first"""
+        return self.query(limit=limit, offset=offset)
+    
+    def query(
+        self,
+        phone: str = None,
+        lead_id: str = None,
+        disposition: str = None,
+        since: float = None,
+        until: float = None,
+        before_id: int = None,
+        limit: int = MAX_RECENT_CALLS,
+        offset: int = 0
+    ) -> List[Dict]:
+        """
+        Get calls matching all given filters, newest first
+        since/until are epoch seconds. For deep pages pass the history_id of
+        the last call of the previous page as before_id instead of an offset
+        """
+        where, params = self._build_filter(phone, lead_id, disposition, since, until, before_id)
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, data FROM calls{where} "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        
+        calls = []
+        for call_id, data in rows:
+            call_data = json.loads(data)
+            call_data['history_id'] = call_id
+            calls.append(call_data)
+        return calls
+    
+    def count(
+        self,
+        phone: str = None,
+        lead_id: str = None,
+        disposition: str = None,
+        since: float = None,
+        until: float = None
+    ) -> int:
+        """Get number of calls matching all given filters"""
+        where, params = self._build_filter(phone, lead_id, disposition, since, until)
+        
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM calls{where}",
+                params
+            ).fetchone()[0]
+    
+    def count_by_disposition(self, since: float = None) -> Dict[str, int]:
+        """Get number of calls per disposition"""
+        where, params = self._build_filter(since=since)
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT disposition, COUNT(*) FROM calls{where} GROUP BY disposition",
+                params
+            ).fetchall()
+        return {disposition or '': count for disposition, count in rows}
+    
+    def _build_filter(
+        self,
+        phone: str = None,
+        lead_id: str = None,
+        disposition: str = None,
+        since: float = None,
+        until: float = None,
+        before_id: int = None
+    ) -> Tuple[str, List[Any]]:
+        """Get WHERE clause and parameters for filters"""
+        clauses = []
+        params = []
+        
+        if phone:
+            clauses.append("phone = ?")
+            params.append(normalize_phone(phone))
+        if lead_id:
+            clauses.append("lead_id = ?")
+            params.append(str(lead_id))
+        if disposition:
+            clauses.append("disposition = ?")
+            params.append(disposition)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if before_id is not None:
+            # Keyset page: rows ordered after the given one
+            clauses.append(
+                "(timestamp, id) < (SELECT timestamp, id FROM calls WHERE id = ?)"
+            )
+            params.append(before_id)
+        
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+    
+    def purge(self) -> int:
+        """Remove calls outside the retention policy, returns number removed"""
+        removed = 0
+        try:
+            with self._lock:
+                if self.retention > 0:
+                    removed += self._conn.execute(
+                        "DELETE FROM calls WHERE timestamp < ?",
+                        (time.time() - self.retention,)
+                    ).rowcount
+                
+                if self.max_records > 0:
+                    removed += self._conn.execute(
+                        "DELETE FROM calls WHERE id NOT IN ("
+                        "SELECT id FROM calls ORDER BY timestamp DESC, id DESC LIMIT ?)",
+                        (self.max_records,)
+                    ).rowcount
+                
+                self._conn.commit()
+            
+            if removed:
+                logging.info(f"Purged {removed} calls from call history")
+        except Exception as e:
+            logging.error(f"Error purging call history: {str(e)}")
+        
+        return removed
+    
+    def clear(self) -> None:
+        """Remove all calls"""
+        with self._lock:
+            self._conn.execute("DELETE FROM calls")
+            self._conn.commit()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get number of calls and time range held"""
+        with self._lock:
+            count, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM calls"
+            ).fetchone()
+        
+        return {
+            "calls": count,
+            "oldest": oldest,
+            "newest": newest,
+            "retention": self.retention,
+            "max_records": self.max_records
+        }
+    
+    def close(self) -> None:
+        """Close database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,169 @@
+"""
+Call Record for Storm911
+Compact slotted call records and a fixed-capacity buffer of recent calls
+"""
+
+import sys
+import threading
+from collections import deque
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import CALL_RECORD_BUFFER_SIZE
+
+# Call fields kept in slots, in row order
+CALL_FIELDS = (
+    'timestamp',
+    'history_id',
+    'lead_id',
+    'phone',
+    'cell',
+    'first_name',
+    'last_name',
+    'address',
+    'city',
+    'state',
+    'zip',
+    'email',
+    'roof_type',
+    'roof_age',
+    'stories',
+    'has_contractor',
+    'has_insurance',
+    'insurance_company',
+    'appointment_date',
+    'appointment_time',
+    'disposition',
+    'notes'
+)
+
+# Low-cardinality fields, equal values share one string object
+INTERNED_FIELDS = frozenset((
+    'city',
+    'state',
+    'roof_type',
+    'roof_age',
+    'stories',
+    'has_contractor',
+    'has_insurance',
+    'insurance_company',
+    'appointment_time',
+    'disposition'
+))
+
+_FIELD_SET = frozenset(CALL_FIELDS)
+_FIELD_SPECS = tuple((name, name in INTERNED_FIELDS) for name in CALL_FIELDS)
+_get_fields = attrgetter(*CALL_FIELDS)
+
+class CallRecord:
+    """
+    Call with a fixed set of fields in slots instead of a per-call dict
+    Unknown keys are kept in extra. None and missing fields are the same,
+    to_dict leaves both out
+    """
+    __slots__ = CALL_FIELDS + ('extra',)
+    
+    def __init__(self, **fields: Any):
+        """Initialize Call Record"""
+        for name in CALL_FIELDS:
+            setattr(self, name, _intern(name, fields.pop(name, None)))
+        self.extra = fields or None
+    
+    @classmethod
+    def from_dict(cls, call_data: Dict) -> "CallRecord":
+        """Create record from call dict"""
+        record = cls.__new__(cls)
+        get = call_data.get
+        for name, interned in _FIELD_SPECS:
+            value = get(name)
+            if interned and type(value) is str:
+                value = sys.intern(value)
+            setattr(record, name, value)
+        
+        record.extra = {
+            key: value for key, value in call_data.items() if key not in _FIELD_SET
+        } or None
+        return record
+    
+    def to_dict(self) -> Dict:
+        """Get call dict, a new one on every call"""
+        call_data = {
+            name: value
+            for name, value in zip(CALL_FIELDS, _get_fields(self))
+            if value is not None
+        }
+        if self.extra:
+            call_data.update(self.extra)
+        return call_data
+    
+    def to_row(self) -> Tuple:
+        """Get field values in CALL_FIELDS order followed by extra"""
+        return _get_fields(self) + (self.extra,)
+    
+    @classmethod
+    def from_row(cls, row: Iterable) -> "CallRecord":
+        """Create record from to_row output"""
+        record = cls.__new__(cls)
+        values = tuple(row)
+        for (name, interned), value in zip(_FIELD_SPECS, values):
+            if interned and type(value) is str:
+                value = sys.intern(value)
+            setattr(record, name, value)
+        record.extra = values[len(CALL_FIELDS)] if len(values) > len(CALL_FIELDS) else None
+        return record
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get field or extra value like dict.get"""
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CallRecord):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+    
+    def __repr__(self) -> str:
+        return f"CallRecord(phone={self.phone!r}, timestamp={self.timestamp!r})"
+
+def _intern(name: str, value: Any) -> Any:
+    """Intern string value of low-cardinality field"""
+    if type(value) is str and name in INTERNED_FIELDS:
+        return sys.intern(value)
+    return value
+
+class CallRecordBuffer:
+    def __init__(self, capacity: int = CALL_RECORD_BUFFER_SIZE):
+        """
+        Initialize Call Record Buffer
+        Holds the newest capacity records, adding one drops the oldest
+        """
+        self.capacity = capacity
+        self._records: "deque[CallRecord]" = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+    
+    def append(self, record: CallRecord) -> None:
+        """Add record as the newest"""
+        with self._lock:
+            self._records.appendleft(record)
+    
+    def load(self, records: Iterable[CallRecord]) -> None:
+        """Replace content with records given newest first"""
+        with self._lock:
+            self._records.clear()
+            self._records.extend(islice(records, self.capacity))
+    
+    def latest(self, limit: Optional[int] = None) -> List[CallRecord]:
+        """Get newest records first"""
+        with self._lock:
+            return list(islice(self._records, limit))
+    
+    def clear(self) -> None:
+        """Remove all records"""
+        with self._lock:
+            self._records.clear()
+    
+    def __len__(self) -> int:
+        return len(self._records)
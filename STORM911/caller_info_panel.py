@@ -8,6 +8,11 @@ import customtkinter as ctk
 from typing import Dict, Any
 import logging
 
+from search_dispatcher import SearchDispatcher
+
+# Spinner frames shown while a search is outstanding
+SPINNER_FRAMES = ["◐", "◓", "◑", "◒"]
+
 class CallerInfoPanel:
     def __init__(self, root: ctk.CTk, managers: Dict[str, Any], handlers: Dict[str, Any]):
         """Initialize Caller Info Panel"""
@@ -25,6 +30,17 @@ class CallerInfoPanel:
         self.roofing_frame = None
         self.insurance_frame = None
         self.progress_frame = None
+        self.search_status_label = None
+        
+        # Background search
+        self.search_dispatcher = SearchDispatcher(root, handlers['api'])
+        self._spinner_job = None
+        self._spinner_index = 0
+        self._spinner_text = "Searching"
+        
+        # Values last shown from a lead, to tell agent edits from lead data
+        self._shown_values: Dict[str, Any] = {}
+        self._showing_cached = False
     
     def create_panel(self, parent: ctk.CTkFrame) -> ctk.CTkFrame:
         """Create caller information panel"""
@@ -62,6 +78,9 @@ class CallerInfoPanel:
         )
         phone_entry.pack(side="left", fill="x", expand=True, padx=5)
         
+        # Typing a new number supersedes any outstanding search
+        self.variables['phone'].trace_add("write", self._on_phone_changed)
+        
         # Search button
         search_button = ctk.CTkButton(
             self.search_frame,
@@ -69,6 +88,14 @@ class CallerInfoPanel:
             command=self._handle_search
         )
         search_button.pack(side="right", padx=5)
+        
+        # Search status
+        self.search_status_label = ctk.CTkLabel(
+            self.search_frame,
+            text="",
+            width=90
+        )
+        self.search_status_label.pack(side="right", padx=5)
     
     def _create_customer_section(self) -> None:
         """Create customer information section"""
@@ -250,32 +277,120 @@ class CallerInfoPanel:
                 )
                 return
             
-            # Search for lead
-            success, result = self.handlers['api'].search_lead(phone)
-            
-            if success:
-                self._populate_fields(result)
-                self.update_progress()
-            else:
-                self.managers['dialog'].show_message(
-                    "Error",
-                    result,
-                    "error"
-                )
+            # Fresh local copies need no request, stale ones are shown while revalidated
+            self._showing_cached = False
+            self.search_dispatcher.search(
+                phone,
+                self._handle_search_result,
+                on_stale=self._handle_stale_result
+            )
+            self._start_spinner("Searching")
             
         except Exception as e:
             logging.error(f"Error searching phone number: {str(e)}")
+            self._stop_spinner()
             self.managers['dialog'].show_message(
                 "Error",
                 "Failed to search phone number",
                 "error"
             )
     
+    def _handle_stale_result(self, result: Any) -> None:
+        """Show stale local copy of the lead while it is revalidated"""
+        self._populate_fields(self.handlers['api'].lead_to_fields(result) or {})
+        self._showing_cached = True
+        self.update_progress()
+        self._start_spinner("Refreshing")
+    
+    def _handle_search_result(self, success: bool, result: Any) -> None:
+        """Handle completed phone search"""
+        self._stop_spinner()
+        
+        if success:
+            values = self.handlers['api'].lead_to_fields(result) or {}
+            if self._showing_cached:
+                self._apply_revalidated(values)
+            else:
+                self._populate_fields(values)
+            self._showing_cached = False
+            self.update_progress()
+        elif self._showing_cached:
+            # Keep the cached copy on screen, it is the best data available
+            self.search_status_label.configure(text="Cached copy")
+        else:
+            self.search_status_label.configure(text="Search failed")
+            self.managers['dialog'].show_message(
+                "Error",
+                result,
+                "error"
+            )
+    
+    def _apply_revalidated(self, values: Dict) -> None:
+        """Apply fresh lead values that changed since the cached copy, unless edited"""
+        for field, value in values.items():
+            variable = self.variables.get(field)
+            if variable is None or field == 'phone':
+                continue
+            
+            value = self._to_variable_value(variable, value)
+            shown = self._shown_values.get(field)
+            if value == shown:
+                continue
+            
+            # The agent's edit wins over the fresh value
+            if variable.get() != shown:
+                continue
+            
+            variable.set(value)
+            self._shown_values[field] = value
+    
+    def _on_phone_changed(self, *args) -> None:
+        """Cancel outstanding search when the phone number changes"""
+        if self.search_dispatcher.is_busy():
+            self.search_dispatcher.cancel()
+            self._stop_spinner()
+            self._showing_cached = False
+    
+    def _start_spinner(self, text: str = "Searching") -> None:
+        """Show searching state in search section"""
+        if self._spinner_job:
+            self.root.after_cancel(self._spinner_job)
+        self._spinner_index = 0
+        self._spinner_text = text
+        self._animate_spinner()
+    
+    def _animate_spinner(self) -> None:
+        """Advance spinner frame"""
+        frame = SPINNER_FRAMES[self._spinner_index % len(SPINNER_FRAMES)]
+        self.search_status_label.configure(text=f"{frame} {self._spinner_text}")
+        self._spinner_index += 1
+        self._spinner_job = self.root.after(150, self._animate_spinner)
+    
+    def _stop_spinner(self) -> None:
+        """Clear searching state"""
+        if self._spinner_job:
+            self.root.after_cancel(self._spinner_job)
+            self._spinner_job = None
+        if self.search_status_label:
+            self.search_status_label.configure(text="")
+    
     def _populate_fields(self, data: Dict) -> None:
         """Populate form fields with data"""
+        self._shown_values = {}
         for field, value in data.items():
             if field in self.variables:
+                value = self._to_variable_value(self.variables[field], value)
                 self.variables[field].set(value)
+                self._shown_values[field] = value
+    
+    def _to_variable_value(self, variable: tk.Variable, value: Any) -> Any:
+        """Convert lead value to the type held by a form variable"""
+        if isinstance(variable, tk.BooleanVar):
+            if isinstance(value, str):
+                return value.strip().lower() in ('yes', 'true', '1', 'y')
+            return bool(value)
+        
+        return '' if value is None else str(value)
     
     def get_field_values(self) -> Dict:
         """Get all field values"""
@@ -292,6 +407,9 @@ class CallerInfoPanel:
             else:
                 var.set("")
         
+        self._shown_values = {}
+        self._showing_cached = False
+        
         self.update_progress()
     
     def update_progress(self) -> None:
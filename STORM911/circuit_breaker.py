@@ -0,0 +1,123 @@
+"""
+Circuit Breaker for Storm911
+Fails fast while the ReadyMode API is unreachable
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from config import API_CIRCUIT_FAILURE_THRESHOLD, API_CIRCUIT_RECOVERY_TIMEOUT
+
+# Breaker states
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = API_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = API_CIRCUIT_RECOVERY_TIMEOUT
+    ):
+        """Initialize Circuit Breaker"""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        
+        # Initialize counters
+        self.stats = {
+            "opened": 0,
+            "rejected": 0
+        }
+    
+    @property
+    def state(self) -> str:
+        """Get current breaker state"""
+        with self._lock:
+            self._update_state()
+            return self._state
+    
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent"""
+        return self.admit() is not None
+    
+    def admit(self) -> Optional[str]:
+        """
+        Admit a request, returns the state it was let through in or None if rejected
+        A request let through half-open holds the trial until its outcome is recorded
+        """
+        with self._lock:
+            self._update_state()
+            
+            if self._state == STATE_CLOSED:
+                return STATE_CLOSED
+            
+            # Let a single trial request through once recovery time passed
+            if self._state == STATE_HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return STATE_HALF_OPEN
+            
+            self.stats["rejected"] += 1
+            return None
+    
+    def release_trial(self) -> None:
+        """Free the half-open trial of a request that ended without an outcome"""
+        with self._lock:
+            self._trial_in_progress = False
+    
+    def record_success(self) -> None:
+        """Record request that reached the API"""
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                logging.info("ReadyMode API reachable again, closing circuit")
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._trial_in_progress = False
+    
+    def record_failure(self) -> None:
+        """Record request that failed due to an outage"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != STATE_OPEN:
+                    logging.warning(
+                        f"ReadyMode API failing, opening circuit for "
+                        f"{self.recovery_timeout}s"
+                    )
+                    self.stats["opened"] += 1
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+    
+    def reset(self) -> None:
+        """Reset breaker to closed state"""
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._trial_in_progress = False
+    
+    def _update_state(self) -> None:
+        """Move from open to half-open once recovery time passed (lock held)"""
+        if (
+            self._state == STATE_OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+            self._trial_in_progress = False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker statistics"""
+        with self._lock:
+            self._update_state()
+            stats = self.stats.copy()
+            stats["state"] = self._state
+            stats["consecutive_failures"] = self._failures
+        return stats
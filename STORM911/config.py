@@ -35,10 +35,55 @@ DEFAULT_FONT_SIZE = "normal"
 DEFAULT_FONT_FAMILY = "Arial"
 
 # API Settings
-API_BASE_URL = "https://api.readymode.com/v1"
-API_TIMEOUT = 30  # seconds
+API_BASE_URL = "https://roofingappointments.readymode.com"
+API_ENDPOINTS = {
+    "search_lead": "/TPI/search/Lead/{phone}",
+    "get_lead": "/TPI/get/Lead/{id}",
+    "create_lead": "/TPI/post/",
+    "update_lead": "/TPI/update/Lead/{id}",
+    "lead_update": "/TPI/leadUpdate/{campaign_id}/{phone}",
+    "post_leads": "/TPI/post/"
+}
+API_CAMPAIGN_ID = ""  # ReadyMode campaign for leadUpdate writes
+API_TIMEOUT = 30  # seconds, ceiling for adaptive read timeouts
+API_CONNECT_TIMEOUT = 5  # seconds
+API_TIMEOUT_FLOOR = 2  # seconds
+API_TIMEOUT_PERCENTILE = 99
+API_TIMEOUT_MULTIPLIER = 2
+API_TIMEOUT_WINDOW = 200  # recent responses per endpoint
+API_TIMEOUT_MIN_SAMPLES = 20
+API_HEDGE_PERCENTILE = 95
+API_HEDGE_MIN_DELAY = 0.05  # seconds
+API_HEDGE_MAX_WORKERS = 8
 API_RETRY_ATTEMPTS = 3
+API_RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+API_RETRY_BACKOFF_MAX = 8  # seconds
+API_RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+API_CIRCUIT_FAILURE_THRESHOLD = 5
+API_CIRCUIT_RECOVERY_TIMEOUT = 30  # seconds
 API_CACHE_DURATION = 300  # seconds
+API_CACHE_MAX_ENTRIES = 100
+API_BATCH_SIZE = 100  # leads per TPI post
+API_BATCH_MAX_WORKERS = 4
+API_LOOKUP_MAX_WORKERS = 4  # parallel lookups per phone search
+API_FALLBACK_LOOKUPS = 2  # extra lookups per phone search once the TPI search misses
+API_RATE_LIMIT = 2000  # searches and updates per hour, 0 disables
+API_POST_RATE_LIMIT = 10000  # TPI posts per hour, 0 disables
+API_RATE_LIMIT_BURST = 20  # requests
+API_RATE_LIMIT_RESERVE = 0.25  # share of burst kept for interactive requests
+API_RATE_LIMIT_MIN_FRACTION = 0.1  # lowest rate after repeated 429s
+API_RATE_LIMIT_INCREASE = 0.05  # share of full rate regained per success
+API_RATE_LIMIT_MAX_WAIT = 30  # seconds
+API_RATE_LIMIT_POLL_INTERVAL = 0.05  # seconds, shortest async wait between budget checks
+API_POOL_CONNECTIONS = 4  # hosts kept in the connection pool
+API_POOL_MAXSIZE = 32  # connections kept per host, covers hedged and batch requests
+API_KEEPALIVE_INTERVAL = 45  # seconds idle before pooled connections are refreshed, 0 disables
+API_KEEPALIVE_CONNECTIONS = 4  # connections refreshed per keep-alive ping
+API_TCP_KEEPALIVE_IDLE = 30  # seconds
+API_TCP_KEEPALIVE_INTERVAL = 10  # seconds
+API_STREAM_CHUNK_SIZE = 65536  # bytes read at a time from streamed responses
+API_METRICS_DUMP_INTERVAL = 300  # seconds
+API_STATUS_REFRESH_INTERVAL = 5000  # milliseconds
 
 # Email Settings
 SMTP_SERVER = "smtp.gmail.com"
@@ -70,19 +115,71 @@ REQUIRE_2FA = False
 CACHE_DIR = os.path.join(DATA_DIR, 'cache')
 MAX_CACHE_SIZE = 104857600  # 100MB
 CACHE_CLEANUP_INTERVAL = 86400  # 24 hours
+SERIALIZER_FORMAT = "json"  # "json" or "msgpack" for state, settings and cache files, both are read
+PERSISTENT_CACHE_TTL = 604800  # 7 days
+CACHE_TOUCH_FLUSH_SIZE = 64  # reads buffered before their access times are written
+VALIDATION_CACHE_TTL = 86400  # 24 hours, email deliverability results
+
+# Outbox Settings (queued ReadyMode writes)
+OUTBOX_MAX_ATTEMPTS = 20
+OUTBOX_RETRY_BACKOFF = 5  # seconds, doubled per attempt
+OUTBOX_RETRY_BACKOFF_MAX = 600  # seconds
+OUTBOX_POLL_INTERVAL = 30  # seconds
+OUTBOX_RETENTION = 604800  # 7 days
+
+# Lead Replica Settings (local copy of campaign leads)
+REPLICA_SYNC_INTERVAL = 300  # seconds
+REPLICA_QUOTA_SHARE = 0.05  # share of the hourly lookup quota sync may spend (100 of 2,000)
+REPLICA_SCAN_GAP = 50  # missing IDs in a row before a scan stops
+REPLICA_START_ID = 0  # first lead ID scanned, 0 starts after the highest ID seen
+REPLICA_REFRESH_AGE = 86400  # seconds before a stored lead is re-fetched
+
+# Warm-up Settings (background work started at login)
+WARMUP_CONNECTIONS = 4  # pooled connections opened to the gateway
+WARMUP_PRELOAD_ENTRIES = 100  # lookups loaded from the disk cache
+WARMUP_PREFETCH_RECENT = 10  # recent callers' leads fetched
+WARMUP_SPLASH_TIMEOUT = 10000  # milliseconds the splash screen waits for warm-up
 
 # Performance Settings
 MAX_RECENT_CALLS = 50
+CALL_HISTORY_RETENTION = 7776000  # seconds calls are kept (90 days), 0 keeps all
+CALL_HISTORY_MAX_RECORDS = 500000  # newest calls kept, 0 keeps all
+CALL_RECORD_BUFFER_SIZE = 1000  # newest calls held in memory
 AUTO_SAVE_INTERVAL = 300  # 5 minutes
+STATE_JOURNAL_MAX_RECORDS = 1000  # journaled state changes before the state file is rewritten
+STATE_JOURNAL_FSYNC = True  # fsync journal appends, False keeps changes through process crashes only
 CLEANUP_INTERVAL = 86400  # 24 hours
 
 # Feature Flags
 ENABLE_API_CACHE = True
+ENABLE_API_HEDGING = True
+ENABLE_OUTBOX = True
+ENABLE_LEAD_REPLICA = False
+ENABLE_WARMUP = True
 ENABLE_EMAIL = True
 ENABLE_PDF_EXPORT = True
 ENABLE_AUTO_SAVE = True
 ENABLE_ANALYTICS = True
 
+# Error Messages
+ERRORS = {
+    "api": {
+        "authentication": "Invalid API credentials. Please log in again.",
+        "not_found": "No lead found for the given search.",
+        "server": "ReadyMode server error. Please try again.",
+        "connection": "Could not connect to ReadyMode. Check your network connection.",
+        "timeout": "Request timed out. Please try again.",
+        "rate_limited": "ReadyMode request limit reached. Please try again shortly.",
+        "rejected": "ReadyMode rejected the request.",
+        "unavailable": "ReadyMode is currently unavailable. Please try again shortly."
+    },
+    "validation": {
+        "invalid_format": "Invalid format.",
+        "future_date": "Date must be in the future.",
+        "business_hours": "Time must be during business hours."
+    }
+}
+
 # Development Settings
 DEBUG = False
 TESTING = False
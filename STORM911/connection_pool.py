@@ -0,0 +1,187 @@
+"""
+Connection Pool for Storm911
+Tuned requests adapter with pool statistics and idle keep-alive refresh
+"""
+
+import time
+import socket
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import (
+    API_POOL_CONNECTIONS,
+    API_POOL_MAXSIZE,
+    API_KEEPALIVE_INTERVAL,
+    API_TCP_KEEPALIVE_IDLE,
+    API_TCP_KEEPALIVE_INTERVAL
+)
+
+def keepalive_socket_options() -> list:
+    """Get socket options enabling TCP keep-alive where the platform supports it"""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    
+    # Probe timing is Linux/BSD only, other platforms keep system defaults
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, API_TCP_KEEPALIVE_IDLE))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, API_TCP_KEEPALIVE_INTERVAL))
+    return options
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def __init__(
+        self,
+        pool_connections: int = API_POOL_CONNECTIONS,
+        pool_maxsize: int = API_POOL_MAXSIZE,
+        pool_block: bool = False
+    ):
+        """
+        Initialize Pooled HTTP Adapter
+        pool_connections is the number of hosts kept, pool_maxsize the connections per host
+        Retries are left to APIHandler
+        """
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        
+        # Initialize counters
+        self.counters = {
+            "requests": 0,
+            "new_connections": 0,
+            "discarded": 0
+        }
+        
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+            pool_block=pool_block
+        )
+    
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        """Create pool manager with counting pools and TCP keep-alive"""
+        pool_kwargs.setdefault("socket_options", keepalive_socket_options())
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": self._counting_pool(HTTPConnectionPool),
+            "https": self._counting_pool(HTTPSConnectionPool)
+        }
+    
+    def _counting_pool(self, base: type) -> type:
+        """Get connection pool class reporting to this adapter"""
+        adapter = self
+        
+        class CountingConnectionPool(base):
+            def _new_conn(self):
+                adapter._increment("new_connections")
+                return super()._new_conn()
+            
+            def _put_conn(self, conn):
+                if conn is not None and self.pool is not None and self.pool.full():
+                    adapter._increment("discarded")
+                super()._put_conn(conn)
+        
+        return CountingConnectionPool
+    
+    def send(self, request, **kwargs):
+        """Send request, counting it and marking the pool active"""
+        with self._lock:
+            self.counters["requests"] += 1
+            self._last_used = time.monotonic()
+        return super().send(request, **kwargs)
+    
+    def _increment(self, counter: str) -> None:
+        """Increment counter"""
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def get_idle_time(self) -> float:
+        """Get seconds since the last request"""
+        with self._lock:
+            return time.monotonic() - self._last_used
+    
+    def get_counters(self) -> Dict[str, int]:
+        """Get cumulative request, new connection and discard counts"""
+        with self._lock:
+            return dict(self.counters)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counters, reuse ratio and idle connections per host"""
+        counters = self.get_counters()
+        requests = counters["requests"]
+        
+        idle = {}
+        for key in list(self.poolmanager.pools.keys()):
+            pool = self.poolmanager.pools.get(key)
+            if pool is not None and pool.pool is not None:
+                idle[f"{pool.scheme}://{pool.host}:{pool.port}"] = sum(
+                    1 for conn in list(pool.pool.queue) if conn is not None
+                )
+        
+        return {
+            **counters,
+            "reuse_ratio": max(0.0, 1 - counters["new_connections"] / requests) if requests else 0.0,
+            "maxsize": self._pool_maxsize,
+            "idle_connections": idle,
+            "idle_seconds": self.get_idle_time()
+        }
+
+class KeepAliveRefresher:
+    def __init__(
+        self,
+        adapter: PooledHTTPAdapter,
+        ping: Callable[[], Any],
+        interval: float = API_KEEPALIVE_INTERVAL
+    ):
+        """
+        Initialize Keep-Alive Refresher
+        ping opens or refreshes pooled connections, it runs once the pool
+        has been idle for interval seconds, before the gateway drops them
+        """
+        self.adapter = adapter
+        self.ping = ping
+        self.interval = interval
+        
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.pings = 0
+    
+    def start(self) -> None:
+        """Start refresh thread"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop,
+            name="api-keepalive",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop refresh thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def _refresh_loop(self) -> None:
+        """Ping whenever the pool went idle for a full interval"""
+        while not self._stop_event.wait(self._get_wait()):
+            if self.adapter.get_idle_time() < self.interval:
+                continue
+            try:
+                self.ping()
+                self.pings += 1
+            except Exception as e:
+                logging.warning(f"Keep-alive refresh failed: {str(e)}")
+    
+    def _get_wait(self) -> float:
+        """Get seconds until the pool will have been idle for interval"""
+        return max(1.0, self.interval - self.adapter.get_idle_time())
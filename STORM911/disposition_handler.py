@@ -6,7 +6,7 @@ Manages end-of-call processes, data collection, and export
 import os
 import logging
 from datetime import datetime
-from typing import Dict, Optional, Tuple, List
+from typing import Any, Dict, Optional, Tuple, List
 
 from config import EXPORTS_DIR
 from pdf_handler import PDFHandler
@@ -24,13 +24,17 @@ class DispositionHandler:
         self,
         pdf_handler: PDFHandler,
         email_handler: EmailHandler,
-        api_handler: APIHandler
+        api_handler: APIHandler,
+        outbox: Any = None
     ):
         """Initialize Disposition Handler"""
         self.pdf_handler = pdf_handler
         self.email_handler = email_handler
         self.api_handler = api_handler
         
+        # Lead writes go through the outbox when available
+        self.outbox = outbox
+        
         # Ensure exports directory exists
         os.makedirs(EXPORTS_DIR, exist_ok=True)
     
@@ -68,10 +72,11 @@ class DispositionHandler:
                 if not success:
                     return False, message, None
             
-            # Update API with disposition
-            success, message = self.api_handler.update_lead(
-                call_data['lead_id'],
-                {'disposition': disposition_type, 'notes': notes}
+            # Update API with disposition (queued locally if outbox enabled)
+            success, message = self._update_lead_disposition(
+                disposition_type,
+                call_data,
+                notes
             )
             
             if not success:
@@ -83,6 +88,33 @@ class DispositionHandler:
             logging.error(f"Error processing call disposition: {str(e)}")
             return False, f"Error processing disposition: {str(e)}", None
     
+    def _update_lead_disposition(
+        self,
+        disposition_type: str,
+        call_data: Dict,
+        notes: str
+    ) -> Tuple[bool, str]:
+        """Write disposition and changed form fields back to the lead"""
+        lead_writer = self.outbox or self.api_handler
+        
+        # Send only what changed since the lead was fetched
+        if self.api_handler.get_campaign_id() and call_data.get('phone'):
+            current_values = dict(call_data)
+            if notes:
+                current_values['notes'] = notes
+            
+            return self.api_handler.update_lead_diff(
+                call_data['phone'],
+                current_values,
+                extra_fields={'Disposition': disposition_type},
+                writer=lead_writer
+            )
+        
+        return lead_writer.update_lead(
+            call_data['lead_id'],
+            {'disposition': disposition_type, 'notes': notes}
+        )
+    
     def _prepare_disposition_data(
         self,
         disposition_type: str,
@@ -10,11 +10,15 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 from email_validator import validate_email, EmailNotValidError
 
+from config import VALIDATION_CACHE_TTL
+from persistent_cache import NAMESPACE_VALIDATION
+
 class EmailHandler:
-    def __init__(self, smtp_server="smtp.gmail.com", smtp_port=587):
+    def __init__(self, smtp_server="smtp.gmail.com", smtp_port=587, cache=None):
         """Initialize Email Handler"""
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
+        self.cache = cache
         self.sender_email = os.getenv("STORM911_EMAIL")
         self.sender_password = os.getenv("STORM911_EMAIL_PASSWORD")
         
@@ -22,12 +26,25 @@ class EmailHandler:
             logging.warning("Email credentials not found in environment variables")
     
     def validate_email_address(self, email):
-        """Validate email address format"""
+        """
+        Validate email address format and domain
+        Results are kept in the persistent cache as the domain check needs DNS lookups
+        """
+        key = f"email:{str(email).strip().lower()}"
+        if self.cache:
+            valid = self.cache.get(NAMESPACE_VALIDATION, key, max_age=VALIDATION_CACHE_TTL)
+            if valid is not None:
+                return valid
+        
         try:
             validate_email(email)
-            return True
+            valid = True
         except EmailNotValidError:
-            return False
+            valid = False
+        
+        if self.cache:
+            self.cache.set(NAMESPACE_VALIDATION, key, valid)
+        return valid
     
     def send_appointment_confirmation(self, recipient_email, appointment_data, pdf_path=None):
         """Send appointment confirmation email"""
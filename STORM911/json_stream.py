@@ -0,0 +1,194 @@
+"""
+JSON Stream for Storm911
+Incremental parser yielding the elements of a JSON array as the body arrives
+"""
+
+import re
+import json
+import codecs
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+# Characters that change nesting outside of strings
+_STRUCTURE = re.compile(r'[\[\]{}",]')
+
+# Characters that end or escape a string
+_STRING_END = re.compile(r'["\\]')
+
+# Start of the next value between array elements
+_VALUE_START = re.compile(r'[^\s,]')
+
+class JSONArrayParser:
+    def __init__(self, encoding: str = "utf-8"):
+        """
+        Initialize JSON Array Parser
+        Feed raw chunks in order, each element is parsed once it is complete
+        so memory holds one element at a time, not the whole array
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        
+        # Parse state
+        self._started = False
+        self._finished = False
+        self._whole: Optional[List[str]] = None
+        self._depth = 0
+        self._in_string = False
+        self._element_start: Optional[int] = None
+        
+        self.elements = 0
+    
+    def feed(self, chunk: Union[bytes, str]) -> List[Any]:
+        """Add chunk of the body, returns elements completed by it"""
+        text = self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if self._finished or not text:
+            return []
+        
+        # Bodies that are not an array are parsed whole on close
+        if self._whole is not None:
+            self._whole.append(text)
+            return []
+        
+        self._buffer += text
+        elements = self._scan()
+        self._compact()
+        return elements
+    
+    def close(self) -> List[Any]:
+        """
+        Finish parsing, returns remaining elements
+        A body that is not an array is returned as its only element
+        Raises json.JSONDecodeError if the body is empty or incomplete
+        """
+        self.feed(self._decoder.decode(b"", final=True))
+        
+        if self._whole is not None:
+            value = json.loads("".join(self._whole))
+            self._whole = None
+            self._finished = True
+            self.elements += 1
+            return [value]
+        
+        if not self._finished:
+            message = "Unterminated array" if self._started else "Expecting value"
+            raise json.JSONDecodeError(message, self._buffer, len(self._buffer))
+        return []
+    
+    def _scan(self) -> List[Any]:
+        """Parse buffered text from the last position, returns completed elements"""
+        buffer = self._buffer
+        elements = []
+        
+        if not self._started:
+            match = _VALUE_START.search(buffer, self._pos)
+            if not match:
+                self._pos = len(buffer)
+                return elements
+            if match.group() != "[":
+                self._whole = [buffer[match.start():]]
+                self._buffer = ""
+                self._pos = 0
+                return elements
+            self._started = True
+            self._pos = match.end()
+        
+        pos = self._pos
+        while not self._finished:
+            if self._in_string:
+                match = _STRING_END.search(buffer, pos)
+                if not match:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    # Escaped character may not have arrived yet
+                    if match.end() >= len(buffer):
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+            
+            # Between elements, find where the next one starts
+            if self._element_start is None:
+                match = _VALUE_START.search(buffer, pos)
+                if not match:
+                    pos = len(buffer)
+                    break
+                if match.group() == "]":
+                    self._finished = True
+                    pos = match.end()
+                    break
+                # Objects, arrays and strings are self-delimiting, most
+                # arrive whole and need no tracking
+                if match.group() in '[{"':
+                    try:
+                        value, pos = self._json.raw_decode(buffer, match.start())
+                        elements.append(value)
+                        self.elements += 1
+                        continue
+                    except json.JSONDecodeError:
+                        pass
+                
+                self._element_start = match.start()
+                pos = match.start()
+                if match.group() not in '[{"':
+                    pos += 1
+                    continue
+            
+            match = _STRUCTURE.search(buffer, pos)
+            if not match:
+                pos = len(buffer)
+                break
+            
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    elements.append(self._decode(self._element_start, pos))
+            elif self._depth == 0:
+                if char == "}":
+                    raise json.JSONDecodeError("Unexpected '}'", buffer, match.start())
+                
+                # Comma or closing bracket ends a string, number or literal
+                elements.append(self._decode(self._element_start, match.start()))
+                if char == "]":
+                    self._finished = True
+        
+        self._pos = pos
+        return elements
+    
+    def _decode(self, start: int, end: int) -> Any:
+        """Parse complete element and mark it consumed"""
+        self._element_start = None
+        self.elements += 1
+        return json.loads(self._buffer[start:end])
+    
+    def _compact(self) -> None:
+        """Drop text of elements already parsed"""
+        keep = self._pos if self._element_start is None else self._element_start
+        if keep:
+            self._buffer = self._buffer[keep:]
+            self._pos -= keep
+            if self._element_start is not None:
+                self._element_start -= keep
+
+def iter_json_array(
+    chunks: Iterable[Union[bytes, str]],
+    encoding: str = "utf-8"
+) -> Iterator[Any]:
+    """
+    Yield elements of a JSON array read from chunks
+    Raises json.JSONDecodeError on malformed or truncated input
+    """
+    parser = JSONArrayParser(encoding)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
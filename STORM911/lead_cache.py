@@ -0,0 +1,277 @@
+"""
+Lead Cache for Storm911
+Bounded in-memory cache for ReadyMode lead lookups
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import API_CACHE_DURATION, API_CACHE_MAX_ENTRIES
+from persistent_cache import PersistentCache, NAMESPACE_LEAD
+
+def normalize_phone(phone: Any) -> str:
+    """Normalize phone number to bare 10-digit form used as cache key"""
+    digits = re.sub(r'\D', '', str(phone or ''))
+    
+    # Drop US country code
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    
+    return digits
+
+class LeadCache:
+    def __init__(
+        self,
+        ttl: int = API_CACHE_DURATION,
+        max_entries: int = API_CACHE_MAX_ENTRIES,
+        backing: Optional[PersistentCache] = None
+    ):
+        """Initialize Lead Cache"""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        
+        # Optional disk tier behind the in-memory entries
+        self.backing = backing
+        
+        # phone -> (expires_at, lead_id, value), oldest first
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str], Any]]" = OrderedDict()
+        
+        # lead_id -> phones cached for that lead
+        self._lead_index: Dict[str, Set[str]] = {}
+        
+        # Expired entries already counted, kept for get_stale until evicted
+        self._expired: Set[str] = set()
+        
+        self._lock = threading.Lock()
+        
+        # Initialize counters
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "disk_hits": 0,
+            "stale_hits": 0
+        }
+    
+    def get(self, phone: str) -> Optional[Any]:
+        """Get cached lookup result, or None on miss/expiry"""
+        key = normalize_phone(phone)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, lead_id, value = entry
+                if expires_at > time.monotonic():
+                    # Mark as most recently used
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                
+                # Count each expiry once, however often the entry is read
+                if key not in self._expired:
+                    self._expired.add(key)
+                    self.stats["expirations"] += 1
+        
+        # Fall back to disk tier
+        value = self._get_from_backing(key)
+        
+        with self._lock:
+            if value is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+        
+        return value
+    
+    def get_lead(self, lead_id: str) -> Optional[Any]:
+        """Get fresh in-memory result cached for any of a lead's numbers"""
+        now = time.monotonic()
+        
+        with self._lock:
+            for key in self._lead_index.get(str(lead_id), ()):
+                expires_at, _, value = self._entries[key]
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+        
+        return None
+    
+    def get_stale(self, phone: str) -> Optional[Any]:
+        """Get last known result for phone number, ignoring expiry"""
+        key = normalize_phone(phone)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.stats["stale_hits"] += 1
+                return entry[2]
+        
+        if not self.backing or not key:
+            return None
+        
+        entry = self.backing.get_entry(NAMESPACE_LEAD, key)
+        if entry is None:
+            return None
+        
+        with self._lock:
+            self.stats["stale_hits"] += 1
+        return entry[0].get("value")
+    
+    def _get_from_backing(self, key: str) -> Optional[Any]:
+        """Load fresh entry from disk tier and promote it to memory"""
+        if not self.backing or not key:
+            return None
+        
+        entry = self.backing.get_entry(NAMESPACE_LEAD, key)
+        if entry is None:
+            return None
+        
+        record, stored_at = entry
+        remaining = stored_at + self.ttl - time.time()
+        if remaining <= 0:
+            return None
+        
+        with self._lock:
+            self._store(key, record.get("value"), record.get("lead_id"), remaining)
+        
+        return record.get("value")
+    
+    def set(self, phone: str, value: Any, lead_id: Optional[str] = None) -> None:
+        """Store lookup result for phone number"""
+        key = normalize_phone(phone)
+        if not key or self.max_entries <= 0:
+            return
+        
+        with self._lock:
+            self._store(key, value, lead_id, self.ttl)
+        
+        # Write through to disk tier
+        if self.backing:
+            self.backing.set(
+                NAMESPACE_LEAD,
+                key,
+                {"value": value, "lead_id": lead_id},
+                tag=str(lead_id) if lead_id else None
+            )
+    
+    def _store(
+        self,
+        key: str,
+        value: Any,
+        lead_id: Optional[str],
+        ttl: float
+    ) -> None:
+        """Insert entry and enforce size limit (lock must be held)"""
+        if key in self._entries:
+            self._remove(key)
+        
+        self._entries[key] = (time.monotonic() + ttl, lead_id, value)
+        if lead_id:
+            self._lead_index.setdefault(str(lead_id), set()).add(key)
+        
+        # Enforce size limit, least recently used first
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+    
+    def preload(self, limit: int = API_CACHE_MAX_ENTRIES) -> List[Tuple[str, Any]]:
+        """
+        Load most recently used lookups from disk tier into memory
+        Returns (phone, value) of every entry read, including ones too old to be served fresh
+        """
+        if not self.backing:
+            return []
+        
+        entries = self.backing.get_recent(NAMESPACE_LEAD, min(limit, self.max_entries))
+        now = time.time()
+        
+        with self._lock:
+            # Oldest first, so the most recent end up most recently used
+            for key, record, stored_at in reversed(entries):
+                remaining = stored_at + self.ttl - now
+                if remaining > 0 and key not in self._entries:
+                    self._store(key, record.get("value"), record.get("lead_id"), remaining)
+        
+        return [(key, record.get("value")) for key, record, _ in entries]
+    
+    def invalidate(self, phone: str) -> None:
+        """Drop cached result for phone number"""
+        key = normalize_phone(phone)
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.stats["invalidations"] += 1
+        
+        if self.backing and key:
+            self.backing.delete(NAMESPACE_LEAD, key)
+    
+    def invalidate_lead(self, lead_id: str) -> None:
+        """Drop all cached results belonging to a lead"""
+        with self._lock:
+            keys = list(self._lead_index.get(str(lead_id), ()))
+            for key in keys:
+                self._remove(key)
+                self.stats["invalidations"] += 1
+        
+        if self.backing:
+            self.backing.delete_tag(NAMESPACE_LEAD, str(lead_id))
+    
+    def purge_expired(self) -> int:
+        """Remove all expired entries, returns number removed"""
+        now = time.monotonic()
+        
+        with self._lock:
+            expired = [
+                key for key, (expires_at, _, _) in self._entries.items()
+                if expires_at <= now
+            ]
+            for key in expired:
+                if key not in self._expired:
+                    self.stats["expirations"] += 1
+                self._remove(key)
+        
+        return len(expired)
+    
+    def clear(self) -> None:
+        """Clear all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._lead_index.clear()
+            self._expired.clear()
+        
+        if self.backing:
+            self.backing.clear(NAMESPACE_LEAD)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            stats = self.stats.copy()
+            stats["size"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+    
+    def _remove(self, key: str) -> None:
+        """Remove entry and its lead index reference (lock must be held)"""
+        _, lead_id, _ = self._entries.pop(key)
+        self._expired.discard(key)
+        if lead_id:
+            keys = self._lead_index.get(str(lead_id))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._lead_index[str(lead_id)]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
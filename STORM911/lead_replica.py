@@ -0,0 +1,474 @@
+"""
+Lead Replica for Storm911
+Local SQLite copy of campaign leads, kept current by a background sync
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from config import (
+    DATA_DIR,
+    ERRORS,
+    API_RATE_LIMIT,
+    REPLICA_SYNC_INTERVAL,
+    REPLICA_QUOTA_SHARE,
+    REPLICA_SCAN_GAP,
+    REPLICA_START_ID,
+    REPLICA_REFRESH_AGE
+)
+from lead_cache import normalize_phone
+from phone_index import lead_phones, with_phone
+from rate_limiter import PRIORITY_NORMAL, PRIORITY_BULK
+
+# Sync state keys
+STATE_NEXT_ID = "next_id"
+STATE_LAST_SYNC = "last_sync"
+
+class LeadReplica:
+    def __init__(self, api_handler: Any, replica_file: str = None):
+        """Initialize Lead Replica"""
+        self.api_handler = api_handler
+        self.replica_file = replica_file or os.path.join(DATA_DIR, "lead_replica.sqlite3")
+        
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(self.replica_file), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.replica_file, check_same_thread=False)
+        self._create_schema()
+        self.load_phone_index()
+        
+        # Background refreshes of single numbers, one per phone at a time
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="replica-refresh"
+        )
+        self._refreshing = set()
+        
+        # Sync thread
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+        self.interval = REPLICA_SYNC_INTERVAL
+        self._last_pass: Optional[float] = None
+        
+        # Initialize counters
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "synced": 0,
+            "refreshed": 0,
+            "sync_errors": 0,
+            "last_sync_duration": 0.0
+        }
+    
+    def _create_schema(self) -> None:
+        """Create lead and sync state tables"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS leads (
+                    id TEXT PRIMARY KEY,
+                    phone TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    refreshed_at REAL NOT NULL
+                )
+                """
+            )
+            # Lookups by number go through the in-memory phone index
+            self._conn.execute("DROP INDEX IF EXISTS idx_leads_phone")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_leads_refreshed ON leads (refreshed_at)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._conn.commit()
+    
+    def load_phone_index(self) -> None:
+        """Index every number of the stored leads"""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, data FROM leads").fetchall()
+        
+        for lead_id, data in rows:
+            self.api_handler.phone_index.add_lead(json.loads(data), lead_id)
+    
+    def find_by_phone(self, phone: str) -> List[Dict]:
+        """Get stored leads with phone as any of their numbers"""
+        lead_ids = self.api_handler.phone_index.lookup(phone)
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM leads WHERE id IN ({','.join('?' * len(lead_ids))}) ORDER BY id",
+                lead_ids
+            ).fetchall() if lead_ids else []
+            
+            if rows:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+        
+        return [json.loads(row[0]) for row in rows]
+    
+    def get(self, lead_id: str) -> Optional[Dict]:
+        """Get stored lead by ID"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM leads WHERE id = ?",
+                (str(lead_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def upsert(self, lead: Dict) -> bool:
+        """Store lead as fetched from the API, returns False if it has no ID"""
+        lead_id = self.api_handler._extract_lead_id(lead)
+        if not lead_id:
+            return False
+        
+        with self._lock:
+            self._upsert(lead_id, lead)
+            self._conn.commit()
+        return True
+    
+    def upsert_result(self, result: Any, phone: Optional[str] = None) -> int:
+        """
+        Store every lead in a search or get result, returns number stored
+        phone is the number searched, stored with leads that lack one
+        """
+        leads = result if isinstance(result, list) else [result]
+        stored = 0
+        
+        with self._lock:
+            for lead in leads:
+                if not isinstance(lead, dict):
+                    continue
+                lead = with_phone(lead, phone)
+                lead_id = self.api_handler._extract_lead_id(lead)
+                if lead_id:
+                    self._upsert(lead_id, lead)
+                    stored += 1
+            self._conn.commit()
+        
+        return stored
+    
+    def _upsert(self, lead_id: str, lead: Dict) -> None:
+        """Write and index lead row (lock held, caller commits)"""
+        self.api_handler.phone_index.add_lead(lead, lead_id)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO leads (id, phone, data, refreshed_at) VALUES (?, ?, ?, ?)",
+            (
+                lead_id,
+                normalize_phone(lead.get('phone', '')),
+                json.dumps(lead),
+                time.time()
+            )
+        )
+    
+    def delete(self, lead_id: str) -> None:
+        """Remove lead"""
+        self.api_handler.phone_index.remove(lead_id)
+        with self._lock:
+            self._conn.execute("DELETE FROM leads WHERE id = ?", (str(lead_id),))
+            self._conn.commit()
+    
+    def refresh_async(self, phone: str) -> None:
+        """Re-fetch phone from the API in the background"""
+        phone = normalize_phone(phone)
+        if not phone:
+            return
+        
+        with self._lock:
+            if phone in self._refreshing:
+                return
+            self._refreshing.add(phone)
+        
+        try:
+            self._refresh_executor.submit(self._refresh_phone, phone)
+        except RuntimeError:
+            # Executor already shut down
+            with self._lock:
+                self._refreshing.discard(phone)
+    
+    def _refresh_phone(self, phone: str) -> None:
+        """Re-fetch phone, search results are written back by APIHandler"""
+        try:
+            success, result = self.api_handler.search_lead(
+                phone,
+                use_cache=False,
+                priority=PRIORITY_NORMAL
+            )
+            
+            # Lead no longer exists for this number
+            if not success and result == ERRORS['api']['not_found']:
+                for lead in self.find_by_phone(phone):
+                    lead_id = self.api_handler._extract_lead_id(lead)
+                    if lead_id:
+                        self.delete(lead_id)
+            
+            if success:
+                self.stats["refreshed"] += 1
+        except Exception as e:
+            logging.error(f"Error refreshing replica lead: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(phone)
+    
+    def start(self, interval: float = REPLICA_SYNC_INTERVAL) -> None:
+        """Start background sync"""
+        if self._syncer and self._syncer.is_alive():
+            return
+        
+        self.interval = interval
+        self._stop_event.clear()
+        self._syncer = threading.Thread(
+            target=self._sync_loop,
+            args=(interval,),
+            name="lead-replica-sync",
+            daemon=True
+        )
+        self._syncer.start()
+    
+    def stop(self, timeout: float = 5) -> None:
+        """Stop background sync"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._syncer:
+            self._syncer.join(timeout=timeout)
+    
+    def request_sync(self) -> None:
+        """Run a sync pass now"""
+        self._wake_event.set()
+    
+    def _sync_loop(self, interval: float) -> None:
+        """Sync until stopped"""
+        while not self._stop_event.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                self.stats["sync_errors"] += 1
+                logging.error(f"Error syncing lead replica: {str(e)}")
+            
+            self._wake_event.wait(interval)
+            self._wake_event.clear()
+    
+    def sync(self, max_requests: Optional[int] = None) -> Dict[str, int]:
+        """
+        Run one sync pass within a request budget, by default get_sync_budget()
+        ReadyMode has no list or changed-since endpoint, so new leads are found by
+        scanning IDs forward from the watermark and known leads are re-fetched
+        oldest first. Without a campaign configured only leads looked up are kept
+        """
+        started = time.monotonic()
+        if max_requests is None:
+            max_requests = self.get_sync_budget()
+        self._last_pass = started
+        budget = [max_requests]
+        
+        added = self._scan_new_leads(budget)
+        refreshed = self._refresh_oldest(budget)
+        
+        self._set_state(STATE_LAST_SYNC, str(time.time()))
+        self.stats["synced"] += added
+        self.stats["last_sync_duration"] = time.monotonic() - started
+        
+        if added or refreshed:
+            logging.info(f"Lead replica sync added {added} and refreshed {refreshed} leads")
+        
+        return {"added": added, "refreshed": refreshed}
+    
+    def _scan_new_leads(self, budget: List[int]) -> int:
+        """
+        Fetch leads after the watermark until a run of missing IDs
+        get_lead is not scoped to a campaign, each lead found is kept only if
+        the campaign's leadUpdate search for its number lists it
+        """
+        campaign_id = self.api_handler.get_campaign_id()
+        next_id = self._get_state(STATE_NEXT_ID) or self._get_start_id()
+        if not campaign_id or next_id is None:
+            return 0
+        
+        next_id = int(next_id)
+        added = 0
+        misses = 0
+        
+        while budget[0] > 0 and not self._stop_event.is_set():
+            budget[0] -= 1
+            success, result = self.api_handler.get_lead(str(next_id), priority=PRIORITY_BULK)
+            
+            if success and isinstance(result, dict):
+                in_campaign = self._in_campaign(result, str(next_id), campaign_id, budget)
+                if in_campaign is None:
+                    # Check failed or out of budget, fetch the lead again next pass
+                    break
+                if in_campaign and self.upsert(result):
+                    added += 1
+                
+                misses = 0
+                next_id += 1
+                self._set_state(STATE_NEXT_ID, str(next_id))
+                continue
+            
+            if not success and result != ERRORS['api']['not_found']:
+                # Outage or budget exhausted, resume here next pass
+                break
+            
+            misses += 1
+            if misses < REPLICA_SCAN_GAP:
+                next_id += 1
+                continue
+            
+            # Past the newest lead, unless a lead seen elsewhere lies beyond the gap
+            known = self._get_next_known_id(next_id)
+            if known is None:
+                break
+            next_id = known + 1
+            misses = 0
+            self._set_state(STATE_NEXT_ID, str(next_id))
+        
+        return added
+    
+    def _refresh_oldest(self, budget: List[int]) -> int:
+        """Re-fetch leads not refreshed within REPLICA_REFRESH_AGE"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM leads WHERE refreshed_at < ? ORDER BY refreshed_at LIMIT ?",
+                (time.time() - REPLICA_REFRESH_AGE, max(0, budget[0]))
+            ).fetchall()
+        
+        refreshed = 0
+        for (lead_id,) in rows:
+            if budget[0] <= 0 or self._stop_event.is_set():
+                break
+            budget[0] -= 1
+            
+            success, result = self.api_handler.get_lead(lead_id, priority=PRIORITY_BULK)
+            if success and isinstance(result, dict):
+                self.upsert(result)
+                refreshed += 1
+            elif result == ERRORS['api']['not_found']:
+                self.delete(lead_id)
+            else:
+                break
+        
+        return refreshed
+    
+    def get_sync_budget(self) -> int:
+        """
+        Get requests the next sync pass may spend
+        The lookup quota is shared by every agent of the account, so sync only
+        spends its share of it for the time since the last pass, at most one
+        interval's worth
+        """
+        # ReadyMode enforces the quota even if local rate limiting is off
+        per_hour = self.api_handler._get_setting('api', 'rate_limit', API_RATE_LIMIT) or API_RATE_LIMIT
+        share = self.api_handler._get_setting('api', 'replica_quota_share', REPLICA_QUOTA_SHARE)
+        
+        elapsed = self.interval
+        if self._last_pass is not None:
+            elapsed = min(self.interval, time.monotonic() - self._last_pass)
+        return int(per_hour * share * elapsed / 3600)
+    
+    def _in_campaign(
+        self,
+        lead: Dict,
+        lead_id: str,
+        campaign_id: str,
+        budget: List[int]
+    ) -> Optional[bool]:
+        """Check lead belongs to campaign, None if that could not be checked"""
+        phones = lead_phones(lead)
+        if not phones:
+            return False
+        if budget[0] <= 0:
+            return None
+        budget[0] -= 1
+        
+        success, result = self.api_handler.search_lead_updates(
+            campaign_id,
+            normalize_phone(lead.get('phone')) or min(phones),
+            PRIORITY_BULK
+        )
+        if not success:
+            return False if result == ERRORS['api']['not_found'] else None
+        
+        matches = [match for match in (result if isinstance(result, list) else [result]) if match]
+        
+        # Results without IDs can't be told apart, any match counts
+        match_ids = {self.api_handler._extract_lead_id(match) for match in matches} - {None}
+        return lead_id in match_ids if match_ids else bool(matches)
+    
+    def _get_start_id(self) -> Optional[int]:
+        """
+        Get first ID to scan when no watermark is stored
+        Defaults to the ID after the highest one seen in lookups, None until
+        a lead was seen. Lead IDs are large, a scan from 1 would give up at
+        the first gap long before reaching them
+        """
+        start_id = int(self.api_handler._get_setting('api', 'replica_start_id', REPLICA_START_ID) or 0)
+        if start_id > 0:
+            return start_id
+        
+        known = self._get_known_ids()
+        return max(known) + 1 if known else None
+    
+    def _get_next_known_id(self, after: int) -> Optional[int]:
+        """Get lowest numeric lead ID above after seen in lookups or stored"""
+        return min((lead_id for lead_id in self._get_known_ids() if lead_id > after), default=None)
+    
+    def _get_known_ids(self) -> List[int]:
+        """Get numeric IDs of leads seen in lookups, stored leads are indexed too"""
+        return [
+            int(lead_id)
+            for lead_id in self.api_handler.phone_index.get_lead_ids()
+            if lead_id.isdigit()
+        ]
+    
+    def _get_state(self, key: str) -> Optional[str]:
+        """Get sync state value"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = ?",
+                (key,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _set_state(self, key: str, value: str) -> None:
+        """Set sync state value"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                (key, value)
+            )
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        """Remove all leads and reset the watermark"""
+        with self._lock:
+            self._conn.execute("DELETE FROM leads")
+            self._conn.execute("DELETE FROM sync_state")
+            self._conn.commit()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get replica size, watermark and sync statistics"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+        
+        stats = self.stats.copy()
+        stats["leads"] = count
+        stats["next_id"] = self._get_state(STATE_NEXT_ID)
+        stats["last_sync"] = self._get_state(STATE_LAST_SYNC)
+        return stats
+    
+    def close(self) -> None:
+        """Stop sync and close database"""
+        self.stop()
+        self._refresh_executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._conn.close()
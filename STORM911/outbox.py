@@ -0,0 +1,395 @@
+"""
+Outbox for Storm911
+Durable write-behind queue for ReadyMode lead writes
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    DATA_DIR,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETRY_BACKOFF,
+    OUTBOX_RETRY_BACKOFF_MAX,
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_RETENTION
+)
+from lead_cache import normalize_phone
+
+# Message states
+STATUS_PENDING = "pending"
+STATUS_DELIVERED = "delivered"
+STATUS_FAILED = "failed"
+
+# APIHandler methods that may be queued
+OPERATIONS = ("create_lead", "update_lead", "update_lead_fields")
+
+class Outbox:
+    def __init__(self, api_handler: Any, outbox_file: str = None):
+        """Initialize Outbox"""
+        self.api_handler = api_handler
+        self.outbox_file = outbox_file or os.path.join(DATA_DIR, "outbox.sqlite3")
+        
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(self.outbox_file), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.outbox_file, check_same_thread=False)
+        self._create_schema()
+        
+        # Drainer thread
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._drainer: Optional[threading.Thread] = None
+    
+    def _create_schema(self) -> None:
+        """Create message table and indexes"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lead_key TEXT NOT NULL,
+                    operation TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    delivered_at REAL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_messages_status_lead "
+                "ON messages (status, lead_key, id)"
+            )
+            self._conn.commit()
+    
+    def enqueue(
+        self,
+        operation: str,
+        payload: Dict,
+        lead_id: Optional[str] = None,
+        phone: Optional[str] = None
+    ) -> int:
+        """
+        Record write for background delivery
+        payload holds the keyword arguments for the APIHandler method,
+        lead_id and phone identify the lead for per-lead ordering
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unsupported outbox operation: {operation}")
+        
+        now = time.time()
+        with self._lock:
+            lead_key = self._get_lead_key(lead_id, phone)
+            cursor = self._conn.execute(
+                "INSERT INTO messages "
+                "(lead_key, operation, payload, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (lead_key, operation, json.dumps(payload), STATUS_PENDING, now, now)
+            )
+            self._conn.commit()
+            message_id = cursor.lastrowid
+        
+        # Deliver promptly
+        self._wake_event.set()
+        
+        logging.info(f"Queued {operation} for lead {lead_key} (message {message_id})")
+        return message_id
+    
+    def _get_lead_key(self, lead_id: Optional[str], phone: Optional[str]) -> str:
+        """
+        Get queue key of a lead, messages with the same key are delivered in order (lock held)
+        Every write to a lead gets the same key whichever number or ID it names:
+        its pending queue if one exists, else its lead ID, else its number.
+        Writes naming neither get a queue of their own
+        """
+        phone_index = self.api_handler.phone_index
+        phones = {normalize_phone(phone)} - {''}
+        lead_id = str(lead_id) if lead_id else None
+        
+        if not lead_id:
+            # Number of a single known lead
+            found = {known for number in phones for known in phone_index.lookup(number)}
+            lead_id = found.pop() if len(found) == 1 else None
+        if lead_id:
+            phones |= phone_index.get_phones(lead_id)
+        
+        keys = [f"lead:{lead_id}"] if lead_id else []
+        keys += [f"phone:{number}" for number in sorted(phones)]
+        if not keys:
+            return f"message:{uuid.uuid4().hex}"
+        
+        # Join a queue already pending under another of the lead's keys
+        row = self._conn.execute(
+            f"SELECT lead_key FROM messages WHERE status = ? "
+            f"AND lead_key IN ({','.join('?' * len(keys))}) ORDER BY id LIMIT 1",
+            [STATUS_PENDING] + keys
+        ).fetchone()
+        return row[0] if row else keys[0]
+    
+    def update_lead(self, lead_id: str, lead_data: Dict) -> Tuple[bool, str]:
+        """Queue lead update, same signature as APIHandler.update_lead"""
+        try:
+            self.enqueue(
+                "update_lead",
+                {"lead_id": lead_id, "lead_data": lead_data},
+                lead_id=lead_id,
+                phone=lead_data.get("phone")
+            )
+            return True, "Lead update queued"
+        except Exception as e:
+            logging.error(f"Error queuing lead update: {str(e)}")
+            return False, f"Error queuing lead update: {str(e)}"
+    
+    def update_lead_fields(
+        self,
+        campaign_id: str,
+        phone: str,
+        fields: Dict
+    ) -> Tuple[bool, str]:
+        """Queue leadUpdate write, same signature as APIHandler.update_lead_fields"""
+        try:
+            self.enqueue(
+                "update_lead_fields",
+                {"campaign_id": campaign_id, "phone": phone, "fields": fields},
+                phone=phone
+            )
+            return True, "Lead update queued"
+        except Exception as e:
+            logging.error(f"Error queuing lead update: {str(e)}")
+            return False, f"Error queuing lead update: {str(e)}"
+    
+    def create_lead(self, lead_data: Dict) -> Tuple[bool, str]:
+        """Queue lead creation, same signature as APIHandler.create_lead"""
+        try:
+            self.enqueue(
+                "create_lead",
+                {"lead_data": lead_data},
+                phone=lead_data.get("phone")
+            )
+            return True, "Lead creation queued"
+        except Exception as e:
+            logging.error(f"Error queuing lead creation: {str(e)}")
+            return False, f"Error queuing lead creation: {str(e)}"
+    
+    def start(self) -> None:
+        """Start background drainer"""
+        if self._drainer and self._drainer.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._drainer = threading.Thread(
+            target=self._drain_loop,
+            name="outbox-drainer",
+            daemon=True
+        )
+        self._drainer.start()
+    
+    def stop(self, timeout: float = 5) -> None:
+        """Stop background drainer"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._drainer:
+            self._drainer.join(timeout=timeout)
+    
+    def _drain_loop(self) -> None:
+        """Deliver due messages until stopped"""
+        while not self._stop_event.is_set():
+            try:
+                self.drain()
+                self.purge_delivered()
+            except Exception as e:
+                logging.error(f"Error draining outbox: {str(e)}")
+            
+            self._wake_event.wait(self._get_wait_time())
+            self._wake_event.clear()
+    
+    def drain(self) -> int:
+        """Deliver all due messages once, returns number delivered"""
+        delivered = 0
+        
+        # Before login every write would fail authentication
+        if not self.api_handler.has_credentials():
+            return delivered
+        
+        for message in self._get_due_messages():
+            if self._stop_event.is_set():
+                break
+            if self._deliver(message):
+                delivered += 1
+        
+        return delivered
+    
+    def _get_due_messages(self) -> List[Dict]:
+        """Get oldest pending message per lead that is due for delivery"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT m.id, m.lead_key, m.operation, m.payload, m.attempts
+                FROM messages m
+                JOIN (
+                    SELECT lead_key, MIN(id) AS head_id
+                    FROM messages
+                    WHERE status = ?
+                    GROUP BY lead_key
+                ) heads ON heads.head_id = m.id
+                WHERE m.next_attempt_at <= ?
+                ORDER BY m.id
+                """,
+                (STATUS_PENDING, time.time())
+            ).fetchall()
+        
+        return [
+            {
+                "id": row[0],
+                "lead_key": row[1],
+                "operation": row[2],
+                "payload": json.loads(row[3]),
+                "attempts": row[4]
+            }
+            for row in rows
+        ]
+    
+    def _deliver(self, message: Dict) -> bool:
+        """
+        Send a single message through the API handler
+        Failures ReadyMode may recover from are retried with backoff, others
+        (not found, authentication, rejected) fail the message right away so
+        later writes for the lead are not held up behind it
+        """
+        retryable = True
+        try:
+            method = getattr(self.api_handler, message["operation"])
+            success, result = method(**message["payload"])
+            retryable = self.api_handler.is_retryable_error(result)
+        except Exception as e:
+            logging.error(f"Error delivering outbox message {message['id']}: {str(e)}")
+            success, result = False, str(e)
+        
+        now = time.time()
+        with self._lock:
+            if success:
+                self._conn.execute(
+                    "UPDATE messages SET status = ?, attempts = attempts + 1, "
+                    "delivered_at = ?, last_error = NULL WHERE id = ?",
+                    (STATUS_DELIVERED, now, message["id"])
+                )
+            else:
+                attempts = message["attempts"] + 1
+                status = STATUS_PENDING
+                if not retryable or attempts >= OUTBOX_MAX_ATTEMPTS:
+                    status = STATUS_FAILED
+                delay = min(
+                    OUTBOX_RETRY_BACKOFF_MAX,
+                    OUTBOX_RETRY_BACKOFF * (2 ** (attempts - 1))
+                )
+                self._conn.execute(
+                    "UPDATE messages SET status = ?, attempts = ?, "
+                    "next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (status, attempts, now + delay, str(result), message["id"])
+                )
+                
+                if status == STATUS_FAILED:
+                    logging.error(
+                        f"Outbox message {message['id']} for lead {message['lead_key']} "
+                        f"failed after {attempts} attempts: {result}"
+                    )
+                else:
+                    logging.warning(
+                        f"Outbox message {message['id']} failed, retrying in {delay}s: {result}"
+                    )
+            
+            self._conn.commit()
+        
+        return success
+    
+    def _get_wait_time(self) -> float:
+        """Get time until the next pending message is due"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM messages WHERE status = ?",
+                (STATUS_PENDING,)
+            ).fetchone()
+        
+        if row[0] is None:
+            return OUTBOX_POLL_INTERVAL
+        return max(0.0, min(OUTBOX_POLL_INTERVAL, row[0] - time.time()))
+    
+    def retry_failed(self) -> int:
+        """Requeue messages that exhausted their attempts"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE messages SET status = ?, attempts = 0, next_attempt_at = ? "
+                "WHERE status = ?",
+                (STATUS_PENDING, time.time(), STATUS_FAILED)
+            )
+            self._conn.commit()
+        
+        self._wake_event.set()
+        return cursor.rowcount
+    
+    def purge_delivered(self, max_age: float = OUTBOX_RETENTION) -> int:
+        """Remove delivered messages older than max_age seconds"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM messages WHERE status = ? AND delivered_at <= ?",
+                (STATUS_DELIVERED, time.time() - max_age)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+    
+    def get_pending(self, lead_key: Optional[str] = None) -> List[Dict]:
+        """Get undelivered messages, optionally for a single lead"""
+        query = (
+            "SELECT id, lead_key, operation, attempts, last_error, created_at "
+            "FROM messages WHERE status = ?"
+        )
+        params: list = [STATUS_PENDING]
+        if lead_key is not None:
+            query += " AND lead_key = ?"
+            params.append(str(lead_key))
+        
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        
+        return [
+            {
+                "id": row[0],
+                "lead_key": row[1],
+                "operation": row[2],
+                "attempts": row[3],
+                "last_error": row[4],
+                "created_at": row[5]
+            }
+            for row in rows
+        ]
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get message counts by status"""
+        stats = {STATUS_PENDING: 0, STATUS_DELIVERED: 0, STATUS_FAILED: 0}
+        
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM messages GROUP BY status"
+            ).fetchall()
+        
+        for status, count in rows:
+            stats[status] = count
+        return stats
+    
+    def close(self) -> None:
+        """Stop drainer and close database"""
+        self.stop()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,382 @@
+"""
+Persistent Cache for Storm911
+Disk-backed cache tier stored in a single SQLite file under CACHE_DIR
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    CACHE_DIR,
+    MAX_CACHE_SIZE,
+    CACHE_CLEANUP_INTERVAL,
+    PERSISTENT_CACHE_TTL,
+    CACHE_TOUCH_FLUSH_SIZE
+)
+from serializers import dumps, loads
+
+# Cache namespaces
+NAMESPACE_LEAD = "lead"
+NAMESPACE_VALIDATION = "validation"
+
+class PersistentCache:
+    def __init__(
+        self,
+        cache_file: str = None,
+        max_size: int = MAX_CACHE_SIZE,
+        ttl: int = PERSISTENT_CACHE_TTL,
+        cleanup_interval: int = CACHE_CLEANUP_INTERVAL,
+        touch_flush_size: int = CACHE_TOUCH_FLUSH_SIZE
+    ):
+        """Initialize Persistent Cache"""
+        self.cache_file = cache_file or os.path.join(CACHE_DIR, "cache.sqlite3")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self.touch_flush_size = touch_flush_size
+        
+        # Ensure cache directory exists
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        
+        # Single connection shared by callers and janitor
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        self._create_schema()
+        
+        # Access times of read entries, written in batches
+        self._touched: Dict[Tuple[str, str], float] = {}
+        
+        # Janitor thread
+        self._stop_event = threading.Event()
+        self._janitor: Optional[threading.Thread] = None
+        
+        # Initialize counters
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+    
+    def _create_schema(self) -> None:
+        """Create cache table and indexes"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate_value_column()
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    tag TEXT,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_accessed "
+                "ON entries (accessed_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_stored "
+                "ON entries (stored_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_tag "
+                "ON entries (namespace, tag)"
+            )
+            self._conn.commit()
+    
+    def _migrate_value_column(self) -> None:
+        """
+        Rebuild entries of older cache files, whose value column was declared TEXT
+        Values are encoded bytes, as JSON or msgpack, so they are BLOBs (lock held)
+        """
+        columns = {
+            row[1]: row[2]
+            for row in self._conn.execute("PRAGMA table_info(entries)")
+        }
+        if columns.get("value", "BLOB").upper() == "BLOB":
+            return
+        
+        self._conn.executescript(
+            """
+            BEGIN;
+            ALTER TABLE entries RENAME TO entries_old;
+            DROP INDEX IF EXISTS idx_entries_accessed;
+            DROP INDEX IF EXISTS idx_entries_stored;
+            DROP INDEX IF EXISTS idx_entries_tag;
+            CREATE TABLE entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                tag TEXT,
+                PRIMARY KEY (namespace, key)
+            );
+            INSERT INTO entries
+                SELECT namespace, key, CAST(value AS BLOB), size, stored_at, accessed_at, tag
+                FROM entries_old;
+            DROP TABLE entries_old;
+            COMMIT;
+            """
+        )
+        logging.info("Migrated persistent cache values to BLOB")
+    
+    def get(
+        self,
+        namespace: str,
+        key: str,
+        max_age: Optional[float] = None
+    ) -> Optional[Any]:
+        """Get cached value, or None if missing or older than max_age"""
+        entry = self.get_entry(namespace, key)
+        if entry is None:
+            return None
+        
+        value, stored_at = entry
+        if max_age is not None and stored_at + max_age <= time.time():
+            return None
+        return value
+    
+    def get_entry(self, namespace: str, key: str) -> Optional[tuple]:
+        """Get (value, stored_at) tuple for cached entry"""
+        try:
+            now = time.time()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, stored_at FROM entries "
+                    "WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+                
+                if row is None or row[1] + self.ttl <= now:
+                    self.stats["misses"] += 1
+                    return None
+                
+                self._touched[(namespace, key)] = now
+                if len(self._touched) >= self.touch_flush_size:
+                    self._flush_touched()
+                self.stats["hits"] += 1
+            
+            return loads(row[0]), row[1]
+        
+        except Exception as e:
+            logging.error(f"Error reading cache entry {namespace}/{key}: {str(e)}")
+            return None
+    
+    def _flush_touched(self) -> None:
+        """Write buffered access times, caller must hold the lock"""
+        if not self._touched:
+            return
+        
+        self._conn.executemany(
+            "UPDATE entries SET accessed_at = ? "
+            "WHERE namespace = ? AND key = ?",
+            [
+                (accessed_at, namespace, key)
+                for (namespace, key), accessed_at in self._touched.items()
+            ]
+        )
+        self._conn.commit()
+        self._touched.clear()
+    
+    def get_recent(self, namespace: str, limit: int) -> List[Tuple[str, Any, float]]:
+        """Get (key, value, stored_at) of most recently used entries in namespace"""
+        try:
+            with self._lock:
+                self._flush_touched()
+                rows = self._conn.execute(
+                    "SELECT key, value, stored_at FROM entries "
+                    "WHERE namespace = ? AND stored_at > ? "
+                    "ORDER BY accessed_at DESC LIMIT ?",
+                    (namespace, time.time() - self.ttl, limit)
+                ).fetchall()
+            
+            return [(key, loads(value), stored_at) for key, value, stored_at in rows]
+        
+        except Exception as e:
+            logging.error(f"Error reading recent cache entries {namespace}: {str(e)}")
+            return []
+    
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        tag: Optional[str] = None
+    ) -> bool:
+        """Store value in cache, optionally tagged for group deletion"""
+        try:
+            payload = dumps(value)
+            now = time.time()
+            
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(namespace, key, value, size, stored_at, accessed_at, tag) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (namespace, key, payload, len(payload), now, now, tag)
+                )
+                self._conn.commit()
+                self._touched.pop((namespace, key), None)
+                self.stats["writes"] += 1
+            
+            return True
+        
+        except Exception as e:
+            logging.error(f"Error writing cache entry {namespace}/{key}: {str(e)}")
+            return False
+    
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove cached value"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                )
+                self._conn.commit()
+        except Exception as e:
+            logging.error(f"Error deleting cache entry {namespace}/{key}: {str(e)}")
+    
+    def delete_tag(self, namespace: str, tag: str) -> None:
+        """Remove all values stored with tag"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND tag = ?",
+                    (namespace, tag)
+                )
+                self._conn.commit()
+        except Exception as e:
+            logging.error(f"Error deleting cache tag {namespace}/{tag}: {str(e)}")
+    
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """Clear cache, or a single namespace"""
+        try:
+            with self._lock:
+                if namespace:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE namespace = ?",
+                        (namespace,)
+                    )
+                else:
+                    self._conn.execute("DELETE FROM entries")
+                self._conn.commit()
+        except Exception as e:
+            logging.error(f"Error clearing cache: {str(e)}")
+    
+    def total_size(self) -> int:
+        """Get total size of cached values in bytes"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return row[0]
+    
+    def cleanup(self) -> Dict[str, int]:
+        """Remove expired entries and enforce the byte budget"""
+        result = {"expired": 0, "evicted": 0}
+        
+        try:
+            with self._lock:
+                # Eviction order needs current access times
+                self._flush_touched()
+                
+                # Drop expired entries
+                cursor = self._conn.execute(
+                    "DELETE FROM entries WHERE stored_at <= ?",
+                    (time.time() - self.ttl,)
+                )
+                result["expired"] = cursor.rowcount
+                
+                # Evict least recently accessed entries until under budget
+                total = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()[0]
+                
+                if total > self.max_size:
+                    rows = self._conn.execute(
+                        "SELECT namespace, key, size FROM entries "
+                        "ORDER BY accessed_at ASC"
+                    )
+                    doomed = []
+                    for namespace, key, size in rows:
+                        if total <= self.max_size:
+                            break
+                        doomed.append((namespace, key))
+                        total -= size
+                    
+                    self._conn.executemany(
+                        "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                        doomed
+                    )
+                    result["evicted"] = len(doomed)
+                
+                self._conn.commit()
+                self.stats["expirations"] += result["expired"]
+                self.stats["evictions"] += result["evicted"]
+            
+            if result["expired"] or result["evicted"]:
+                logging.info(
+                    f"Cache cleanup removed {result['expired']} expired and "
+                    f"{result['evicted']} evicted entries"
+                )
+        
+        except Exception as e:
+            logging.error(f"Error cleaning up cache: {str(e)}")
+        
+        return result
+    
+    def start_janitor(self) -> None:
+        """Start background cleanup thread"""
+        if self._janitor and self._janitor.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._janitor = threading.Thread(
+            target=self._janitor_loop,
+            name="cache-janitor",
+            daemon=True
+        )
+        self._janitor.start()
+    
+    def _janitor_loop(self) -> None:
+        """Run cleanup every cleanup interval until stopped"""
+        # Enforce budget once at startup, then on the interval
+        while not self._stop_event.is_set():
+            self.cleanup()
+            self._stop_event.wait(self.cleanup_interval)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        stats = self.stats.copy()
+        stats["size_bytes"] = self.total_size()
+        stats["max_size"] = self.max_size
+        return stats
+    
+    def close(self) -> None:
+        """Stop janitor and close database"""
+        self._stop_event.set()
+        if self._janitor:
+            self._janitor.join(timeout=5)
+        
+        with self._lock:
+            try:
+                self._flush_touched()
+            except Exception as e:
+                logging.error(f"Error flushing cache access times: {str(e)}")
+            self._conn.close()
@@ -0,0 +1,124 @@
+"""
+Phone Index for Storm911
+Maps every normalized phone number of a lead to its lead ID
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Set
+
+from lead_cache import normalize_phone
+
+# TPI phone fields, cell is phone3
+PHONE_FIELDS = ('phone',) + tuple(f'phone{index}' for index in range(1, 10))
+
+def lead_phones(lead: Any) -> Set[str]:
+    """Get normalized numbers from all phone fields of a lead"""
+    if not isinstance(lead, dict):
+        return set()
+    
+    phones = set()
+    for field in PHONE_FIELDS:
+        phone = normalize_phone(lead.get(field))
+        if phone:
+            phones.add(phone)
+    return phones
+
+def with_phone(lead: Any, phone: str) -> Any:
+    """
+    Get lead with phone filled in if it has no phone fields
+    leadUpdate results are keyed by field label and lack the number they were found by
+    """
+    phone = normalize_phone(phone)
+    if isinstance(lead, dict) and phone and not lead_phones(lead):
+        return dict(lead, phone=phone)
+    return lead
+
+class PhoneIndex:
+    def __init__(self):
+        """Initialize Phone Index"""
+        self._lock = threading.Lock()
+        
+        # phone -> lead IDs, lead ID -> phones
+        self._by_phone: Dict[str, Set[str]] = {}
+        self._by_lead: Dict[str, Set[str]] = {}
+        
+        # Initialize counters
+        self.stats = {
+            "hits": 0,
+            "misses": 0
+        }
+    
+    def add(self, lead_id: str, phones: Iterable[str]) -> None:
+        """Index lead under phones, replacing numbers indexed for it before"""
+        lead_id = str(lead_id)
+        phones = {normalize_phone(phone) for phone in phones} - {''}
+        
+        with self._lock:
+            for phone in self._by_lead.get(lead_id, set()) - phones:
+                self._unlink(phone, lead_id)
+            
+            if not phones:
+                self._by_lead.pop(lead_id, None)
+                return
+            
+            self._by_lead[lead_id] = phones
+            for phone in phones:
+                self._by_phone.setdefault(phone, set()).add(lead_id)
+    
+    def add_lead(self, lead: Any, lead_id: str) -> None:
+        """Index all phone fields of a lead"""
+        if lead_id:
+            self.add(lead_id, lead_phones(lead))
+    
+    def lookup(self, phone: str) -> List[str]:
+        """Get IDs of leads with phone as any of their numbers"""
+        with self._lock:
+            lead_ids = self._by_phone.get(normalize_phone(phone))
+            if lead_ids:
+                self.stats["hits"] += 1
+                return sorted(lead_ids)
+            
+            self.stats["misses"] += 1
+            return []
+    
+    def get_phones(self, lead_id: str) -> Set[str]:
+        """Get numbers indexed for lead"""
+        with self._lock:
+            return set(self._by_lead.get(str(lead_id), ()))
+    
+    def get_lead_ids(self) -> List[str]:
+        """Get IDs of all indexed leads"""
+        with self._lock:
+            return list(self._by_lead)
+    
+    def remove(self, lead_id: str) -> None:
+        """Drop lead from index"""
+        lead_id = str(lead_id)
+        with self._lock:
+            for phone in self._by_lead.pop(lead_id, ()):
+                self._unlink(phone, lead_id)
+    
+    def _unlink(self, phone: str, lead_id: str) -> None:
+        """Remove single phone -> lead reference (lock held)"""
+        lead_ids = self._by_phone.get(phone)
+        if lead_ids is not None:
+            lead_ids.discard(lead_id)
+            if not lead_ids:
+                del self._by_phone[phone]
+    
+    def clear(self) -> None:
+        """Clear index"""
+        with self._lock:
+            self._by_phone.clear()
+            self._by_lead.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and lookup statistics"""
+        with self._lock:
+            stats = self.stats.copy()
+            stats["phones"] = len(self._by_phone)
+            stats["leads"] = len(self._by_lead)
+        return stats
+    
+    def __len__(self) -> int:
+        return len(self._by_phone)
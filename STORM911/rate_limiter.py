@@ -0,0 +1,290 @@
+"""
+Rate Limiter for Storm911
+Priority-aware token bucket shared by all ReadyMode requests
+"""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from config import (
+    API_RATE_LIMIT_BURST,
+    API_RATE_LIMIT_RESERVE,
+    API_RATE_LIMIT_MIN_FRACTION,
+    API_RATE_LIMIT_INCREASE
+)
+
+# Priority classes, lower goes first
+PRIORITY_INTERACTIVE = 0  # agent-facing lookups and dispositions
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2  # prefetch, sync and batch jobs
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BULK: "bulk"
+}
+
+class SharedPriority:
+    """
+    Priority of a request shared by coalesced callers
+    Raised when a more urgent caller joins, a waiting acquire() picks it up
+    """
+    
+    def __init__(self, priority: int):
+        """Initialize Shared Priority"""
+        self.value = priority
+        self._lock = threading.Lock()
+        self._limiter: Optional["RateLimiter"] = None
+    
+    def raise_to(self, priority: int) -> None:
+        """Raise priority, waking the request if it waits for a token"""
+        with self._lock:
+            if priority >= self.value:
+                return
+            self.value = priority
+            limiter = self._limiter
+        
+        if limiter is not None:
+            limiter._wake()
+    
+    def _wait_on(self, limiter: Optional["RateLimiter"]) -> int:
+        """Set limiter the request waits on, returns current priority"""
+        with self._lock:
+            self._limiter = limiter
+            return self.value
+
+def priority_value(priority: Union[int, SharedPriority]) -> int:
+    """Get current priority class of a plain or shared priority"""
+    return priority.value if isinstance(priority, SharedPriority) else priority
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: int = API_RATE_LIMIT_BURST,
+        reserve: float = API_RATE_LIMIT_RESERVE,
+        min_fraction: float = API_RATE_LIMIT_MIN_FRACTION,
+        increase: float = API_RATE_LIMIT_INCREASE
+    ):
+        """
+        Initialize Rate Limiter
+        rate is requests per second, burst the bucket size
+        reserve is the fraction of the bucket only interactive requests may use
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.reserve = reserve
+        self.min_rate = rate * min_fraction
+        self.increase = increase
+        
+        self._cond = threading.Condition()
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        
+        # Waiting requests as [priority, sequence, queued at] heap
+        self._waiters: List[List] = []
+        self._sequence = itertools.count()
+        
+        # Initialize counters per priority
+        self.stats = {
+            name: {"acquired": 0, "timeouts": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self.stats_throttled = 0
+    
+    def try_acquire(self, priority: Union[int, SharedPriority] = PRIORITY_NORMAL) -> bool:
+        """Take a token only if one is available right now"""
+        priority = priority_value(priority)
+        with self._cond:
+            self._refill()
+            if self._waiters and self._waiters[0][0] <= priority:
+                return False
+            if not self._has_token(priority):
+                return False
+            
+            self._take(priority, 0.0)
+            return True
+    
+    def acquire(
+        self,
+        priority: Union[int, SharedPriority] = PRIORITY_NORMAL,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Wait for a token, higher priorities are served first
+        A shared priority raised while waiting moves the request up the queue
+        Returns False if timeout seconds passed without one
+        """
+        entry = self.enqueue(priority)
+        deadline = entry[2] + timeout if timeout is not None else None
+        
+        with self._cond:
+            try:
+                while not self.try_acquire_queued(entry, priority):
+                    wait_time = self._time_until_token(entry[0])
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.leave_queue(entry, priority)
+                            return False
+                        wait_time = min(wait_time, remaining)
+                    
+                    self._cond.wait(wait_time)
+                return True
+            except BaseException:
+                self.leave_queue(entry, priority, timed_out=False)
+                raise
+    
+    def enqueue(self, priority: Union[int, SharedPriority] = PRIORITY_NORMAL) -> List:
+        """
+        Join the wait queue, for callers that must not block while waiting
+        Poll with try_acquire_queued, give up with leave_queue
+        """
+        with self._cond:
+            if isinstance(priority, SharedPriority):
+                current = priority._wait_on(self)
+            else:
+                current = priority
+            
+            # [priority, sequence, queued at], the priority may be raised in place
+            entry = [current, next(self._sequence), time.monotonic()]
+            heapq.heappush(self._waiters, entry)
+            return entry
+    
+    def try_acquire_queued(
+        self,
+        entry: List,
+        priority: Union[int, SharedPriority] = PRIORITY_NORMAL
+    ) -> bool:
+        """Take a token if entry is first in line and one is available"""
+        with self._cond:
+            current = priority_value(priority)
+            if current < entry[0]:
+                entry[0] = current
+                heapq.heapify(self._waiters)
+            
+            self._refill()
+            if self._waiters[0] is not entry or not self._has_token(entry[0]):
+                return False
+            
+            heapq.heappop(self._waiters)
+            self._take(entry[0], time.monotonic() - entry[2])
+            self._done_waiting(priority)
+            return True
+    
+    def leave_queue(
+        self,
+        entry: List,
+        priority: Union[int, SharedPriority] = PRIORITY_NORMAL,
+        timed_out: bool = True
+    ) -> None:
+        """Leave the wait queue without a token"""
+        with self._cond:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                if timed_out:
+                    self.stats[PRIORITY_NAMES[entry[0]]]["timeouts"] += 1
+            self._done_waiting(priority)
+    
+    def _done_waiting(self, priority: Union[int, SharedPriority]) -> None:
+        """Let the next waiter check for a token (lock held)"""
+        if isinstance(priority, SharedPriority):
+            priority._wait_on(None)
+        self._cond.notify_all()
+    
+    def _wake(self) -> None:
+        """Wake waiting requests to re-check their priority"""
+        with self._cond:
+            self._cond.notify_all()
+    
+    def get_wait_time(self, priority: Union[int, SharedPriority] = PRIORITY_NORMAL) -> float:
+        """Get seconds until a token may be available at priority"""
+        priority = priority_value(priority)
+        with self._cond:
+            self._refill()
+            return self._time_until_token(priority)
+    
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Back off after ReadyMode returned 429 (multiplicative decrease)"""
+        with self._cond:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self.stats_throttled += 1
+        
+        logging.warning(f"ReadyMode throttled requests, limiting to {self.rate * 3600:.0f}/hour")
+    
+    def on_success(self) -> None:
+        """Recover rate after successful requests (additive increase)"""
+        if self.rate >= self.max_rate:
+            return
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.increase)
+    
+    def _has_token(self, priority: int) -> bool:
+        """Check whether a token may be taken at priority (lock held)"""
+        if time.monotonic() < self._paused_until:
+            return False
+        return self._tokens >= 1 + self._get_reserve(priority)
+    
+    def _get_reserve(self, priority: int) -> float:
+        """Get tokens held back from priority (lock held)"""
+        if priority == PRIORITY_INTERACTIVE:
+            return 0.0
+        reserve = self.burst * self.reserve
+        return reserve if priority == PRIORITY_BULK else reserve / 2
+    
+    def _take(self, priority: int, waited: float) -> None:
+        """Take a token and count it (lock held)"""
+        self._tokens -= 1
+        stats = self.stats[PRIORITY_NAMES[priority]]
+        stats["acquired"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+    
+    def _refill(self) -> None:
+        """Add tokens for elapsed time (lock held)"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+    
+    def _time_until_token(self, priority: int) -> float:
+        """Get seconds until a token is available at priority (lock held)"""
+        needed = 1 + self._get_reserve(priority) - self._tokens
+        wait_time = max(needed / self.rate if self.rate > 0 else 1.0, 0.001)
+        return max(wait_time, self._paused_until - time.monotonic())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate, queue depth and wait times per priority"""
+        with self._cond:
+            self._refill()
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._waiters:
+                depth[PRIORITY_NAMES[priority]] += 1
+            
+            priorities = {}
+            for name, stats in self.stats.items():
+                priorities[name] = {
+                    "acquired": stats["acquired"],
+                    "timeouts": stats["timeouts"],
+                    "queued": depth[name],
+                    "wait_avg": stats["wait_total"] / stats["acquired"] if stats["acquired"] else 0.0,
+                    "wait_max": stats["wait_max"]
+                }
+            
+            return {
+                "rate_per_hour": self.rate * 3600,
+                "max_rate_per_hour": self.max_rate * 3600,
+                "tokens": self._tokens,
+                "queue_depth": len(self._waiters),
+                "throttled": self.stats_throttled,
+                "priorities": priorities
+            }
@@ -0,0 +1,493 @@
+"""
+ReadyMode Stub Server for Storm911
+Local stand-in for the ReadyMode TPI API, used for benchmarks and offline testing
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+# Supported latency distributions
+LATENCY_FIXED = "fixed"
+LATENCY_UNIFORM = "uniform"
+LATENCY_NORMAL = "normal"
+LATENCY_LOGNORMAL = "lognormal"
+LATENCY_DISTRIBUTIONS = (LATENCY_FIXED, LATENCY_UNIFORM, LATENCY_NORMAL, LATENCY_LOGNORMAL)
+
+# Route patterns
+ROUTES = [
+    ("search_lead", "GET", re.compile(r"^/TPI/search/Lead/(?P<phone>[^/]+)/?$")),
+    ("get_lead", "GET", re.compile(r"^/TPI/get/Lead/(?P<id>[^/]+)/?$")),
+    ("update_lead", "PUT", re.compile(r"^/TPI/update/Lead/(?P<id>[^/]+)/?$")),
+    ("lead_update", "GET", re.compile(r"^/TPI/leadUpdate/(?P<campaign_id>[^/]+)/(?P<phone>[^/]+)/?$")),
+    ("lead_update", "POST", re.compile(r"^/TPI/leadUpdate/(?P<campaign_id>[^/]+)/(?P<phone>[^/]+)/?$")),
+    ("post_leads", "POST", re.compile(r"^/TPI/post/?$"))
+]
+
+# TPI field -> leadUpdate field label
+LABELS = {
+    'firstName': 'First Name',
+    'lastName': 'Last Name',
+    'address': 'Address',
+    'city': 'City',
+    'state': 'State',
+    'zip': 'Zip Code',
+    'email': 'Email',
+    'Custom_1': 'Roof Type',
+    'Custom_2': 'Roof Age',
+    'Custom_3': 'How Many Stories',
+    'Custom_4': 'Has Contractor',
+    'Custom_5': 'Has Insurance',
+    'Custom_6': 'Insurance Co. Name',
+    'Custom_7': 'Call Notes'
+}
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Linda", "Michael", "Susan", "David", "Karen"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis"]
+CITIES = [("Dallas", "TX"), ("Tulsa", "OK"), ("Denver", "CO"), ("Omaha", "NE"), ("Wichita", "KS")]
+ROOF_TYPES = ["Asphalt", "Metal", "Tile", "Wood", "Other"]
+
+def generate_leads(count: int, seed: int = 911) -> List[Dict]:
+    """Generate deterministic sample leads, same seed gives the same leads"""
+    rng = random.Random(seed)
+    leads = []
+    
+    for index in range(count):
+        city, state = rng.choice(CITIES)
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        leads.append({
+            'id': str(100000 + index),
+            'firstName': first_name,
+            'lastName': last_name,
+            'phone': f"555{index:07d}",
+            'phone3': f"556{index:07d}" if index % 3 == 0 else '',
+            'address': f"{rng.randint(100, 9999)} Main St",
+            'city': city,
+            'state': state,
+            'zip': f"{rng.randint(10000, 99999)}",
+            'email': f"{first_name.lower()}.{last_name.lower()}{index}@example.com",
+            'Custom_1': rng.choice(ROOF_TYPES),
+            'Custom_2': rng.choice(["0-5", "6-10", "11-15", "16-20", "20+"]),
+            'Custom_3': rng.choice(["1", "1.5", "2", "2.5", "3+"]),
+            'Custom_4': rng.choice(["Yes", "No"]),
+            'Custom_5': rng.choice(["Yes", "No"]),
+            'Custom_6': '',
+            'Custom_7': ''
+        })
+    
+    return leads
+
+class ReadyModeStub:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        lead_count: int = 1000,
+        latency: str = LATENCY_LOGNORMAL,
+        latency_ms: float = 50,
+        latency_spread_ms: float = 25,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        api_user: Optional[str] = None,
+        api_pass: Optional[str] = None,
+        seed: int = 911
+    ):
+        """
+        Initialize ReadyMode Stub
+        latency_ms is the mean (median for lognormal), latency_spread_ms the spread
+        error_rate is the fraction of requests answered with a 5xx
+        rate_limit is requests per second before 429 is returned, 0 disables it
+        """
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unsupported latency distribution: {latency}")
+        
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread_ms = latency_spread_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.api_user = api_user
+        self.api_pass = api_pass
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        
+        # Lead store, indexed by ID and by every phone number
+        self._leads: Dict[str, Dict] = {}
+        self._phone_index: Dict[str, List[str]] = {}
+        self._next_id = 100000 + lead_count
+        for lead in generate_leads(lead_count, seed):
+            self._add_lead(lead)
+        
+        # Rate limit token bucket
+        self._tokens = rate_limit
+        self._refilled_at = time.monotonic()
+        
+        self.stats: Dict[str, Dict[int, int]] = {}
+        
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        """Get base URL the stub is listening on"""
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self) -> str:
+        """Start serving on a background thread, returns base URL"""
+        stub = self
+        
+        class Handler(_StubRequestHandler):
+            server_stub = stub
+        
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="readymode-stub",
+            daemon=True
+        )
+        self._thread.start()
+        
+        logging.info(f"ReadyMode stub listening on {self.base_url}")
+        return self.base_url
+    
+    def stop(self) -> None:
+        """Stop serving"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=5)
+    
+    def get_phones(self) -> List[str]:
+        """Get primary phone number of every stored lead"""
+        with self._lock:
+            return [lead['phone'] for lead in self._leads.values()]
+    
+    def get_lead_ids(self) -> List[str]:
+        """Get every stored lead ID"""
+        with self._lock:
+            return list(self._leads)
+    
+    def get_stats(self) -> Dict[str, Dict[int, int]]:
+        """Get response counts per route and status code"""
+        with self._lock:
+            return {route: dict(codes) for route, codes in self.stats.items()}
+    
+    def _add_lead(self, lead: Dict) -> None:
+        """Store lead and index its phone numbers (lock held)"""
+        self._leads[lead['id']] = lead
+        for key in ['phone'] + [f'phone{index}' for index in range(1, 10)]:
+            phone = _digits(lead.get(key, ''))
+            if phone:
+                self._phone_index.setdefault(phone, [])
+                if lead['id'] not in self._phone_index[phone]:
+                    self._phone_index[phone].append(lead['id'])
+    
+    def _find_by_phone(self, phone: str) -> List[Dict]:
+        """Get leads with phone as any of their numbers (lock held)"""
+        return [self._leads[lead_id] for lead_id in self._phone_index.get(_digits(phone), [])]
+    
+    def _sample_latency(self) -> float:
+        """Sample response delay in seconds"""
+        with self._lock:
+            if self.latency == LATENCY_FIXED:
+                delay = self.latency_ms
+            elif self.latency == LATENCY_UNIFORM:
+                delay = self._rng.uniform(
+                    self.latency_ms - self.latency_spread_ms,
+                    self.latency_ms + self.latency_spread_ms
+                )
+            elif self.latency == LATENCY_NORMAL:
+                delay = self._rng.gauss(self.latency_ms, self.latency_spread_ms)
+            else:
+                # Median latency_ms with a long right tail
+                sigma = self.latency_spread_ms / max(self.latency_ms, 1.0)
+                delay = self.latency_ms * self._rng.lognormvariate(0, sigma)
+        
+        return max(0.0, delay) / 1000
+    
+    def _take_token(self) -> bool:
+        """Check request against rate limit"""
+        if self.rate_limit <= 0:
+            return True
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate_limit,
+                self._tokens + (now - self._refilled_at) * self.rate_limit
+            )
+            self._refilled_at = now
+            
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+    
+    def _should_fail(self) -> bool:
+        """Decide whether to inject a server error"""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+    
+    def _record(self, route: str, status: int) -> None:
+        """Count response"""
+        with self._lock:
+            codes = self.stats.setdefault(route, {})
+            codes[status] = codes.get(status, 0) + 1
+    
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        body: Any
+    ) -> Tuple[str, int, Any, Dict[str, str]]:
+        """
+        Handle a request
+        Returns (route, status, payload, headers) tuple
+        """
+        for route, route_method, pattern in ROUTES:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            return "unknown", 404, {"Error": "Not found"}, {}
+        
+        if self.api_user is not None and (
+            query.get('API_user') != self.api_user or query.get('API_pass') != self.api_pass
+        ):
+            return route, 401, {"Error": "Invalid credentials"}, {}
+        
+        if not self._take_token():
+            return route, 429, {"Error": "Rate limit exceeded"}, {"Retry-After": "1"}
+        
+        time.sleep(self._sample_latency())
+        
+        if self._should_fail():
+            return route, 503, {"Error": "Service unavailable"}, {}
+        
+        params = match.groupdict()
+        with self._lock:
+            if route == "search_lead":
+                leads = self._find_by_phone(params['phone'])
+                if not leads:
+                    return route, 404, {"Error": "Lead not found"}, {}
+                return route, 200, [dict(lead) for lead in leads], {}
+            
+            if route == "get_lead":
+                lead = self._leads.get(params['id'])
+                if lead is None:
+                    return route, 404, {"Error": "Lead not found"}, {}
+                return route, 200, dict(lead), {}
+            
+            if route == "update_lead":
+                lead = self._leads.get(params['id'])
+                if lead is None:
+                    return route, 404, {"Error": "Lead not found"}, {}
+                lead.update(body if isinstance(body, dict) else {})
+                return route, 200, {"Success": True, "id": lead['id']}, {}
+            
+            if route == "lead_update":
+                leads = self._find_by_phone(params['phone'])
+                if method == "GET":
+                    return route, 200, [self._to_labels(lead) for lead in leads], {}
+                return route, 200, self._apply_labels(leads, body), {}
+            
+            return route, 200, self._post_leads(body), {}
+    
+    def _to_labels(self, lead: Dict) -> Dict:
+        """Format lead as leadUpdate result keyed by field label"""
+        result = {label: lead.get(field, '') for field, label in LABELS.items()}
+        result['id'] = lead['id']
+        result['phone'] = lead['phone']
+        return result
+    
+    def _apply_labels(self, leads: List[Dict], fields: Any) -> Dict:
+        """Apply leadUpdate fields to matching leads (lock held)"""
+        fields = fields if isinstance(fields, dict) else {}
+        fields_by_label = {label: field for field, label in LABELS.items()}
+        
+        for lead in leads:
+            for label, value in fields.items():
+                # Unknown labels are ignored, as ReadyMode does
+                if label in fields_by_label:
+                    lead[fields_by_label[label]] = value
+        
+        return {"Success": True, "Updated": len(leads)}
+    
+    def _post_leads(self, body: Any) -> Dict:
+        """Create leads from TPI post, returns indexed per-row results (lock held)"""
+        if isinstance(body, dict) and 'rows' in body:
+            rows = body['rows']
+        elif isinstance(body, dict):
+            rows = [body]
+        else:
+            rows = []
+        
+        results = {}
+        for index, row in enumerate(rows):
+            if not _digits(row.get('phone', '')):
+                results[str(index)] = {
+                    "Success": False,
+                    "Error": "A valid phone number is required",
+                    "Field": "phone"
+                }
+                continue
+            
+            lead = {field: '' for field in LABELS}
+            lead.update(row)
+            lead['id'] = str(self._next_id)
+            self._next_id += 1
+            self._add_lead(lead)
+            
+            results[str(index)] = {
+                "Success": True,
+                "Accepted": True,
+                "xencall_leadId": lead['id']
+            }
+        
+        return results
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """HTTP adapter for ReadyModeStub"""
+    server_stub: ReadyModeStub = None
+    protocol_version = "HTTP/1.1"
+    
+    # Headers and body are written separately, avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+    
+    def do_GET(self) -> None:
+        """Handle GET request"""
+        self._dispatch("GET")
+    
+    def do_POST(self) -> None:
+        """Handle POST request"""
+        self._dispatch("POST")
+    
+    def do_PUT(self) -> None:
+        """Handle PUT request"""
+        self._dispatch("PUT")
+    
+    def _dispatch(self, method: str) -> None:
+        """Parse request, hand it to the stub and write the JSON response"""
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        
+        try:
+            body = self._read_body()
+            route, status, payload, headers = self.server_stub.handle(
+                method,
+                parsed.path,
+                query,
+                body
+            )
+        except Exception as e:
+            logging.error(f"ReadyMode stub error: {str(e)}")
+            route, status, payload, headers = "error", 500, {"Error": str(e)}, {}
+        
+        self.server_stub._record(route, status)
+        
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up waiting (timeout or hedged request)
+            self.close_connection = True
+    
+    def _read_body(self) -> Any:
+        """Read JSON or form-encoded body, indexed lead[N][field] forms become rows"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        
+        raw = self.rfile.read(length).decode("utf-8")
+        if "application/json" in (self.headers.get("Content-Type") or ""):
+            return json.loads(raw)
+        
+        form = {key: values[0] for key, values in parse_qs(raw).items()}
+        rows: Dict[int, Dict] = {}
+        for key, value in form.items():
+            match = re.match(r"^lead\[(\d+)\]\[([^\]]+)\]$", key)
+            if match:
+                rows.setdefault(int(match.group(1)), {})[match.group(2)] = value
+        
+        if rows:
+            return {"rows": [rows[index] for index in sorted(rows)]}
+        return form
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        """Route access log through logging"""
+        logging.debug(f"ReadyMode stub: {format % args}")
+
+def _digits(phone: str) -> str:
+    """Strip phone number to digits, dropping a leading US country code"""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Local ReadyMode TPI stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8911)
+    parser.add_argument("--leads", type=int, default=1000)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default=LATENCY_LOGNORMAL)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--latency-spread-ms", type=float, default=25)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    stub = ReadyModeStub(
+        host=args.host,
+        port=args.port,
+        lead_count=args.leads,
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread_ms=args.latency_spread_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit
+    )
+    stub.start()
+    
+    print(f"ReadyMode stub listening on {stub.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+    
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Search Dispatcher for Storm911
+Runs lead searches off the Tk main thread and hands results back to the UI
+"""
+
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Optional, Tuple
+import customtkinter as ctk
+
+class SearchDispatcher:
+    def __init__(
+        self,
+        root: ctk.CTk,
+        api_handler: Any,
+        max_workers: int = 2,
+        poll_interval: int = 50
+    ):
+        """Initialize Search Dispatcher"""
+        self.root = root
+        self.api_handler = api_handler
+        self.poll_interval = poll_interval
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="lead-search"
+        )
+        
+        # Results waiting to be delivered on the Tk thread, the last one of a search is final
+        self._results: "queue.Queue[Tuple[int, Callable, tuple, bool]]" = queue.Queue()
+        
+        # Only the latest request's result is delivered
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._future: Optional[Future] = None
+        self._polling = False
+    
+    def search(
+        self,
+        phone: str,
+        callback: Callable[[bool, Any], None],
+        on_stale: Optional[Callable[[Any], None]] = None,
+        **kwargs
+    ) -> int:
+        """
+        Dispatch search for phone number, superseding any outstanding one
+        callback(success, result) is invoked on the Tk thread. With on_stale, a fresh
+        local copy is the result and a stale one is passed to on_stale(result) first
+        while it is revalidated against ReadyMode
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            
+            # Drop queued work that has not started yet
+            if self._future and not self._future.done():
+                self._future.cancel()
+            
+            self._future = self._executor.submit(
+                self._run_search,
+                generation,
+                phone,
+                callback,
+                on_stale,
+                kwargs
+            )
+        
+        self._schedule_poll()
+        return generation
+    
+    def cancel(self) -> None:
+        """Cancel outstanding search, its result will be discarded"""
+        with self._lock:
+            self._generation += 1
+            if self._future and not self._future.done():
+                self._future.cancel()
+            self._future = None
+    
+    def is_busy(self) -> bool:
+        """Check whether a search is outstanding"""
+        with self._lock:
+            return self._future is not None and not self._future.done()
+    
+    def _run_search(
+        self,
+        generation: int,
+        phone: str,
+        callback: Callable,
+        on_stale: Optional[Callable],
+        kwargs: dict
+    ) -> None:
+        """Run search on worker thread"""
+        try:
+            if on_stale is None:
+                success, result = self.api_handler.search_lead(phone, **kwargs)
+            else:
+                success, result = self._run_local_first(generation, phone, on_stale, kwargs)
+        except Exception as e:
+            logging.error(f"Error in background search: {str(e)}")
+            success, result = False, "Failed to search phone number"
+        
+        self._results.put((generation, callback, (success, result), True))
+    
+    def _run_local_first(
+        self,
+        generation: int,
+        phone: str,
+        on_stale: Callable,
+        kwargs: dict
+    ) -> Tuple[bool, Any]:
+        """Answer from a fresh local copy, else show any stale one and revalidate it"""
+        local, fresh = self.api_handler.get_local_lead(phone)
+        if fresh:
+            return True, local
+        
+        if local is not None:
+            self._results.put((generation, on_stale, (local,), False))
+        
+        return self.api_handler.search_lead(phone, use_cache=False, **kwargs)
+    
+    def _schedule_poll(self) -> None:
+        """Start polling for results on the Tk thread"""
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll_results)
+    
+    def _poll_results(self) -> None:
+        """Deliver completed results to callbacks (Tk thread)"""
+        while True:
+            try:
+                generation, callback, args, final = self._results.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Discard stale results
+            if generation != self._generation:
+                logging.debug("Discarding stale search result")
+                continue
+            
+            if final:
+                with self._lock:
+                    self._future = None
+            
+            try:
+                callback(*args)
+            except Exception as e:
+                logging.error(f"Error handling search result: {str(e)}")
+        
+        if self.is_busy() or not self._results.empty():
+            self.root.after(self.poll_interval, self._poll_results)
+        else:
+            self._polling = False
+    
+    def shutdown(self) -> None:
+        """Stop worker threads"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
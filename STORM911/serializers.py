@@ -0,0 +1,117 @@
+"""
+Serializers for Storm911
+Fast encoding for state, settings and cache files with format detection on load
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, Optional, Union
+
+from config import SERIALIZER_FORMAT
+
+# orjson and msgpack are optional, stdlib json is used without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# File formats
+FORMAT_JSON = "json"
+FORMAT_MSGPACK = "msgpack"
+
+# File name extension per format
+FILE_EXTENSIONS = {
+    FORMAT_JSON: ".json",
+    FORMAT_MSGPACK: ".msgpack"
+}
+
+# First bytes of a msgpack map or array, JSON documents start with ASCII
+_MSGPACK_MARKERS = frozenset(range(0x80, 0xa0)) | {0xdc, 0xdd, 0xde, 0xdf}
+
+def get_backends() -> Dict[str, Optional[str]]:
+    """Get library used per format, None if the format is unavailable"""
+    return {
+        FORMAT_JSON: "orjson" if orjson else "json",
+        FORMAT_MSGPACK: "msgpack" if msgpack else None
+    }
+
+def resolve_format(file_format: Optional[str] = None) -> str:
+    """Get format to write, falling back to JSON if msgpack is not installed"""
+    file_format = file_format or SERIALIZER_FORMAT
+    if file_format == FORMAT_MSGPACK and msgpack is None:
+        logging.warning("msgpack not installed, writing JSON instead")
+        return FORMAT_JSON
+    return file_format
+
+def dumps(data: Any, file_format: Optional[str] = None, pretty: bool = False) -> bytes:
+    """
+    Encode data, in SERIALIZER_FORMAT by default
+    pretty indents JSON, meant for files people read such as exports
+    """
+    if resolve_format(file_format) == FORMAT_MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    
+    if pretty:
+        return json.dumps(data, indent=2).encode('utf-8')
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def detect_format(data: Union[bytes, str]) -> str:
+    """Get format of encoded data"""
+    if isinstance(data, bytes) and data and data[0] in _MSGPACK_MARKERS:
+        return FORMAT_MSGPACK
+    return FORMAT_JSON
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode data written by dumps in any format, or plain JSON"""
+    if detect_format(data) == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise ValueError("Data is msgpack encoded but msgpack is not installed")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def get_file_path(base_path: str, file_format: Optional[str] = None) -> str:
+    """Get path of file written in format, base_path is the path without extension"""
+    return base_path + FILE_EXTENSIONS[resolve_format(file_format)]
+
+def find_file(base_path: str) -> Optional[str]:
+    """
+    Get existing file for base_path in any format, None if there is none
+    After a format change both files may exist, the newer one is current
+    """
+    paths = [
+        base_path + extension
+        for extension in FILE_EXTENSIONS.values()
+        if os.path.exists(base_path + extension)
+    ]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+def load_file(filepath: str) -> Any:
+    """Read and decode file"""
+    with open(filepath, 'rb') as f:
+        return loads(f.read())
+
+def save_file(
+    filepath: str,
+    data: Any,
+    file_format: Optional[str] = None,
+    pretty: bool = False
+) -> None:
+    """Encode and write file"""
+    encoded = dumps(data, file_format, pretty)
+    with open(filepath, 'wb') as f:
+        f.write(encoded)
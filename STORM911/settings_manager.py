@@ -4,16 +4,19 @@ Handles application settings, preferences, and configuration
 """
 
 import os
-import json
 import logging
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from serializers import load_file, save_file, get_file_path, find_file, FORMAT_JSON
+
 class SettingsManager:
     def __init__(self, app_dir: str = None):
         """Initialize Settings Manager"""
         self.app_dir = app_dir or os.path.dirname(os.path.abspath(__file__))
-        self.settings_file = os.path.join(self.app_dir, 'data', 'settings.json')
+        # Named for the format it is written in, settings.json or settings.msgpack
+        self.settings_base = os.path.join(self.app_dir, 'data', 'settings')
+        self.settings_file = get_file_path(self.settings_base)
         
         # Ensure settings directory exists
         os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
@@ -44,7 +47,18 @@ class SettingsManager:
             "api": {
                 "timeout": 30,
                 "retry_attempts": 3,
-                "cache_duration": 300
+                "cache_duration": 300,
+                "campaign_id": "",
+                "hedge_requests": True,
+                "fallback_lookups": 2,
+                "rate_limit": 2000,
+                "post_rate_limit": 10000,
+                "pool_size": 32,
+                "keepalive_interval": 45,
+                "replica_enabled": False,
+                "replica_sync_interval": 300,
+                "replica_quota_share": 0.05,
+                "replica_start_id": 0
             },
             "export": {
                 "pdf_directory": "EXPORTS",
@@ -85,11 +99,12 @@ class SettingsManager:
     def load_settings(self) -> Dict:
         """Load settings from file or create with defaults"""
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    # Update with any new default settings
-                    return self._update_settings_with_defaults(settings)
+            # Written before a format change, or in the current format
+            existing = find_file(self.settings_base)
+            if existing:
+                settings = load_file(existing)
+                # Update with any new default settings
+                return self._update_settings_with_defaults(settings)
             return self.default_settings.copy()
             
         except Exception as e:
@@ -99,8 +114,7 @@ class SettingsManager:
     def save_settings(self) -> bool:
         """Save current settings to file"""
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            save_file(self.settings_file, self.settings)
             return True
             
         except Exception as e:
@@ -166,8 +180,8 @@ class SettingsManager:
     def export_settings(self, filepath: str) -> bool:
         """Export settings to file"""
         try:
-            with open(filepath, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            # Exports are meant to be read, keep them indented JSON
+            save_file(filepath, self.settings, FORMAT_JSON, pretty=True)
             return True
             
         except Exception as e:
@@ -177,11 +191,10 @@ class SettingsManager:
     def import_settings(self, filepath: str) -> bool:
         """Import settings from file"""
         try:
-            with open(filepath, 'r') as f:
-                imported = json.load(f)
-                # Validate and update with defaults
-                self.settings = self._update_settings_with_defaults(imported)
-                return self.save_settings()
+            imported = load_file(filepath)
+            # Validate and update with defaults
+            self.settings = self._update_settings_with_defaults(imported)
+            return self.save_settings()
                 
         except Exception as e:
             logging.error(f"Error importing settings: {str(e)}")
@@ -0,0 +1,147 @@
+"""
+Single Flight for Storm911
+Coalesces concurrent identical requests into one outstanding call
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from rate_limiter import SharedPriority
+
+class _Call:
+    """In-flight call shared by the leader and its followers"""
+    __slots__ = ("event", "result", "error", "waiters", "priority")
+    
+    def __init__(self, priority: Optional[SharedPriority] = None):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.priority = priority
+
+class SingleFlight:
+    def __init__(self):
+        """Initialize Single Flight"""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        
+        # Async calls with their priority, only touched from the event-loop thread
+        self._async_calls: Dict[Hashable, Tuple[asyncio.Future, Optional[SharedPriority]]] = {}
+        
+        # Initialize counters
+        self.stats = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0
+        }
+    
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        priority: Optional[SharedPriority] = None
+    ) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+        Every caller receives the leader's result (or exception)
+        priority is the one fn requests with, a more urgent follower raises it
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            
+            if call is not None:
+                call.waiters += 1
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call(priority)
+                self._calls[key] = call
+                self.stats["executions"] += 1
+                leader = True
+        
+        if not leader:
+            self._raise_priority(call.priority, priority)
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        
+        if call.error is not None:
+            raise call.error
+        return call.result
+    
+    async def do_async(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        priority: Optional[SharedPriority] = None
+    ) -> Any:
+        """Coroutine variant of do(), must be awaited on a single event loop"""
+        with self._lock:
+            self.stats["calls"] += 1
+            flight = self._async_calls.get(key)
+            
+            if flight is not None:
+                self.stats["coalesced"] += 1
+            else:
+                self.stats["executions"] += 1
+        
+        if flight is not None:
+            future, flight_priority = flight
+            self._raise_priority(flight_priority, priority)
+            # Shield so a cancelled follower does not cancel the leader
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = (future, priority)
+        
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unobserved error is not logged
+            future.exception()
+            raise
+        finally:
+            del self._async_calls[key]
+    
+    def _raise_priority(
+        self,
+        flight_priority: Optional[SharedPriority],
+        priority: Optional[SharedPriority]
+    ) -> None:
+        """Raise the running call's priority to a follower's"""
+        if flight_priority is not None and priority is not None:
+            flight_priority.raise_to(priority.value)
+    
+    def in_flight(self) -> int:
+        """Get number of outstanding calls"""
+        with self._lock:
+            return len(self._calls) + len(self._async_calls)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        with self._lock:
+            stats = self.stats.copy()
+        
+        stats["in_flight"] = self.in_flight()
+        stats["saved_ratio"] = (
+            stats["coalesced"] / stats["calls"] if stats["calls"] else 0.0
+        )
+        return stats
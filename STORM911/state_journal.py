@@ -0,0 +1,202 @@
+"""
+State Journal for Storm911
+Append-only log of state changes, compacted into an atomically written snapshot
+"""
+
+import os
+import zlib
+import struct
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from config import STATE_JOURNAL_FSYNC
+from serializers import dumps, loads
+
+# Record header: payload length, payload CRC-32
+RECORD_HEADER = struct.Struct(">II")
+
+# Operations
+OP_SET = "set"
+OP_PUSH = "push"
+OP_INCR = "incr"
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write file through a temporary file so readers never see it half written"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def apply_op(state: Any, op: Dict) -> Any:
+    """
+    Apply journaled operation to state, returns the state
+    set stores value at path (an empty path replaces the state),
+    push inserts value at the front of the list at path, keeping limit items,
+    incr adds value to the number at path
+    """
+    path = op.get("path") or []
+    if not path:
+        return op.get("value") if op.get("op") == OP_SET else state
+    
+    parent = state
+    for key in path[:-1]:
+        if not isinstance(parent.get(key), dict):
+            parent[key] = {}
+        parent = parent[key]
+    
+    key = path[-1]
+    if op.get("op") == OP_SET:
+        parent[key] = op.get("value")
+    elif op.get("op") == OP_PUSH:
+        items = parent.get(key)
+        if not isinstance(items, list):
+            items = []
+        items.insert(0, op.get("value"))
+        limit = op.get("limit")
+        parent[key] = items[:limit] if limit else items
+    elif op.get("op") == OP_INCR:
+        current = parent.get(key)
+        parent[key] = (current if isinstance(current, (int, float)) else 0) + op.get("value", 1)
+    else:
+        logging.warning(f"Unknown state journal operation: {op.get('op')}")
+    return state
+
+class StateJournal:
+    def __init__(self, journal_file: str, fsync: bool = STATE_JOURNAL_FSYNC):
+        """
+        Initialize State Journal
+        With fsync, sync makes appended records survive power loss, otherwise
+        they are flushed to the OS and survive process crashes only
+        """
+        self.journal_file = journal_file
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        
+        # Held while syncing, appends go on meanwhile and share the next sync
+        self._sync_lock = threading.Lock()
+        self.synced_seq = 0
+        
+        # Last sequence number written, records and bytes since compaction
+        self.seq = 0
+        self.records = 0
+        self.size = 0
+    
+    def replay(self, after_seq: int = 0) -> List[Dict]:
+        """
+        Read journal and open it for appending
+        Returns operations of records newer than after_seq, in order.
+        A torn or corrupt tail, e.g. from a crash mid-append, is cut off
+        """
+        ops = []
+        with self._lock:
+            data = b""
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, 'rb') as f:
+                    data = f.read()
+            
+            offset = 0
+            self.seq = after_seq
+            self.records = 0
+            while offset + RECORD_HEADER.size <= len(data):
+                length, crc = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                
+                try:
+                    record = loads(payload)
+                except Exception:
+                    break
+                
+                offset = start + length
+                self.records += 1
+                if record.get("seq", 0) > after_seq:
+                    ops.extend(record.get("ops", []))
+                    self.seq = record["seq"]
+            
+            if offset < len(data):
+                logging.warning(
+                    f"Discarding {len(data) - offset} bytes of incomplete state journal"
+                )
+            
+            self._open(data[:offset] if offset < len(data) else None)
+            self.size = offset
+            self.synced_seq = self.seq
+        
+        return ops
+    
+    def _open(self, rewrite: Optional[bytes] = None) -> None:
+        """Open journal for appending, replacing its content with rewrite (lock held)"""
+        with self._sync_lock:
+            if self._file:
+                self._file.close()
+            if rewrite is not None:
+                write_atomic(self.journal_file, rewrite)
+            self._file = open(self.journal_file, 'ab')
+    
+    def append(self, ops: List[Dict]) -> int:
+        """Append operations as one record, returns its sequence number to sync"""
+        with self._lock:
+            if self._file is None:
+                self._open()
+            
+            payload = dumps({"seq": self.seq + 1, "ops": ops})
+            record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+            
+            self._file.write(record)
+            self._file.flush()
+            self.seq += 1
+            self.records += 1
+            self.size += len(record)
+            return self.seq
+    
+    def sync(self, seq: int) -> None:
+        """
+        Make records up to seq durable
+        A single fsync covers every record appended before it started, so
+        callers waiting on the sync lock usually find their record synced
+        """
+        if not self.fsync:
+            return
+        
+        with self._sync_lock:
+            if self.synced_seq >= seq or self._file is None:
+                return
+            
+            # Records up to seq are flushed once append returned
+            target = self.seq
+            os.fsync(self._file.fileno())
+            self.synced_seq = target
+    
+    def get_position(self) -> Dict[str, int]:
+        """Get last sequence number, record count and size to compact up to"""
+        with self._lock:
+            return {"seq": self.seq, "records": self.records, "size": self.size}
+    
+    def discard(self, position: Dict[str, int]) -> None:
+        """Drop records covered by a snapshot taken at position"""
+        with self._lock:
+            if self._file:
+                self._file.flush()
+            
+            tail = b""
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, 'rb') as f:
+                    f.seek(position["size"])
+                    tail = f.read()
+            
+            self._open(tail)
+            self.records -= position["records"]
+            self.size = len(tail)
+    
+    def close(self) -> None:
+        """Close journal file"""
+        with self._lock, self._sync_lock:
+            if self._file:
+                self._file.close()
+                self._file = None
@@ -4,24 +4,76 @@ Handles application state management and persistence
 """
 
 import os
-import json
+import time
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from config import DATA_DIR, AUTO_SAVE_INTERVAL, MAX_RECENT_CALLS, STATE_JOURNAL_MAX_RECORDS
+from state_journal import StateJournal, apply_op, write_atomic, OP_SET, OP_PUSH, OP_INCR
+from call_history import CallHistory
+from call_record import CallRecord, CallRecordBuffer
+from serializers import dumps, load_file, get_file_path, find_file
+
+# Snapshot key holding the last journal record it includes
+JOURNAL_SEQ_KEY = "_journal_seq"
+
 class StateManager:
-    def __init__(self):
-        """Initialize State Manager"""
-        self.data_dir = "data"
-        self.state_file = os.path.join(self.data_dir, "app_state.json")
+    def __init__(
+        self,
+        auto_save: bool = True,
+        save_interval: float = AUTO_SAVE_INTERVAL,
+        max_journal_records: int = STATE_JOURNAL_MAX_RECORDS,
+        history: Optional[CallHistory] = None
+    ):
+        """
+        Initialize State Manager
+        Every change is appended to a journal right away. A background thread
+        compacts the journal into the state file save_interval seconds after the
+        first change, or once it holds max_journal_records records. Without
+        auto_save compaction happens on flush only.
+        Calls are kept in history, a CallHistory under DATA_DIR by default,
+        written by the background thread while it runs
+        """
+        self.data_dir = DATA_DIR
+        # Named for the format it is written in, app_state.json or app_state.msgpack
+        self.state_base = os.path.join(self.data_dir, "app_state")
+        self.state_file = get_file_path(self.state_base)
         
         # Ensure data directory exists
         os.makedirs(self.data_dir, exist_ok=True)
         
+        self.auto_save = auto_save
+        self.save_interval = save_interval
+        self.max_journal_records = max_journal_records
+        self.journal = StateJournal(os.path.join(self.data_dir, "app_state.journal"))
+        self.history = history or self._create_history()
+        
+        # Newest calls in compact form, answers get_recent_calls without a query
+        self.recent_calls = CallRecordBuffer()
+        
+        # Guards state against the writer thread, writes are serialized apart
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        
+        # Calls waiting for the writer thread to store them in history
+        self._pending_calls: List[Tuple[Dict, CallRecord]] = []
+        self._pending_lock = threading.Lock()
+        self._history_lock = threading.Lock()
+        
+        # Changes not yet in the state file, monotonic time of the first one
+        self._dirty = False
+        self._first_change = 0.0
+        
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self.saves = 0
+        
         # Initialize state
         self.state = {
             "current_call": None,
-            "recent_calls": [],
             "last_search": None,
             "last_export": None,
             "ui_state": {
@@ -44,32 +96,199 @@ class StateManager:
         self.load_state()
     
     def load_state(self) -> None:
-        """Load application state from file"""
+        """Load application state from file, then replay journaled changes"""
+        snapshot_seq = 0
         try:
-            if os.path.exists(self.state_file):
-                with open(self.state_file, 'r') as f:
-                    saved_state = json.load(f)
-                    self.state.update(saved_state)
+            existing = find_file(self.state_base)
+            if existing:
+                saved_state = load_file(existing)
+                snapshot_seq = saved_state.pop(JOURNAL_SEQ_KEY, 0)
+                self.state.update(saved_state)
                 logging.info("Application state loaded successfully")
         except Exception as e:
             logging.error(f"Error loading application state: {str(e)}")
+        
+        try:
+            ops = self.journal.replay(snapshot_seq)
+            with self._lock:
+                for op in ops:
+                    self.state = apply_op(self.state, op)
+            
+            if ops:
+                logging.info(f"Replayed {len(ops)} state changes from journal")
+                self._mark_dirty()
+        except Exception as e:
+            logging.error(f"Error replaying state journal: {str(e)}")
+        
+        self._migrate_recent_calls()
+        self._load_recent_calls()
     
-    def save_state(self) -> bool:
-        """Save current application state"""
+    def _create_history(self) -> Optional[CallHistory]:
+        """Open call history, recent calls stay in the state file without it"""
+        try:
+            return CallHistory()
+        except Exception as e:
+            logging.error(f"Error opening call history: {str(e)}")
+            return None
+    
+    def _migrate_recent_calls(self) -> None:
+        """Move recent calls kept in the state file into the call history"""
+        if self.history is None or not self.state.get("recent_calls"):
+            return
+        
         try:
-            # Update session info
-            self.state["session"]["last_save"] = datetime.now().isoformat()
+            imported = self.history.import_calls(self.state["recent_calls"])
+            with self._lock:
+                self.state.pop("recent_calls", None)
             
-            # Save to file
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
+            # Drop the list from the file now so it is not imported twice
+            self.save_state()
+            logging.info(f"Moved {imported} recent calls to call history")
+        except Exception as e:
+            logging.error(f"Error moving recent calls to call history: {str(e)}")
+    
+    def _load_recent_calls(self) -> None:
+        """Fill recent call buffer from call history"""
+        try:
+            if self.history is not None:
+                calls = self.history.get_recent(self.recent_calls.capacity)
+            else:
+                calls = self.state.get("recent_calls", [])
+            self.recent_calls.load(
+                CallRecord.from_dict(call) for call in calls if isinstance(call, dict)
+            )
+        except Exception as e:
+            logging.error(f"Error loading recent calls: {str(e)}")
+    
+    def save_state(self) -> bool:
+        """Save current application state immediately"""
+        self._mark_dirty()
+        return self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Compact journal into the state file, returns False if writing failed
+        The file is replaced atomically, so a crash leaves the old one intact
+        """
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return True
+                
+                # Update session info
+                self.state["session"]["last_save"] = datetime.now().isoformat()
+                
+                # Serialize under the lock, write outside it
+                position = self.journal.get_position()
+                try:
+                    data = dumps(dict(self.state, **{JOURNAL_SEQ_KEY: position["seq"]}))
+                except Exception as e:
+                    logging.error(f"Error saving application state: {str(e)}")
+                    return False
+                self._dirty = False
             
-            logging.info("Application state saved successfully")
-            return True
+            try:
+                write_atomic(self.state_file, data)
+                
+                # Changes made while writing stay journaled
+                self.journal.discard(position)
+                
+                self.saves += 1
+                logging.info("Application state saved successfully")
+                return True
             
-        except Exception as e:
-            logging.error(f"Error saving application state: {str(e)}")
-            return False
+            except Exception as e:
+                logging.error(f"Error saving application state: {str(e)}")
+                # Keep changes pending for the next attempt
+                self._mark_dirty()
+                return False
+    
+    def _update(self, ops: List[Dict]) -> None:
+        """Apply changes to state and journal them as one record"""
+        with self._lock:
+            for op in ops:
+                self.state = apply_op(self.state, op)
+            
+            try:
+                seq = self.journal.append(ops)
+            except Exception as e:
+                # The next compaction still writes the change
+                logging.error(f"Error journaling state change: {str(e)}")
+                seq = None
+        
+        # Sync outside the state lock so concurrent changes share one fsync
+        if seq is not None:
+            try:
+                self.journal.sync(seq)
+            except Exception as e:
+                logging.error(f"Error syncing state journal: {str(e)}")
+        
+        self._mark_dirty()
+    
+    def _mark_dirty(self) -> None:
+        """Record unsaved change and schedule compaction"""
+        with self._lock:
+            if not self._dirty:
+                self._dirty = True
+                self._first_change = time.monotonic()
+            elif self.journal.records < self.max_journal_records:
+                return
+        self._wake_event.set()
+    
+    def is_dirty(self) -> bool:
+        """Check whether state has changes not yet compacted"""
+        with self._lock:
+            return self._dirty
+    
+    def start(self) -> None:
+        """Start background writer"""
+        if not self.auto_save or (self._writer and self._writer.is_alive()):
+            return
+        
+        self._stop_event.clear()
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            name="state-writer",
+            daemon=True
+        )
+        self._writer.start()
+    
+    def _write_loop(self) -> None:
+        """Compact journal when due"""
+        while not self._stop_event.is_set():
+            self._wake_event.wait(self._get_wait())
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            
+            self.write_history()
+            if self._get_wait() == 0:
+                self.flush()
+    
+    def _get_wait(self) -> Optional[float]:
+        """Get seconds until compaction is due, None while clean"""
+        with self._lock:
+            if not self._dirty:
+                return None
+            if self.journal.records >= self.max_journal_records:
+                return 0.0
+            due = self._first_change + self.save_interval
+        return max(0.0, due - time.monotonic())
+    
+    def close(self) -> bool:
+        """Stop background writer and write pending changes"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._writer:
+            self._writer.join(timeout=5)
+            self._writer = None
+        
+        self.write_history()
+        saved = self.flush()
+        self.journal.close()
+        if self.history is not None:
+            self.history.close()
+        return saved
     
     def get_current_call(self) -> Optional[Dict]:
         """Get current call data"""
@@ -78,22 +297,24 @@ class StateManager:
     def set_current_call(self, call_data: Dict) -> None:
         """Set current call data"""
         try:
-            self.state["current_call"] = call_data
-            self.state["session"]["call_count"] += 1
+            if call_data:
+                call_data["timestamp"] = datetime.now().isoformat()
+            
+            self._update([
+                {"op": OP_SET, "path": ["current_call"], "value": call_data},
+                {"op": OP_INCR, "path": ["session", "call_count"], "value": 1}
+            ])
             
             # Add to recent calls
             if call_data:
-                self.add_recent_call(call_data)
-            
-            self.save_state()
+                self._record_call(call_data)
             
         except Exception as e:
             logging.error(f"Error setting current call: {str(e)}")
     
     def clear_current_call(self) -> None:
         """Clear current call data"""
-        self.state["current_call"] = None
-        self.save_state()
+        self._update([{"op": OP_SET, "path": ["current_call"], "value": None}])
     
     def add_recent_call(self, call_data: Dict) -> None:
         """Add call to recent calls list"""
@@ -101,25 +322,69 @@ class StateManager:
             # Add timestamp
             call_data["timestamp"] = datetime.now().isoformat()
             
-            # Add to list
-            self.state["recent_calls"].insert(0, call_data)
-            
-            # Keep only last 50 calls
-            self.state["recent_calls"] = self.state["recent_calls"][:50]
-            
-            self.save_state()
+            self._record_call(call_data)
             
         except Exception as e:
             logging.error(f"Error adding recent call: {str(e)}")
     
-    def get_recent_calls(self) -> list:
-        """Get list of recent calls"""
-        return self.state.get("recent_calls", [])
+    def _record_call(self, call_data: Dict) -> None:
+        """Store timestamped call in call history, through the writer thread if it runs"""
+        record = CallRecord.from_dict(call_data)
+        
+        if self.history is not None:
+            with self._pending_lock:
+                self._pending_calls.append((call_data, record))
+            
+            if self._writer and self._writer.is_alive():
+                self._wake_event.set()
+            else:
+                self.write_history()
+        else:
+            # Keep only last MAX_RECENT_CALLS calls
+            self._update([{
+                "op": OP_PUSH,
+                "path": ["recent_calls"],
+                "value": call_data,
+                "limit": MAX_RECENT_CALLS
+            }])
+        
+        self.recent_calls.append(record)
+    
+    def write_history(self) -> None:
+        """Store pending calls in call history in one transaction"""
+        # Writes are serialized so calls reach history in order
+        with self._history_lock:
+            with self._pending_lock:
+                pending, self._pending_calls = self._pending_calls, []
+            if not pending:
+                return
+            
+            try:
+                call_ids = self.history.add_calls([call_data for call_data, _ in pending])
+            except Exception as e:
+                logging.error(f"Error writing call history: {str(e)}")
+                # Keep calls for the next attempt
+                with self._pending_lock:
+                    self._pending_calls = pending + self._pending_calls
+                return
+        
+        for (_, record), call_id in zip(pending, call_ids):
+            record.history_id = call_id
+    
+    def get_recent_calls(self, limit: int = MAX_RECENT_CALLS) -> list:
+        """Get most recent calls, newest first"""
+        # A buffer that never filled up holds the whole history
+        buffered = len(self.recent_calls)
+        if self.history is None or limit <= buffered or buffered < self.recent_calls.capacity:
+            return [record.to_dict() for record in self.recent_calls.latest(limit)]
+        
+        # The query must see calls still waiting for the writer
+        self.write_history()
+        return self.history.get_recent(limit)
     
     def set_last_search(self, search_data: Dict) -> None:
         """Set last search data"""
-        self.state["last_search"] = search_data
-        self.save_state()
+        self._update([{"op": OP_SET, "path": ["last_search"], "value": search_data}])
     
     def get_last_search(self) -> Optional[Dict]:
         """Get last search data"""
@@ -128,8 +393,7 @@ class StateManager:
     def set_ui_state(self, key: str, value: Any) -> None:
         """Set UI state value"""
         try:
-            self.state["ui_state"][key] = value
-            self.save_state()
+            self._update([{"op": OP_SET, "path": ["ui_state", key], "value": value}])
         except Exception as e:
             logging.error(f"Error setting UI state: {str(e)}")
     
@@ -141,8 +405,7 @@ class StateManager:
         """Increment session counter"""
         try:
             if counter_type in ["call_count", "export_count", "email_count"]:
-                self.state["session"][counter_type] += 1
-                self.save_state()
+                self._update([{"op": OP_INCR, "path": ["session", counter_type], "value": 1}])
         except Exception as e:
             logging.error(f"Error incrementing counter: {str(e)}")
     
@@ -153,22 +416,24 @@ class StateManager:
     def reset_session(self) -> None:
         """Reset session statistics"""
         try:
-            self.state["session"] = {
-                "start_time": datetime.now().isoformat(),
-                "call_count": 0,
-                "export_count": 0,
-                "email_count": 0
-            }
-            self.save_state()
+            self._update([{
+                "op": OP_SET,
+                "path": ["session"],
+                "value": {
+                    "start_time": datetime.now().isoformat(),
+                    "call_count": 0,
+                    "export_count": 0,
+                    "email_count": 0
+                }
+            }])
         except Exception as e:
             logging.error(f"Error resetting session: {str(e)}")
     
     def clear_state(self) -> None:
         """Clear all application state"""
         try:
-            self.state = {
+            state = {
                 "current_call": None,
-                "recent_calls": [],
                 "last_search": None,
                 "last_export": None,
                 "ui_state": {
@@ -186,6 +451,12 @@ class StateManager:
                     "email_count": 0
                 }
             }
-            self.save_state()
+            self._update([{"op": OP_SET, "path": [], "value": state}])
+            self.recent_calls.clear()
+            if self.history is not None:
+                with self._history_lock:
+                    with self._pending_lock:
+                        self._pending_calls = []
+                    self.history.clear()
         except Exception as e:
             logging.error(f"Error clearing state: {str(e)}")
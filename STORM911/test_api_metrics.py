@@ -0,0 +1,117 @@
+"""
+API Metrics Tests for Storm911
+LatencyHistogram percentiles and per-endpoint error accounting
+"""
+
+import random
+
+import pytest
+
+from api_metrics import APIMetrics, LatencyHistogram, SUB_BUCKET_COUNT, endpoint_name
+
+# Bucket width relative to the values in it
+PRECISION = 2 / SUB_BUCKET_COUNT
+
+def exact_percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, int(round(pct / 100 * len(ordered)))) - 1]
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    
+    assert histogram.percentile(50) == 0
+    assert histogram.mean() == 0.0
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(SUB_BUCKET_COUNT):
+        histogram.record(value)
+    
+    for pct in (1, 25, 50, 75, 99, 100):
+        assert histogram.percentile(pct) == exact_percentile(range(SUB_BUCKET_COUNT), pct)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_percentiles_within_bucket_precision(seed):
+    rng = random.Random(seed)
+    values = [int(rng.lognormvariate(10, 1.5)) for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    
+    for pct in (50, 90, 95, 99, 99.9):
+        exact = exact_percentile(values, pct)
+        reported = histogram.percentile(pct)
+        # Reported as the top of the bucket, never below the exact value
+        assert exact <= reported <= exact * (1 + PRECISION) + 1
+
+def test_percentile_never_exceeds_max():
+    histogram = LatencyHistogram()
+    for value in (1000, 1001, 1002):
+        histogram.record(value)
+    
+    assert histogram.percentile(100) == 1002
+    assert histogram.max == 1002
+    assert histogram.min == 1000
+
+def test_bucket_bounds_cover_every_value():
+    histogram = LatencyHistogram()
+    for value in list(range(5000)) + [2 ** bits + offset for bits in range(13, 40) for offset in (-1, 0, 1)]:
+        index = histogram._index(value)
+        assert value <= histogram._upper_bound(index)
+        if index:
+            assert value > histogram._upper_bound(index - 1)
+
+def test_merge_matches_recording_everything():
+    rng = random.Random(3)
+    values = [rng.randint(0, 10 ** 7) for _ in range(2000)]
+    combined = LatencyHistogram()
+    left = LatencyHistogram()
+    right = LatencyHistogram()
+    for index, value in enumerate(values):
+        combined.record(value)
+        (left if index % 2 else right).record(value)
+    
+    left.merge(right)
+    
+    assert left.count == combined.count
+    assert left.total == combined.total
+    assert (left.min, left.max) == (combined.min, combined.max)
+    for pct in (50, 95, 99):
+        assert left.percentile(pct) == combined.percentile(pct)
+
+def test_negative_values_count_as_zero():
+    histogram = LatencyHistogram()
+    histogram.record(-5)
+    
+    assert histogram.min == 0
+    assert histogram.percentile(50) == 0
+
+def test_endpoint_names_strip_ids():
+    assert endpoint_name("https://x/TPI/search/Lead/5551234567") == "search_lead"
+    assert endpoint_name("https://x/TPI/get/Lead/42") == "get_lead"
+    assert endpoint_name("https://x/TPI/leadUpdate/7/5551234567") == "lead_update"
+    assert endpoint_name("https://x/TPI/post/") == "create_lead"
+    assert endpoint_name("post_leads") == "post_leads"
+    assert endpoint_name("https://x/elsewhere") == "other"
+
+def test_error_rate_counts_only_server_side_failures(tmp_path):
+    metrics = APIMetrics(str(tmp_path / "api_metrics.log"))
+    url = "https://x/TPI/search/Lead/5551234567"
+    for status in ("2xx", "2xx", "4xx", "5xx", "timeout", "connection_error"):
+        metrics.record_request(url, status, 0.01)
+    
+    summary = metrics.snapshot()["endpoints"]["search_lead"]
+    
+    assert summary["requests"] == 6
+    assert summary["errors"] == 3
+    assert summary["error_rate"] == pytest.approx(0.5)
+    assert summary["client_errors"] == 1
+    assert summary["timeouts"] == 1
+
+def test_window_resets_after_snapshot(tmp_path):
+    metrics = APIMetrics(str(tmp_path / "api_metrics.log"))
+    metrics.record_request("https://x/TPI/get/Lead/42", "2xx", 0.02)
+    
+    assert metrics.snapshot(window=True)["total"]["requests"] == 1
+    assert metrics.snapshot(window=True)["total"]["requests"] == 0
+    assert metrics.snapshot()["total"]["requests"] == 1
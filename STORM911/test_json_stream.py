@@ -0,0 +1,103 @@
+"""
+JSON Stream Tests for Storm911
+Incremental array parsing under random chunk splits
+"""
+
+import json
+import random
+
+import pytest
+
+from json_stream import JSONArrayParser, iter_json_array
+
+# Characters that stress string and nesting tracking, multi-byte ones split across chunks
+TEXT_CHARS = 'ab "\\\n/{}[],:é€😀'
+
+def random_value(rng, depth=0):
+    kind = rng.randint(0, 7 if depth < 3 else 4)
+    if kind == 0:
+        return rng.randint(-1000, 10 ** 6)
+    if kind == 1:
+        return rng.random() * 1000
+    if kind == 2:
+        return rng.choice([True, False, None])
+    if kind in (3, 4):
+        return "".join(rng.choice(TEXT_CHARS) for _ in range(rng.randint(0, 8)))
+    if kind in (5, 6):
+        return {
+            "".join(rng.choice('k"\\{}[]') for _ in range(3)): random_value(rng, depth + 1)
+            for _ in range(rng.randint(0, 3))
+        }
+    return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+
+def split_randomly(rng, data, max_cuts=8):
+    cuts = sorted(rng.sample(range(len(data) + 1), min(len(data) + 1, rng.randint(0, max_cuts))))
+    return [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+
+def parse(chunks):
+    parser = JSONArrayParser()
+    elements = []
+    for chunk in chunks:
+        elements += parser.feed(chunk)
+    return elements + parser.close()
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_arrays_parse_the_same_under_random_splits(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        array = [random_value(rng) for _ in range(rng.randint(0, 6))]
+        body = json.dumps(
+            array,
+            ensure_ascii=rng.random() < 0.5,
+            indent=rng.choice([None, 2])
+        ).encode("utf-8")
+        
+        for _ in range(3):
+            assert parse(split_randomly(rng, body)) == array
+
+def test_every_single_split_point():
+    array = [{"id": "1", "notes": 'say "hi" \\ [x]'}, 42, "é€😀", [1, [2, {}]], None, -0.5]
+    body = json.dumps(array, ensure_ascii=False).encode("utf-8")
+    
+    for cut in range(len(body) + 1):
+        assert parse([body[:cut], body[cut:]]) == array
+
+def test_byte_at_a_time():
+    array = [{"phone": "5551234567", "firstName": "José"}, {"phone": "5559876543"}]
+    body = json.dumps(array, ensure_ascii=False).encode("utf-8")
+    
+    assert parse([body[index:index + 1] for index in range(len(body))]) == array
+
+def test_elements_arrive_before_the_array_ends():
+    parser = JSONArrayParser()
+    
+    assert parser.feed(b'[{"id": 1}, {"id"') == [{"id": 1}]
+    assert parser.feed(b': 2}, 3') == [{"id": 2}]
+    assert parser.feed(b"]") == [3]
+    assert parser.close() == []
+    assert parser.elements == 3
+
+def test_buffer_holds_only_the_unfinished_element():
+    parser = JSONArrayParser()
+    parser.feed(b"[" + b", ".join(b'{"id": %d}' % index for index in range(1000)) + b', {"id"')
+    
+    assert len(parser._buffer) < 20
+
+def test_body_that_is_not_an_array_is_one_element():
+    rng = random.Random(7)
+    body = json.dumps({"id": "42", "phones": ["5551234567"]}).encode("utf-8")
+    
+    assert parse(split_randomly(rng, body)) == [{"id": "42", "phones": ["5551234567"]}]
+
+def test_empty_array():
+    assert parse([b" [ ", b" ] "]) == []
+
+@pytest.mark.parametrize("body", [b"", b"[1, 2", b'[{"id": 1}, {"id"'])
+def test_truncated_body_raises(body):
+    with pytest.raises(json.JSONDecodeError):
+        parse([body])
+
+def test_iter_json_array_reads_chunks():
+    chunks = [b'[1, "a', b'b", {"c"', b": [2]}]"]
+    
+    assert list(iter_json_array(chunks)) == [1, "ab", {"c": [2]}]
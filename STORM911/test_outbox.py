@@ -0,0 +1,189 @@
+"""
+Outbox Tests for Storm911
+Per-lead ordering, retries and failure handling of queued ReadyMode writes
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from config import ERRORS, OUTBOX_MAX_ATTEMPTS
+from outbox import Outbox, STATUS_PENDING, STATUS_DELIVERED, STATUS_FAILED
+from phone_index import PhoneIndex
+
+RETRYABLE = (ERRORS['api']['timeout'], ERRORS['api']['unavailable'])
+
+class FakeAPIHandler:
+    """Records writes and answers them from a script of results"""
+    
+    def __init__(self):
+        self.phone_index = PhoneIndex()
+        self.calls: List[Tuple[str, Dict]] = []
+        self.results: List[Tuple[bool, Any]] = []
+        self.logged_in = True
+    
+    def has_credentials(self) -> bool:
+        return self.logged_in
+    
+    def is_retryable_error(self, error: Any) -> bool:
+        return error in RETRYABLE
+    
+    def _write(self, operation: str, **kwargs) -> Tuple[bool, Any]:
+        self.calls.append((operation, kwargs))
+        return self.results.pop(0) if self.results else (True, "ok")
+    
+    def create_lead(self, lead_data: Dict) -> Tuple[bool, Any]:
+        return self._write("create_lead", lead_data=lead_data)
+    
+    def update_lead(self, lead_id: str, lead_data: Dict) -> Tuple[bool, Any]:
+        return self._write("update_lead", lead_id=lead_id, lead_data=lead_data)
+    
+    def update_lead_fields(self, campaign_id: str, phone: str, fields: Dict) -> Tuple[bool, Any]:
+        return self._write("update_lead_fields", campaign_id=campaign_id, phone=phone, fields=fields)
+
+@pytest.fixture
+def api():
+    return FakeAPIHandler()
+
+@pytest.fixture
+def outbox(api, tmp_path):
+    box = Outbox(api, str(tmp_path / "outbox.sqlite3"))
+    yield box
+    box.close()
+
+def make_due(outbox: Outbox) -> None:
+    """Let every pending message be sent now"""
+    with outbox._lock:
+        outbox._conn.execute("UPDATE messages SET next_attempt_at = 0")
+        outbox._conn.commit()
+
+def test_writes_to_one_lead_share_a_queue_across_number_formats(api, outbox):
+    outbox.create_lead({"phone": "(555) 123-4567"})
+    outbox.update_lead_fields("7", "555-123-4567", {"City": "Tulsa"})
+    outbox.update_lead_fields("7", "5551234567", {"City": "Denver"})
+    
+    keys = {message["lead_key"] for message in outbox.get_pending()}
+    assert keys == {"phone:5551234567"}
+
+def test_writes_by_id_and_number_share_a_queue_once_indexed(api, outbox):
+    api.phone_index.add("42", ["5551234567", "5559876543"])
+    
+    outbox.update_lead_fields("7", "5559876543", {"City": "Tulsa"})
+    outbox.update_lead("42", {"first_name": "Ann"})
+    
+    keys = {message["lead_key"] for message in outbox.get_pending()}
+    assert keys == {"lead:42"}
+
+def test_writes_without_lead_get_their_own_queue(outbox):
+    outbox.create_lead({"first_name": "Ann"})
+    outbox.create_lead({"first_name": "Bob"})
+    
+    keys = [message["lead_key"] for message in outbox.get_pending()]
+    assert len(set(keys)) == 2
+
+def test_messages_for_a_lead_are_delivered_in_order(api, outbox):
+    for city in ("Tulsa", "Denver", "Austin"):
+        outbox.update_lead_fields("7", "5551234567", {"City": city})
+    
+    # One message per lead and pass, the next waits for the one before it
+    delivered = [outbox.drain() for _ in range(3)]
+    
+    assert delivered == [1, 1, 1]
+    assert [kwargs["fields"]["City"] for _, kwargs in api.calls] == ["Tulsa", "Denver", "Austin"]
+    assert outbox.get_stats()[STATUS_DELIVERED] == 3
+
+def test_leads_are_delivered_independently(api, outbox):
+    outbox.update_lead_fields("7", "5551111111", {"City": "Tulsa"})
+    outbox.update_lead_fields("7", "5552222222", {"City": "Denver"})
+    
+    assert outbox.drain() == 2
+
+def test_retryable_failure_holds_later_writes_back(api, outbox):
+    outbox.update_lead_fields("7", "5551234567", {"City": "Tulsa"})
+    outbox.update_lead_fields("7", "5551234567", {"City": "Denver"})
+    api.results = [(False, ERRORS['api']['timeout'])]
+    
+    assert outbox.drain() == 0
+    pending = outbox.get_pending()
+    assert [message["attempts"] for message in pending] == [1, 0]
+    assert pending[0]["last_error"] == ERRORS['api']['timeout']
+    
+    # Backoff keeps the lead's queue waiting
+    assert outbox.drain() == 0
+    assert len(api.calls) == 1
+    
+    make_due(outbox)
+    assert outbox.drain() == 1
+    assert outbox.drain() == 1
+    assert [kwargs["fields"]["City"] for _, kwargs in api.calls] == ["Tulsa", "Tulsa", "Denver"]
+
+def test_permanent_failure_fails_message_right_away(api, outbox):
+    outbox.update_lead("42", {"first_name": "Ann"})
+    outbox.update_lead("42", {"first_name": "Bob"})
+    api.results = [(False, ERRORS['api']['not_found'])]
+    
+    assert outbox.drain() == 0
+    assert outbox.get_stats()[STATUS_FAILED] == 1
+    
+    # The next write for the lead is not held up
+    assert outbox.drain() == 1
+    assert outbox.get_stats()[STATUS_DELIVERED] == 1
+
+def test_exception_is_retried(api, outbox):
+    outbox.update_lead("42", {"first_name": "Ann"})
+    
+    def broken(**kwargs):
+        raise RuntimeError("connection reset")
+    api.update_lead = broken
+    
+    assert outbox.drain() == 0
+    assert outbox.get_stats()[STATUS_PENDING] == 1
+
+def test_message_fails_after_max_attempts(api, outbox):
+    outbox.update_lead("42", {"first_name": "Ann"})
+    api.results = [(False, ERRORS['api']['unavailable'])] * OUTBOX_MAX_ATTEMPTS
+    
+    for _ in range(OUTBOX_MAX_ATTEMPTS):
+        make_due(outbox)
+        outbox.drain()
+    
+    stats = outbox.get_stats()
+    assert stats[STATUS_FAILED] == 1
+    assert stats[STATUS_PENDING] == 0
+    
+    assert outbox.retry_failed() == 1
+    assert outbox.drain() == 1
+
+def test_nothing_is_sent_before_login(api, outbox):
+    api.logged_in = False
+    outbox.update_lead("42", {"first_name": "Ann"})
+    
+    assert outbox.drain() == 0
+    assert api.calls == []
+    assert outbox.get_pending()[0]["attempts"] == 0
+
+def test_pending_messages_survive_restart(api, tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    box = Outbox(api, path)
+    box.update_lead("42", {"first_name": "Ann"})
+    box.close()
+    
+    box = Outbox(api, path)
+    try:
+        assert box.drain() == 1
+        assert api.calls[0] == ("update_lead", {"lead_id": "42", "lead_data": {"first_name": "Ann"}})
+    finally:
+        box.close()
+
+def test_purge_keeps_recent_deliveries(api, outbox):
+    outbox.update_lead("42", {"first_name": "Ann"})
+    outbox.drain()
+    
+    assert outbox.purge_delivered() == 0
+    time.sleep(0.01)
+    assert outbox.purge_delivered(max_age=0) == 1
+
+def test_unknown_operation_is_rejected(outbox):
+    with pytest.raises(ValueError):
+        outbox.enqueue("delete_lead", {})
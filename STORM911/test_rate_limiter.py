@@ -0,0 +1,179 @@
+"""
+Rate Limiter Tests for Storm911
+Priority ordering, reserved tokens and AIMD rate adjustment
+"""
+
+import time
+import threading
+
+import pytest
+
+from rate_limiter import RateLimiter, SharedPriority, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BULK
+
+def drain(limiter):
+    while limiter.try_acquire(PRIORITY_INTERACTIVE):
+        pass
+
+def wait_for_waiters(limiter, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if limiter.get_stats()["queue_depth"] >= count:
+            return
+        time.sleep(0.001)
+    raise AssertionError(f"{count} waiters never queued")
+
+def test_burst_is_available_at_once():
+    limiter = RateLimiter(rate=1, burst=5, reserve=0)
+    
+    assert [limiter.try_acquire() for _ in range(6)] == [True] * 5 + [False]
+
+def test_reserve_is_kept_for_interactive_requests():
+    limiter = RateLimiter(rate=0.001, burst=8, reserve=0.25)
+    
+    # Bulk stops with 2 tokens left, normal with 1, interactive takes the rest
+    assert sum(limiter.try_acquire(PRIORITY_BULK) for _ in range(8)) == 6
+    assert sum(limiter.try_acquire(PRIORITY_NORMAL) for _ in range(8)) == 1
+    assert sum(limiter.try_acquire(PRIORITY_INTERACTIVE) for _ in range(8)) == 1
+
+def test_interactive_waiter_is_served_before_earlier_bulk_waiters():
+    limiter = RateLimiter(rate=20, burst=1, reserve=0)
+    drain(limiter)
+    order = []
+    
+    def waiter(name, priority):
+        if limiter.acquire(priority, timeout=5):
+            order.append(name)
+    
+    threads = []
+    for name, priority in (("bulk-1", PRIORITY_BULK), ("bulk-2", PRIORITY_BULK)):
+        threads.append(threading.Thread(target=waiter, args=(name, priority)))
+        threads[-1].start()
+    wait_for_waiters(limiter, 2)
+    
+    threads.append(threading.Thread(target=waiter, args=("interactive", PRIORITY_INTERACTIVE)))
+    threads[-1].start()
+    wait_for_waiters(limiter, 3)
+    
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert order == ["interactive", "bulk-1", "bulk-2"]
+    assert limiter.get_stats()["queue_depth"] == 0
+
+def test_raised_shared_priority_moves_waiter_up_the_queue():
+    limiter = RateLimiter(rate=20, burst=1, reserve=0)
+    drain(limiter)
+    order = []
+    shared = SharedPriority(PRIORITY_BULK)
+    
+    def waiter(name, priority):
+        if limiter.acquire(priority, timeout=5):
+            order.append(name)
+    
+    threads = [
+        threading.Thread(target=waiter, args=("bulk", PRIORITY_BULK)),
+        threading.Thread(target=waiter, args=("prefetch", shared))
+    ]
+    for thread in threads:
+        thread.start()
+        wait_for_waiters(limiter, threads.index(thread) + 1)
+    
+    # An agent joined the prefetch's lookup
+    shared.raise_to(PRIORITY_INTERACTIVE)
+    
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert order == ["prefetch", "bulk"]
+    assert limiter.get_stats()["priorities"]["bulk"]["acquired"] == 1
+
+def test_try_acquire_does_not_jump_the_queue():
+    limiter = RateLimiter(rate=5, burst=1, reserve=0)
+    drain(limiter)
+    acquired = []
+    
+    thread = threading.Thread(
+        target=lambda: acquired.append(limiter.acquire(PRIORITY_INTERACTIVE, timeout=5))
+    )
+    thread.start()
+    wait_for_waiters(limiter, 1)
+    
+    # A bulk request may not take the token the interactive waiter needs
+    assert not limiter.try_acquire(PRIORITY_BULK)
+    thread.join(timeout=5)
+    assert acquired == [True]
+
+def test_queued_entries_wait_their_turn_without_blocking():
+    limiter = RateLimiter(rate=20, burst=1, reserve=0)
+    drain(limiter)
+    
+    bulk = limiter.enqueue(PRIORITY_BULK)
+    interactive = limiter.enqueue(PRIORITY_INTERACTIVE)
+    time.sleep(0.06)
+    
+    # Only the first in line may take the token
+    assert not limiter.try_acquire_queued(bulk, PRIORITY_BULK)
+    assert limiter.try_acquire_queued(interactive, PRIORITY_INTERACTIVE)
+    
+    limiter.leave_queue(bulk, PRIORITY_BULK)
+    stats = limiter.get_stats()
+    assert stats["queue_depth"] == 0
+    assert stats["priorities"]["bulk"]["timeouts"] == 1
+
+def test_acquire_times_out_and_leaves_the_queue():
+    limiter = RateLimiter(rate=0.01, burst=1, reserve=0)
+    drain(limiter)
+    
+    started = time.monotonic()
+    assert not limiter.acquire(PRIORITY_BULK, timeout=0.05)
+    assert time.monotonic() - started >= 0.05
+    
+    stats = limiter.get_stats()
+    assert stats["queue_depth"] == 0
+    assert stats["priorities"]["bulk"]["timeouts"] == 1
+
+def test_throttling_halves_rate_down_to_the_floor():
+    limiter = RateLimiter(rate=100, burst=10, min_fraction=0.1)
+    
+    limiter.on_throttled()
+    assert limiter.rate == pytest.approx(50)
+    assert not limiter.try_acquire(PRIORITY_INTERACTIVE)
+    
+    for _ in range(10):
+        limiter.on_throttled()
+    assert limiter.rate == pytest.approx(10)
+    assert limiter.get_stats()["throttled"] == 11
+
+def test_success_recovers_rate_additively_up_to_the_maximum():
+    limiter = RateLimiter(rate=100, burst=10, min_fraction=0.1, increase=0.05)
+    limiter.on_throttled()
+    limiter.on_throttled()
+    
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(30)
+    
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == pytest.approx(100)
+
+def test_retry_after_pauses_every_priority():
+    limiter = RateLimiter(rate=1000, burst=10)
+    limiter.on_throttled(retry_after=0.1)
+    
+    time.sleep(0.02)
+    assert not limiter.try_acquire(PRIORITY_INTERACTIVE)
+    
+    time.sleep(0.1)
+    assert limiter.try_acquire(PRIORITY_INTERACTIVE)
+
+def test_tokens_refill_at_the_current_rate():
+    limiter = RateLimiter(rate=50, burst=1, reserve=0)
+    drain(limiter)
+    
+    started = time.monotonic()
+    assert limiter.acquire(PRIORITY_NORMAL, timeout=1)
+    assert 0.01 <= time.monotonic() - started < 0.5
+    
+    stats = limiter.get_stats()["priorities"]["normal"]
+    assert stats["acquired"] == 1
+    assert stats["wait_max"] > 0
@@ -0,0 +1,162 @@
+"""
+State Journal Tests for Storm911
+Replay, torn-tail truncation and compaction of the state journal
+"""
+
+import os
+
+import pytest
+
+from state_journal import StateJournal, RECORD_HEADER, apply_op, OP_SET, OP_PUSH, OP_INCR
+
+def set_op(path, value):
+    return {"op": OP_SET, "path": path, "value": value}
+
+@pytest.fixture
+def journal_file(tmp_path):
+    return str(tmp_path / "app_state.journal")
+
+def write_records(journal_file, count, fsync=False):
+    journal = StateJournal(journal_file, fsync=fsync)
+    journal.replay()
+    for index in range(count):
+        journal.sync(journal.append([set_op(["count"], index)]))
+    journal.close()
+
+def replay(journal_file, after_seq=0):
+    journal = StateJournal(journal_file, fsync=False)
+    ops = journal.replay(after_seq)
+    return journal, ops
+
+def write_records_after(journal_file, count):
+    journal, _ = replay(journal_file)
+    for _ in range(count):
+        journal.append([set_op(["count"], "torn")])
+    journal.close()
+
+def test_replay_returns_ops_in_order(journal_file):
+    write_records(journal_file, 5)
+    
+    journal, ops = replay(journal_file)
+    
+    assert [op["value"] for op in ops] == [0, 1, 2, 3, 4]
+    assert journal.get_position() == {
+        "seq": 5,
+        "records": 5,
+        "size": os.path.getsize(journal_file)
+    }
+    journal.close()
+
+def test_replay_skips_records_in_snapshot(journal_file):
+    write_records(journal_file, 5)
+    
+    journal, ops = replay(journal_file, after_seq=3)
+    
+    assert [op["value"] for op in ops] == [3, 4]
+    assert journal.seq == 5
+    journal.close()
+
+def test_appends_continue_sequence_after_replay(journal_file):
+    write_records(journal_file, 2)
+    
+    journal, _ = replay(journal_file)
+    assert journal.append([set_op(["count"], 2)]) == 3
+    journal.close()
+    
+    _, ops = replay(journal_file)
+    assert [op["value"] for op in ops] == [0, 1, 2]
+
+@pytest.mark.parametrize("cut", [1, RECORD_HEADER.size - 1, RECORD_HEADER.size + 1])
+def test_torn_tail_is_cut_off(journal_file, cut):
+    write_records(journal_file, 3)
+    intact = os.path.getsize(journal_file)
+    write_records_after(journal_file, 1)
+    
+    # Crash partway through the last record
+    with open(journal_file, 'r+b') as f:
+        f.truncate(intact + cut)
+    
+    journal, ops = replay(journal_file)
+    
+    assert [op["value"] for op in ops] == [0, 1, 2]
+    assert os.path.getsize(journal_file) == intact
+    
+    # New records follow the last intact one
+    assert journal.append([set_op(["count"], 9)]) == 4
+    journal.close()
+    _, ops = replay(journal_file)
+    assert [op["value"] for op in ops] == [0, 1, 2, 9]
+
+def test_corrupt_record_ends_replay(journal_file):
+    write_records(journal_file, 3)
+    size = os.path.getsize(journal_file)
+    
+    # Flip a payload byte of the last record
+    with open(journal_file, 'r+b') as f:
+        f.seek(size - 2)
+        byte = f.read(1)
+        f.seek(size - 2)
+        f.write(bytes([byte[0] ^ 0xff]))
+    
+    journal, ops = replay(journal_file)
+    
+    assert [op["value"] for op in ops] == [0, 1]
+    assert journal.records == 2
+    journal.close()
+
+def test_discard_keeps_records_after_position(journal_file):
+    journal = StateJournal(journal_file, fsync=False)
+    journal.replay()
+    for index in range(3):
+        journal.append([set_op(["count"], index)])
+    position = journal.get_position()
+    
+    # Written while the snapshot was being saved
+    journal.append([set_op(["count"], 3)])
+    journal.discard(position)
+    
+    assert journal.records == 1
+    journal.close()
+    
+    journal, ops = replay(journal_file, after_seq=position["seq"])
+    assert [op["value"] for op in ops] == [3]
+    assert journal.seq == 4
+    journal.close()
+
+def test_sync_covers_earlier_appends(journal_file):
+    journal = StateJournal(journal_file, fsync=True)
+    journal.replay()
+    first = journal.append([set_op(["count"], 0)])
+    second = journal.append([set_op(["count"], 1)])
+    
+    journal.sync(second)
+    assert journal.synced_seq == second
+    
+    # Already covered, no further fsync needed
+    journal.sync(first)
+    assert journal.synced_seq == second
+    journal.close()
+
+def test_missing_journal_replays_nothing(journal_file):
+    journal, ops = replay(journal_file)
+    
+    assert ops == []
+    assert journal.get_position() == {"seq": 0, "records": 0, "size": 0}
+    journal.close()
+
+def test_apply_op_sets_pushes_and_increments():
+    state = {"session": {"call_count": 1}}
+    
+    state = apply_op(state, set_op(["session", "call_count"], 2))
+    state = apply_op(state, set_op(["ui_state", "current_page"], 3))
+    for index in range(4):
+        state = apply_op(state, {"op": OP_PUSH, "path": ["recent_calls"], "value": index, "limit": 3})
+    
+    state = apply_op(state, {"op": OP_INCR, "path": ["session", "call_count"], "value": 1})
+    state = apply_op(state, {"op": OP_INCR, "path": ["session", "email_count"], "value": 1})
+    
+    assert state["session"] == {"call_count": 3, "email_count": 1}
+    assert state["ui_state"] == {"current_page": 3}
+    assert state["recent_calls"] == [3, 2, 1]
+    
+    assert apply_op(state, set_op([], {"reset": True})) == {"reset": True}
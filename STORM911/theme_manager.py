@@ -3,11 +3,12 @@ Theme Manager for Storm911
 Handles application themes, styles, and visual customization
 """
 
-import json
 import os
 from typing import Dict, Any
 import customtkinter as ctk
 
+from serializers import load_file, save_file, FORMAT_JSON
+
 class ThemeManager:
     def __init__(self):
         """Initialize Theme Manager"""
@@ -222,8 +223,7 @@ class ThemeManager:
         """Export theme configuration to file"""
         if name in self.color_schemes:
             try:
-                with open(filepath, 'w') as f:
-                    json.dump(self.color_schemes[name], f, indent=2)
+                save_file(filepath, self.color_schemes[name], FORMAT_JSON, pretty=True)
                 return True
             except Exception:
                 return False
@@ -232,10 +232,9 @@ class ThemeManager:
     def import_theme(self, filepath: str) -> bool:
         """Import theme configuration from file"""
         try:
-            with open(filepath, 'r') as f:
-                theme_data = json.load(f)
-                name = os.path.splitext(os.path.basename(filepath))[0]
-                self.create_custom_theme(name, theme_data)
-                return True
+            theme_data = load_file(filepath)
+            name = os.path.splitext(os.path.basename(filepath))[0]
+            self.create_custom_theme(name, theme_data)
+            return True
         except Exception:
             return False
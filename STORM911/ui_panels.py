@@ -3,8 +3,12 @@ UI Panels for Storm911
 Contains panel creation and management functionality
 """
 
+import tkinter as tk
 import customtkinter as ctk
 from typing import Dict, Any
+import logging
+
+from search_dispatcher import SearchDispatcher
 
 class UIPanels:
     def __init__(self, root: ctk.CTk, managers: Dict[str, Any], handlers: Dict[str, Any]):
@@ -12,6 +16,10 @@ class UIPanels:
         self.root = root
         self.managers = managers
         self.handlers = handlers
+        
+        # Background search
+        self.search_dispatcher = SearchDispatcher(root, handlers['api'])
+        self.search_status_label = None
     
     def create_caller_info_panel(self, parent: ctk.CTkFrame) -> None:
         """Create caller information panel"""
@@ -102,6 +110,9 @@ class UIPanels:
         )
         phone_entry.pack(side="left", fill="x", expand=True, padx=5)
         
+        # Typing a new number supersedes any outstanding search
+        phone_var.trace_add("write", lambda *args: self._cancel_phone_search())
+        
         # Search button
         search_button = ctk.CTkButton(
             frame,
@@ -109,6 +120,10 @@ class UIPanels:
             command=lambda: self._handle_phone_search(phone_var.get())
         )
         search_button.pack(side="right", padx=5)
+        
+        # Search status
+        self.search_status_label = ctk.CTkLabel(frame, text="", width=90)
+        self.search_status_label.pack(side="right", padx=5)
     
     def _create_customer_info_section(self, parent: ctk.CTkFrame) -> None:
         """Create customer information section"""
@@ -263,18 +278,9 @@ class UIPanels:
                 )
                 return
             
-            # Search for lead
-            success, result = self.handlers['api'].search_lead(phone)
-            
-            if success:
-                # Populate fields with result
-                self._populate_fields(result)
-            else:
-                self.managers['dialog'].show_message(
-                    "Error",
-                    result,
-                    "error"
-                )
+            # Search for lead in the background
+            self.search_dispatcher.search(phone, self._handle_phone_search_result)
+            self.search_status_label.configure(text="Searching...")
             
         except Exception as e:
             logging.error(f"Error searching phone number: {str(e)}")
@@ -284,6 +290,26 @@ class UIPanels:
                 "error"
             )
     
+    def _handle_phone_search_result(self, success: bool, result: Any) -> None:
+        """Handle completed phone search"""
+        self.search_status_label.configure(text="")
+        
+        if success:
+            # Populate fields with result
+            self._populate_fields(result)
+        else:
+            self.managers['dialog'].show_message(
+                "Error",
+                result,
+                "error"
+            )
+    
+    def _cancel_phone_search(self) -> None:
+        """Cancel outstanding search when the phone number changes"""
+        if self.search_dispatcher.is_busy():
+            self.search_dispatcher.cancel()
+            self.search_status_label.configure(text="")
+    
     def _populate_fields(self, data: Dict) -> None:
         """Populate form fields with data"""
         # Customer info
@@ -3,12 +3,12 @@ Utility functions for Storm911 application
 """
 
 import re
-import json
 import logging
 from datetime import datetime, timedelta
 import phonenumbers
 from email_validator import validate_email, EmailNotValidError
 from config import VALIDATION, OPTIONS, ERRORS
+from serializers import load_file, save_file, FORMAT_JSON
 
 def validate_phone_number(phone):
     """
@@ -159,19 +159,17 @@ def get_next_business_day(date=None):
     return next_day.strftime('%m/%d/%Y')
 
 def load_json_file(filepath):
-    """Safely load JSON file"""
+    """Safely load JSON file, msgpack files are detected and read too"""
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return load_file(filepath)
     except Exception as e:
         logging.error(f"Error loading JSON file {filepath}: {str(e)}")
         return None
 
-def save_json_file(filepath, data):
-    """Safely save JSON file"""
+def save_json_file(filepath, data, pretty=False):
+    """Safely save JSON file, pretty indents it for people to read"""
     try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        save_file(filepath, data, FORMAT_JSON, pretty)
         return True
     except Exception as e:
         logging.error(f"Error saving JSON file {filepath}: {str(e)}")
@@ -0,0 +1,210 @@
+"""
+Warm-up Pipeline for Storm911
+Prepares credentials, connections and lead data in the background at login
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import API_TIMEOUT, WARMUP_PREFETCH_RECENT
+from lead_cache import normalize_phone
+
+# Step states
+STEP_PENDING = "pending"
+STEP_RUNNING = "running"
+STEP_DONE = "done"
+STEP_FAILED = "failed"
+STEP_SKIPPED = "skipped"
+
+# Step name -> progress message
+STEP_LABELS = OrderedDict([
+    ("credentials", "Validating credentials"),
+    ("connections", "Connecting to ReadyMode"),
+    ("cache", "Loading cached leads"),
+    ("prefetch", "Fetching recent leads")
+])
+
+class WarmupPipeline:
+    def __init__(
+        self,
+        api_handler: Any,
+        async_api: Any = None,
+        state_manager: Any = None
+    ):
+        """Initialize Warm-up Pipeline"""
+        self.api_handler = api_handler
+        self.async_api = async_api
+        self.state_manager = state_manager
+        
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict[str, str]] = OrderedDict()
+        self._reset_steps()
+        
+        self._thread: Optional[threading.Thread] = None
+        self._done_event = threading.Event()
+        self._stop_event = threading.Event()
+        self.duration = 0.0
+    
+    def _reset_steps(self) -> None:
+        """Mark all steps pending"""
+        with self._lock:
+            for name in STEP_LABELS:
+                self._steps[name] = {"status": STEP_PENDING, "detail": ""}
+    
+    def start(self) -> None:
+        """Run pipeline on a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._reset_steps()
+        self._done_event.clear()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.run,
+            name="warmup",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def run(self) -> Dict[str, Dict[str, str]]:
+        """Run all steps, independent ones in parallel, returns step results"""
+        started = time.monotonic()
+        
+        try:
+            with ThreadPoolExecutor(
+                max_workers=len(STEP_LABELS),
+                thread_name_prefix="warmup-step"
+            ) as executor:
+                credentials = executor.submit(
+                    self._run_step,
+                    "credentials",
+                    self._validate_credentials
+                )
+                executor.submit(self._run_step, "connections", self._warm_connections)
+                cache = executor.submit(self._run_step, "cache", self._preload_cache)
+                
+                # Recent leads need valid credentials and whatever the disk cache holds
+                executor.submit(
+                    self._run_step,
+                    "prefetch",
+                    self._prefetch_recent,
+                    [credentials, cache]
+                )
+        finally:
+            self.duration = time.monotonic() - started
+            self._done_event.set()
+        
+        steps = self.get_steps()
+        logging.info(
+            f"Warm-up finished in {self.duration:.2f}s: "
+            + ", ".join(f"{name} {step['status']}" for name, step in steps.items())
+        )
+        return steps
+    
+    def _run_step(
+        self,
+        name: str,
+        step: Callable[[], Tuple[bool, str]],
+        depends_on: Optional[List[Future]] = None
+    ) -> bool:
+        """Run step once its dependencies succeeded, returns success"""
+        for dependency in depends_on or []:
+            if not dependency.result():
+                self._set_step(name, STEP_SKIPPED, "Skipped")
+                return False
+        
+        if self._stop_event.is_set():
+            self._set_step(name, STEP_SKIPPED, "Cancelled")
+            return False
+        
+        self._set_step(name, STEP_RUNNING)
+        try:
+            success, detail = step()
+        except Exception as e:
+            logging.error(f"Error in warm-up step {name}: {str(e)}")
+            success, detail = False, str(e)
+        
+        self._set_step(name, STEP_DONE if success else STEP_FAILED, detail)
+        return success
+    
+    def _set_step(self, name: str, status: str, detail: str = "") -> None:
+        """Update step state"""
+        with self._lock:
+            self._steps[name] = {"status": status, "detail": detail}
+    
+    def _validate_credentials(self) -> Tuple[bool, str]:
+        """Check API credentials"""
+        if not self.api_handler.api_user or not self.api_handler.api_pass:
+            return False, "No API credentials"
+        return self.api_handler.validate_credentials()
+    
+    def _warm_connections(self) -> Tuple[bool, str]:
+        """Open pooled connections for the sync and async clients"""
+        opened = self.api_handler.warm_connections()
+        if self.async_api:
+            opened += self.async_api.warm_connections().result(timeout=API_TIMEOUT)
+        return opened > 0, f"{opened} connections opened"
+    
+    def _preload_cache(self) -> Tuple[bool, str]:
+        """Load recent lookups from disk"""
+        loaded = self.api_handler.preload_cache()
+        return True, f"{loaded} cached leads loaded"
+    
+    def _prefetch_recent(self) -> Tuple[bool, str]:
+        """Fetch leads of recent callers not held locally"""
+        fetched = 0
+        for phone in self._get_recent_phones():
+            if self._stop_event.is_set():
+                break
+            fetched += self.api_handler.prefetch_leads([phone])
+        return True, f"{fetched} recent leads fetched"
+    
+    def _get_recent_phones(self) -> List[str]:
+        """Get distinct numbers of the most recent calls"""
+        if not self.state_manager:
+            return []
+        
+        phones = []
+        for call in self.state_manager.get_recent_calls():
+            phone = normalize_phone(call.get('phone')) if isinstance(call, dict) else ''
+            if phone and phone not in phones:
+                phones.append(phone)
+                if len(phones) >= WARMUP_PREFETCH_RECENT:
+                    break
+        return phones
+    
+    def get_steps(self) -> Dict[str, Dict[str, str]]:
+        """Get status and detail of every step"""
+        with self._lock:
+            return {name: dict(step) for name, step in self._steps.items()}
+    
+    def get_progress(self) -> Tuple[float, str]:
+        """Get (fraction complete, message) for the splash screen"""
+        with self._lock:
+            finished = sum(
+                1 for step in self._steps.values()
+                if step["status"] not in (STEP_PENDING, STEP_RUNNING)
+            )
+            running = [
+                STEP_LABELS[name] for name, step in self._steps.items()
+                if step["status"] == STEP_RUNNING
+            ]
+        
+        message = f"{running[0]}..." if running else ("Ready" if self.is_done() else "Starting...")
+        return finished / len(STEP_LABELS), message
+    
+    def is_done(self) -> bool:
+        """Check whether all steps finished"""
+        return self._done_event.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for pipeline to finish"""
+        return self._done_event.wait(timeout)
+    
+    def close(self) -> None:
+        """Skip remaining work"""
+        self._stop_event.set()